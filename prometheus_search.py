@@ -8,7 +8,6 @@ Prometheus 专用搜索工具
 
 import os
 import sys
-import json
 import argparse
 from pathlib import Path
 
@@ -50,7 +49,8 @@ def load_credentials():
 
 def search(query: str, engine: str = "anspire", count: int = 10, 
            insite: str = None, from_time: str = None, to_time: str = None,
-           news: bool = False, raw: bool = False, verbose: bool = False):
+           news: bool = False, raw: bool = False, verbose: bool = False,
+           deadline: float = None):
     """
     执行搜索
     
@@ -64,9 +64,10 @@ def search(query: str, engine: str = "anspire", count: int = 10,
         news: 是否搜索新闻
         raw: 输出原始 JSON
         verbose: 显示详细过程
+        deadline: 端到端截止时间（秒），不传则使用默认的连接 / 读取超时
     
     Returns:
-        搜索结果
+        搜索结果（超时时为 {"error": ..., "timeouts": 各阶段耗时}）
     """
     # 加载凭证
     anspire_key, brave_key = load_credentials()
@@ -83,6 +84,11 @@ def search(query: str, engine: str = "anspire", count: int = 10,
         if verbose:
             print(f"[自动选择] 已简化：直接使用 Anspire 引擎（避免额外工具调用）")
     
+    from deadline import Deadline, DeadlineExceeded
+    if deadline is not None:
+        # 未传截止时间时不构造 Deadline，引擎走普通请求与默认超时
+        deadline = Deadline(deadline)
+
     # 执行搜索
     try:
         if engine == "anspire":
@@ -91,7 +97,8 @@ def search(query: str, engine: str = "anspire", count: int = 10,
             agent = AnspireSearchAgent(
                 api_key=anspire_key,
                 enable_cache=True,
-                enable_intent=verbose
+                enable_intent=verbose,
+                raw_responses=raw  # --raw 直接输出缓存的响应字节
             )
             
             if news:
@@ -101,7 +108,8 @@ def search(query: str, engine: str = "anspire", count: int = 10,
                     top_k=count,
                     from_time=from_time if from_time else "p7d",  # 默认最近 7 天
                     to_time=to_time,
-                    verbose=verbose
+                    verbose=verbose,
+                    deadline=deadline
                 )
             else:
                 result = agent.search(
@@ -110,7 +118,8 @@ def search(query: str, engine: str = "anspire", count: int = 10,
                     insite=insite,
                     from_time=from_time,
                     to_time=to_time,
-                    verbose=verbose
+                    verbose=verbose,
+                    deadline=deadline
                 )
         
         elif engine == "brave":
@@ -122,20 +131,26 @@ def search(query: str, engine: str = "anspire", count: int = 10,
                 result = client.search_news(
                     query=query,
                     count=count,
-                    freshness="pw"  # 默认最近一周
+                    freshness="pw",  # 默认最近一周
+                    deadline=deadline
                 )
             else:
                 result = client.search(
                     query=query,
                     count=count,
-                    freshness=from_time
+                    freshness=from_time,
+                    deadline=deadline
                 )
         
         else:
             return {"error": f"不支持的引擎：{engine}"}
         
+        if verbose and deadline is not None:
+            print(f"[耗时] {deadline.report()['stages']}")
         return result
     
+    except DeadlineExceeded as e:
+        return {"error": str(e), "timeouts": e.stages}
     except Exception as e:
         return {"error": str(e)}
 
@@ -234,6 +249,7 @@ def main():
     parser.add_argument("-n", "--news", action="store_true", help="新闻搜索")
     parser.add_argument("--raw", action="store_true", help="输出原始 JSON")
     parser.add_argument("-v", "--verbose", action="store_true", help="显示详细过程")
+    parser.add_argument("--deadline", type=float, help="端到端截止时间（秒）")
     
     args = parser.parse_args()
     
@@ -246,12 +262,15 @@ def main():
         from_time=args.from_time,
         to_time=args.to_time,
         news=args.news,
-        verbose=args.verbose
+        raw=args.raw,
+        verbose=args.verbose,
+        deadline=args.deadline
     )
     
     # 输出结果
     if args.raw:
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        from anspire_search import write_raw
+        write_raw(result)
     else:
         formatted = format_results(result, args.engine)
         print(formatted)
@@ -9,21 +9,65 @@ API: https://plugin.anspire.cn/api/ntsearch/search
 ⚠️  注意: 时间范围参数可能不稳定，建议谨慎使用
 """
 
+import io
 import os
+import re
 import sys
 import json
+import asyncio
 import requests
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Union
 
 # 导入缓存和意图识别模块
 try:
     from search_cache import SearchCache, get_default_cache
     from search_intent import SearchIntentClassifier, SearchEngineSelector, SearchIntent
+    from single_flight import SingleFlight
+    from query_canonical import canonicalize
+    from cache_codecs import RawResult
+    from http_session import get_session
 except ImportError:
     # 如果模块不存在，使用空实现
     SearchCache = None
     SearchIntentClassifier = None
     SearchEngineSelector = None
+    SingleFlight = None
+    canonicalize = None
+    RawResult = None
+    get_session = None
+
+try:
+    from deadline import read_body
+except ImportError:
+    read_body = None
+
+from engine_support import (
+    DEFAULT_TIMEOUT,
+    breaker_attempt,
+    coerce_deadline,
+    deadline_stage,
+    make_rate_limiter,
+    make_retry_policy,
+    wait_timeout
+)
+
+try:
+    from async_http import AsyncHTTPSession
+    from single_flight import AsyncSingleFlight
+except ImportError:
+    AsyncHTTPSession = None
+    AsyncSingleFlight = None
+
+
+# 进程内共享：不同客户端实例的相同请求也会合并
+_single_flight = SingleFlight() if SingleFlight is not None else None
+_async_single_flight = AsyncSingleFlight() if AsyncSingleFlight is not None else None
+
+# 异步客户端的后台刷新在刷新线程中等待事件循环执行，超过此时间（秒）视为失败
+REFRESH_TIMEOUT = 60
+
+# 缓存键命名空间（与其他引擎共享同一个缓存时互不命中）
+CACHE_NAMESPACE = {"engine": "anspire"}
 
 
 class AnspireSearchAgent:
@@ -33,7 +77,15 @@ class AnspireSearchAgent:
         self,
         api_key: Optional[str] = None,
         enable_cache: bool = True,
-        enable_intent: bool = True
+        enable_intent: bool = True,
+        stale_seconds: float = 0,
+        canonicalize_queries: bool = True,
+        raw_responses: bool = False,
+        admission: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        retry: Union[bool, "RetryPolicy"] = True,
+        rate_limit: Union[None, Dict[str, Any], "RateLimiter"] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None
     ):
         """
         初始化客户端
@@ -42,6 +94,20 @@ class AnspireSearchAgent:
             api_key: API Key，如不传则从环境变量 ANSPIRE_API_KEY 读取
             enable_cache: 是否启用缓存
             enable_intent: 是否启用意图识别
+            stale_seconds: stale-while-revalidate 宽限期（秒），缓存过期后
+                           在此时间内直接返回旧结果并后台刷新，0 表示关闭
+            canonicalize_queries: 是否规范化查询（大小写、空白、全角半角），
+                                  并把 site: 语法提取为 insite 参数
+            raw_responses: 原始响应模式：结果为 RawResult（响应原始字节，访问时才
+                           解析），缓存原样存储响应字节，命中时不做 JSON 解码
+            admission: 写入缓存的准入策略（always / tinylfu），不传则使用缓存的默认策略
+            session: HTTP 会话，不传则使用按引擎共享的连接池会话
+            retry: 429 / 5xx / 连接错误的重试策略，True 使用默认 RetryPolicy，False 不重试
+            rate_limit: 客户端限流，RateLimiter 或 get_rate_limiter 的参数（如
+                        {"rate": 2, "path": "/var/tmp/ratelimit.db"}），按 API Key 共享令牌桶；
+                        None 表示不限流
+            circuit_breaker: 熔断器（CircuitBreaker），统计每次上游请求的结果与耗时，
+                             打开时不再请求上游而是抛出 CircuitOpenError（缓存命中不受影响）
         """
         self.api_key = api_key or os.environ.get("ANSPIRE_API_KEY")
         if not self.api_key:
@@ -57,12 +123,35 @@ class AnspireSearchAgent:
         # 初始化缓存
         self.enable_cache = enable_cache and SearchCache is not None
         self.cache = get_default_cache() if self.enable_cache else None
+        self.stale_seconds = stale_seconds
+        self.canonicalize_queries = canonicalize_queries and canonicalize is not None
+        self.raw_responses = raw_responses and RawResult is not None
+        self.admission = admission
+
+        # 并发相同请求合并为一次 HTTP 调用
+        self.single_flight = _single_flight
+
+        # 连接复用：同一进程内的 Anspire 客户端共享一个会话
+        self.session = session if session is not None else self._default_session()
+
+        # 可重试的错误在单次调用内重试（合并的请求共享重试）
+        self.retry_policy = make_retry_policy(retry)
+
+        # 每次请求（含重试）前取令牌，同一 API Key 的客户端共享令牌桶
+        self.rate_limiter = make_rate_limiter("anspire", self.api_key, rate_limit)
+
+        # 熔断器只包住上游请求：熔断期间缓存命中照常返回
+        self.circuit_breaker = circuit_breaker
 
         # 初始化意图识别
         self.enable_intent = enable_intent and SearchIntentClassifier is not None
         self.intent_classifier = SearchIntentClassifier() if self.enable_intent else None
         self.engine_selector = SearchEngineSelector(["anspire", "brave", "duckduckgo"]) if self.enable_intent else None
 
+    def _default_session(self):
+        """未传会话时使用的 HTTP 会话"""
+        return get_session("anspire") if get_session is not None else requests
+
     def search(
         self,
         query: str,
@@ -71,8 +160,12 @@ class AnspireSearchAgent:
         from_time: Optional[str] = None,
         to_time: Optional[str] = None,
         use_cache: bool = True,
-        verbose: bool = False
-    ) -> Dict[str, Any]:
+        verbose: bool = False,
+        stale_seconds: Optional[float] = None,
+        allow_negative: bool = True,
+        cache_only: bool = False,
+        deadline: Union[None, float, "Deadline"] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         执行搜索
 
@@ -89,10 +182,63 @@ class AnspireSearchAgent:
                      支持格式：同 from_time
             use_cache: 是否使用缓存
             verbose: 是否输出详细过程
+            stale_seconds: 本次调用的 stale-while-revalidate 宽限期（秒），
+                           不传则使用客户端配置
+            allow_negative: 是否接受负缓存（空结果、错误响应、HTTP 错误），
+                            False 时忽略负缓存直接请求上游
+            cache_only: 只读缓存，未命中时返回 None，不请求上游
+            deadline: 端到端截止时间（秒数或 Deadline），HTTP 请求的连接 / 读取超时
+                      由剩余预算拆分；不传时使用默认超时
 
         Returns:
-            搜索结果字典
+            搜索结果字典（原始响应模式下为 RawResult）；cache_only 且未命中时为 None
+
+        Raises:
+            requests.HTTPError: 上游返回 4xx/5xx，或命中了 HTTP 错误的负缓存
+            DeadlineExceeded: 截止时间已到（requests.Timeout 的子类，stage 为超时阶段）
         """
+        raw_query, raw_insite = query, insite
+        query, insite = self._prepare(query, insite, verbose)
+        deadline = coerce_deadline(deadline)
+
+        if not (use_cache and self.cache):
+            if cache_only:
+                return None
+            return self._fetch_shared(query, top_k, insite, from_time, to_time, store=False, deadline=deadline)
+
+        # 检查缓存
+        if stale_seconds is None:
+            stale_seconds = self.stale_seconds
+
+        # 以原始输入查询缓存：SearchCache 自行规范化并统计规范化带来的命中
+        with deadline_stage(deadline, "anspire.cache"):
+            cached = self.cache.lookup(
+                raw_query, top_k, raw_insite, from_time, to_time,
+                stale_seconds=stale_seconds,
+                allow_negative=allow_negative,
+                namespace=CACHE_NAMESPACE
+            )
+        if cached and cached.result:
+            return self._serve_cached(cached, query, top_k, insite, from_time, to_time, verbose)
+        elif verbose:
+            print("[缓存] 未命中")
+        if cache_only:
+            return None
+
+        result = self._fetch_shared(query, top_k, insite, from_time, to_time, store=True, deadline=deadline)
+        if verbose:
+            print("[缓存] 已保存")
+        return result
+
+    def _prepare(self, query: str, insite: Optional[str], verbose: bool):
+        """查询规范化与意图提示；返回请求使用的 (query, insite)"""
+        # 查询规范化（请求合并与实际请求使用规范化后的形式）
+        if self.canonicalize_queries:
+            canonical = canonicalize(query, insite)
+            if canonical.changed and verbose:
+                print(f"[规范化] {query!r} → {canonical.query!r} (insite={canonical.insite})")
+            query, insite = canonical.query, canonical.insite
+
         # 意图识别
         if self.enable_intent and verbose:
             analysis = self.intent_classifier.classify(query)
@@ -104,42 +250,165 @@ class AnspireSearchAgent:
             if recommended_engine != "anspire":
                 print(f"[提示] 推荐使用 {recommended_engine} 引擎")
 
-        # 检查缓存
-        if use_cache and self.cache:
-            cached = self.cache.get(query, top_k, insite, from_time, to_time)
-            if cached:
-                if verbose:
-                    print("[缓存] 命中缓存")
-                return cached
-            elif verbose:
-                print("[缓存] 未命中")
-
-        # 执行搜索
-        params = {
-            "query": query[:64],  # 限制64字符
-            "top_k": str(top_k)
-        }
+        return query, insite
 
-        # 站内搜索（可用）
-        if insite:
-            params["Insite"] = insite
+    def _serve_cached(
+        self,
+        cached,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        verbose: bool
+    ) -> Dict[str, Any]:
+        """返回命中的缓存结果：负缓存的 HTTP 错误重新抛出，陈旧或临近过期的条目安排后台刷新"""
+        if cached.kind == "http_error":
+            if verbose:
+                print(f"[缓存] 命中负缓存（HTTP {cached.result.get('status_code')}）")
+            raise _cached_http_error(cached.result)
+        if cached.negative:
+            if verbose:
+                print(f"[缓存] 命中负缓存（{cached.kind}）")
+        elif cached.stale or cached.refresh_due:
+            # 先返回旧结果，后台按条目原有的 top_k 刷新，避免缩小已缓存的范围
+            refresh_top_k = max(top_k, cached.top_k)
+            self.cache.refresh_in_background(
+                self._refresher(query, refresh_top_k, insite, from_time, to_time),
+                query, refresh_top_k, insite, from_time, to_time,
+                namespace=CACHE_NAMESPACE
+            )
+            if verbose:
+                if cached.stale:
+                    print("[缓存] 命中过期缓存，已安排后台刷新")
+                else:
+                    print("[缓存] 命中即将过期的热门缓存，已安排提前刷新")
+        elif verbose:
+            print("[缓存] 命中缓存")
+        return cached.result
+
+    def _refresher(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str]
+    ) -> Callable[[], Any]:
+        """后台刷新函数（在刷新线程中执行）"""
+        return lambda: self._fetch_and_store(query, top_k, insite, from_time, to_time, refresh=True)
+
+    def _fetch_shared(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        store: bool,
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """
+        请求 Anspire API，并发的相同请求共享一次调用
 
-        # 时间范围（需要使用正确格式）
-        if from_time:
-            params["FromTime"] = from_time
-        if to_time:
-            params["ToTime"] = to_time
+        合并键为缓存键参数（query / insite / from_time / to_time）加上 top_k。
+        截止时间已过则不再发出请求；等待他人进行中的请求同样受截止时间约束。
+        """
+        if store:
+            fetch = lambda: self._fetch_and_store(query, top_k, insite, from_time, to_time, deadline)
+        else:
+            fetch = lambda: self._request(query, top_k, insite, from_time, to_time, deadline)
+
+        if deadline is not None:
+            deadline.check("anspire.fetch")
+        with deadline_stage(deadline, "anspire.fetch"):
+            if self.single_flight is None:
+                return fetch()
+            return self.single_flight.do(
+                ("anspire", query, top_k, insite, from_time, to_time), fetch, timeout=wait_timeout(deadline)
+            )
+
+    def _request(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """
+        请求 Anspire API：每次尝试先经过熔断器、再取限流令牌，可重试的错误按重试策略重试
 
-        response = requests.get(self.base_url, params=params, headers=self.headers)
+        限流与重试的等待都计入截止时间；熔断器只统计请求本身的耗时。
+        """
+        def fetch():
+            with breaker_attempt(self.circuit_breaker) as attempt:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(deadline, stage="anspire.ratelimit")
+                if attempt is not None:
+                    attempt.start()
+                return self._fetch(query, top_k, insite, from_time, to_time, deadline)
+
+        if self.retry_policy is None:
+            return fetch()
+        return self.retry_policy.call(fetch, deadline, stage="anspire.retry")
+
+    def _fetch(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """请求 Anspire API（响应体逐块读取，截止时间已过即放弃）"""
+        params = _request_params(query, top_k, insite, from_time, to_time)
+        if deadline is None:
+            response = self.session.get(self.base_url, params=params, headers=self.headers, timeout=DEFAULT_TIMEOUT)
+        else:
+            response = self.session.get(
+                self.base_url, params=params, headers=self.headers,
+                timeout=deadline.timeouts(), stream=True
+            )
+            read_body(response, deadline)
         response.raise_for_status()
-        result = response.json()
+        if self.raw_responses:
+            return RawResult(response.content)
+        return response.json()
 
-        # 保存到缓存
-        if use_cache and self.cache:
-            self.cache.set(query, result, top_k, insite, from_time, to_time)
-            if verbose:
-                print("[缓存] 已保存")
+    def _fetch_and_store(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        deadline: Optional["Deadline"] = None,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        请求 Anspire API 并写入缓存（失败与空结果写入负缓存）
 
+        后台刷新（refresh=True）只写回正常结果：失败或空结果不覆盖仍在返回的旧条目。
+        """
+        try:
+            result = self._request(query, top_k, insite, from_time, to_time, deadline)
+        except requests.HTTPError as e:
+            if e.response is not None and not refresh:
+                self.cache.set(
+                    query, _http_error_payload(e.response), top_k, insite, from_time, to_time,
+                    kind="http_error", admission=self.admission, namespace=CACHE_NAMESPACE
+                )
+            raise
+
+        kind = _result_kind(result)
+        if kind == "ok" or not refresh:
+            self.cache.set(
+                query, result, top_k, insite, from_time, to_time,
+                kind=kind, admission=self.admission, namespace=CACHE_NAMESPACE
+            )
         return result
 
     def search_multi_site(
@@ -178,6 +447,363 @@ class AnspireSearchAgent:
             return None
         return self.cache.stats()
 
+    def get_retry_stats(self) -> Optional[Dict[str, Any]]:
+        """获取重试统计（未启用重试时为 None）"""
+        if self.retry_policy is None:
+            return None
+        return self.retry_policy.stats()
+
+    def get_rate_limit_stats(self) -> Optional[Dict[str, Any]]:
+        """获取限流统计与令牌桶状态（未启用限流时为 None）"""
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.stats()
+
+
+class AsyncAnspireSearchAgent(AnspireSearchAgent):
+    """
+    Anspire Search Agent 异步客户端
+
+    参数与返回值与 AnspireSearchAgent 相同，search 等方法为协程：
+    缓存读写在线程池中执行，不阻塞事件循环；HTTP 请求使用带连接池的
+    AsyncHTTPSession；任务被取消时正在进行的请求随之取消（合并的请求
+    在全部等待方都取消后才取消）。
+
+        async with AsyncAnspireSearchAgent() as agent:
+            result = await agent.search("AI")
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        enable_cache: bool = True,
+        enable_intent: bool = True,
+        stale_seconds: float = 0,
+        canonicalize_queries: bool = True,
+        raw_responses: bool = False,
+        admission: Optional[str] = None,
+        session: Optional["AsyncHTTPSession"] = None,
+        retry: Union[bool, "RetryPolicy"] = True,
+        rate_limit: Union[None, Dict[str, Any], "RateLimiter"] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None
+    ):
+        """
+        初始化客户端
+
+        Args:
+            session: 异步 HTTP 会话（可在多个客户端间共享），不传则在首次请求时
+                     创建，由 close() 关闭
+            其余参数同 AnspireSearchAgent
+        """
+        if AsyncHTTPSession is None:
+            raise RuntimeError("异步客户端不可用：缺少 async_http 模块")
+
+        super().__init__(
+            api_key=api_key,
+            enable_cache=enable_cache,
+            enable_intent=enable_intent,
+            stale_seconds=stale_seconds,
+            canonicalize_queries=canonicalize_queries,
+            raw_responses=raw_responses,
+            admission=admission,
+            session=session,
+            retry=retry,
+            rate_limit=rate_limit,
+            circuit_breaker=circuit_breaker
+        )
+        self.single_flight = _async_single_flight
+        self._owns_session = session is None
+
+    def _default_session(self):
+        """不创建同步会话：AsyncHTTPSession 在首次请求时创建"""
+        return None
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        insite: Optional[str] = None,
+        from_time: Optional[str] = None,
+        to_time: Optional[str] = None,
+        use_cache: bool = True,
+        verbose: bool = False,
+        stale_seconds: Optional[float] = None,
+        allow_negative: bool = True,
+        cache_only: bool = False,
+        deadline: Union[None, float, "Deadline"] = None
+    ) -> Optional[Dict[str, Any]]:
+        """执行搜索（参数与返回值同 AnspireSearchAgent.search）"""
+        raw_query, raw_insite = query, insite
+        query, insite = self._prepare(query, insite, verbose)
+        deadline = coerce_deadline(deadline)
+
+        if not (use_cache and self.cache):
+            if cache_only:
+                return None
+            return await self._fetch_shared(query, top_k, insite, from_time, to_time, store=False, deadline=deadline)
+
+        if stale_seconds is None:
+            stale_seconds = self.stale_seconds
+
+        with deadline_stage(deadline, "anspire.cache"):
+            cached = await asyncio.to_thread(
+                self.cache.lookup,
+                raw_query, top_k, raw_insite, from_time, to_time,
+                stale_seconds=stale_seconds,
+                allow_negative=allow_negative,
+                namespace=CACHE_NAMESPACE
+            )
+        if cached and cached.result:
+            return self._serve_cached(cached, query, top_k, insite, from_time, to_time, verbose)
+        elif verbose:
+            print("[缓存] 未命中")
+        if cache_only:
+            return None
+
+        result = await self._fetch_shared(query, top_k, insite, from_time, to_time, store=True, deadline=deadline)
+        if verbose:
+            print("[缓存] 已保存")
+        return result
+
+    def _refresher(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str]
+    ) -> Callable[[], Any]:
+        """后台刷新函数：刷新线程把请求提交回当前事件循环执行并等待"""
+        loop = asyncio.get_running_loop()
+        coroutine = lambda: self._fetch_and_store(query, top_k, insite, from_time, to_time, refresh=True)
+        return lambda: asyncio.run_coroutine_threadsafe(coroutine(), loop).result(REFRESH_TIMEOUT)
+
+    async def _fetch_shared(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        store: bool,
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """
+        请求 Anspire API，同一事件循环内并发的相同请求共享一次调用
+
+        截止时间到达时取消本调用方的等待（合并的请求在全部等待方都取消后才取消）。
+        """
+        if store:
+            fetch = lambda: self._fetch_and_store(query, top_k, insite, from_time, to_time, deadline)
+        else:
+            fetch = lambda: self._request(query, top_k, insite, from_time, to_time, deadline)
+
+        if deadline is not None:
+            deadline.check("anspire.fetch")
+        with deadline_stage(deadline, "anspire.fetch"):
+            if self.single_flight is None:
+                return await asyncio.wait_for(fetch(), wait_timeout(deadline))
+            return await asyncio.wait_for(
+                self.single_flight.do(("anspire", query, top_k, insite, from_time, to_time), fetch),
+                wait_timeout(deadline)
+            )
+
+    async def _request(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """请求 Anspire API：每次尝试先经过熔断器、再取限流令牌，可重试的错误按重试策略重试"""
+        async def fetch():
+            with breaker_attempt(self.circuit_breaker) as attempt:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(deadline, stage="anspire.ratelimit")
+                if attempt is not None:
+                    attempt.start()
+                return await self._fetch(query, top_k, insite, from_time, to_time, deadline)
+
+        if self.retry_policy is None:
+            return await fetch()
+        return await self.retry_policy.acall(fetch, deadline, stage="anspire.retry")
+
+    async def _fetch(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """请求 Anspire API"""
+        if self.session is None:
+            self.session = AsyncHTTPSession()
+        params = _request_params(query, top_k, insite, from_time, to_time)
+        timeout = deadline.timeouts() if deadline is not None else DEFAULT_TIMEOUT
+        response = await self.session.get(self.base_url, params=params, headers=self.headers, timeout=timeout)
+        response.raise_for_status()
+        if self.raw_responses:
+            return RawResult(response.content)
+        return response.json()
+
+    async def _fetch_and_store(
+        self,
+        query: str,
+        top_k: int,
+        insite: Optional[str],
+        from_time: Optional[str],
+        to_time: Optional[str],
+        deadline: Optional["Deadline"] = None,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """请求 Anspire API 并写入缓存（同 AnspireSearchAgent._fetch_and_store）"""
+        try:
+            result = await self._request(query, top_k, insite, from_time, to_time, deadline)
+        except requests.HTTPError as e:
+            if e.response is not None and not refresh:
+                await asyncio.to_thread(
+                    self.cache.set,
+                    query, _http_error_payload(e.response), top_k, insite, from_time, to_time,
+                    kind="http_error", admission=self.admission, namespace=CACHE_NAMESPACE
+                )
+            raise
+
+        kind = _result_kind(result)
+        if kind == "ok" or not refresh:
+            await asyncio.to_thread(
+                self.cache.set,
+                query, result, top_k, insite, from_time, to_time,
+                kind=kind, admission=self.admission, namespace=CACHE_NAMESPACE
+            )
+        return result
+
+    async def search_multi_site(
+        self,
+        query: str,
+        sites: List[str],
+        top_k: int = 10,
+        use_cache: bool = True,
+        verbose: bool = False
+    ) -> Dict[str, Any]:
+        """多站内搜索（参数与返回值同 AnspireSearchAgent.search_multi_site）"""
+        insite = ",".join(sites[:20])  # 最多20个站点
+        return await self.search(query, top_k=top_k, insite=insite, use_cache=use_cache, verbose=verbose)
+
+    async def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """获取缓存统计"""
+        if not self.cache:
+            return None
+        return await asyncio.to_thread(self.cache.stats)
+
+    async def close(self) -> None:
+        """关闭客户端自己创建的 HTTP 会话"""
+        if self._owns_session and self.session is not None:
+            session, self.session = self.session, None
+            await session.close()
+
+    async def __aenter__(self) -> "AsyncAnspireSearchAgent":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _request_params(
+    query: str,
+    top_k: int,
+    insite: Optional[str],
+    from_time: Optional[str],
+    to_time: Optional[str]
+) -> Dict[str, str]:
+    """Anspire API 请求参数"""
+    params = {
+        "query": query[:64],  # 限制64字符
+        "top_k": str(top_k)
+    }
+
+    # 站内搜索（可用）
+    if insite:
+        params["Insite"] = insite
+
+    # 时间范围（需要使用正确格式）
+    if from_time:
+        params["FromTime"] = from_time
+    if to_time:
+        params["ToTime"] = to_time
+
+    return params
+
+
+# 原始响应只扫描字节判断类型，不解析 JSON
+_RAW_RESULTS = re.compile(rb'"results"\s*:')
+_RAW_EMPTY_RESULTS = re.compile(rb'"results"\s*:\s*\[\s*\]')
+_RAW_DETAIL = re.compile(rb'"detail"\s*:')
+
+
+def _result_kind(result: Dict[str, Any]) -> str:
+    """判断响应类型：ok / empty（无结果）/ error（带 detail 的错误响应）"""
+    if RawResult is not None and isinstance(result, RawResult) and not result.parsed:
+        raw = result.raw
+        if _RAW_RESULTS.search(raw) is None:
+            return "error" if _RAW_DETAIL.search(raw) else "ok"
+        return "empty" if _RAW_EMPTY_RESULTS.search(raw) else "ok"
+    if "results" not in result:
+        return "error" if "detail" in result else "ok"
+    return "ok" if result["results"] else "empty"
+
+
+def _http_error_payload(response: requests.Response) -> Dict[str, Any]:
+    """HTTP 错误响应的负缓存内容"""
+    return {
+        "status_code": response.status_code,
+        "reason": response.reason,
+        "url": response.url
+    }
+
+
+def _cached_http_error(payload: Dict[str, Any]) -> requests.HTTPError:
+    """由负缓存内容还原 HTTPError"""
+    response = requests.Response()
+    response.status_code = payload.get("status_code")
+    response.reason = payload.get("reason")
+    response.url = payload.get("url")
+    return requests.HTTPError(
+        f"{response.status_code} Error: {response.reason} for url: {response.url} (cached)",
+        response=response
+    )
+
+
+def write_raw(result: Dict[str, Any], stream=None) -> None:
+    """
+    输出原始 JSON
+
+    RawResult 直接写出响应字节（不经过 JSON 编解码），其余结果（含截取过的
+    RawResult）序列化后输出。stream 可以是文本流或二进制流：文本流有底层
+    buffer 时字节直接写入 buffer，否则解码为文本写入。
+    """
+    stream = stream or sys.stdout
+    binary = isinstance(stream, (io.RawIOBase, io.BufferedIOBase))
+    if RawResult is not None and isinstance(result, RawResult) and result.limit is None:
+        data = result.raw + b"\n"
+        if binary:
+            stream.write(data)
+        elif getattr(stream, "buffer", None) is not None:
+            stream.flush()
+            stream.buffer.write(data)
+            stream.buffer.flush()
+        else:
+            stream.write(data.decode("utf-8"))
+        return
+
+    if RawResult is not None and isinstance(result, RawResult):
+        result = result.data
+    text = json.dumps(result, ensure_ascii=False, indent=2) + "\n"
+    stream.write(text.encode("utf-8") if binary else text)
+
 
 def format_result(result: Dict[str, Any]) -> str:
     """
@@ -233,7 +859,7 @@ def main():
     args = parser.parse_args()
 
     try:
-        agent = AnspireSearchAgent(enable_cache=not args.no_cache)
+        agent = AnspireSearchAgent(enable_cache=not args.no_cache, raw_responses=args.raw)
 
         # 缓存统计
         if args.cache_stats:
@@ -275,7 +901,7 @@ def main():
         )
 
         if args.raw:
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+            write_raw(result)
         else:
             print(format_result(result))
 
@@ -11,19 +11,82 @@ API: https://api.search.brave.com/res/v1/web/search
 import os
 import sys
 import json
+import asyncio
 import requests
-from typing import Optional, List, Dict, Any
+from typing import Optional, Dict, Any, Union
+
+try:
+    from single_flight import SingleFlight
+except ImportError:
+    SingleFlight = None
+
+try:
+    from search_cache import get_default_cache
+except ImportError:
+    get_default_cache = None
+
+try:
+    from http_session import get_session
+except ImportError:
+    get_session = None
+
+try:
+    from deadline import read_body
+except ImportError:
+    read_body = None
+
+from engine_support import (
+    DEFAULT_TIMEOUT,
+    breaker_attempt,
+    coerce_deadline,
+    deadline_stage,
+    make_rate_limiter,
+    make_retry_policy,
+    wait_timeout
+)
+
+try:
+    from async_http import AsyncHTTPSession
+    from single_flight import AsyncSingleFlight
+except ImportError:
+    AsyncHTTPSession = None
+    AsyncSingleFlight = None
+
+
+# 进程内共享：不同客户端实例的相同请求也会合并
+_single_flight = SingleFlight() if SingleFlight is not None else None
+_async_single_flight = AsyncSingleFlight() if AsyncSingleFlight is not None else None
 
 
 class BraveSearchClient:
     """Brave Search API 客户端"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        enable_cache: bool = True,
+        admission: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        retry: Union[bool, "RetryPolicy"] = True,
+        rate_limit: Union[None, Dict[str, Any], "RateLimiter"] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None
+    ):
         """
         初始化客户端
 
         Args:
             api_key: API Key，如不传则从环境变量 BRAVE_API_KEY 读取
+            enable_cache: 是否启用缓存（与 Anspire 共享默认缓存的后端与淘汰策略）
+            admission: 写入缓存的准入策略（always / tinylfu），不传则使用缓存的默认策略
+            session: HTTP 会话，不传则使用按引擎共享的连接池会话
+            retry: 429 / 5xx / 连接错误的重试策略，True 使用默认 RetryPolicy，False 不重试；
+                   429 时按 Retry-After 或 X-RateLimit-Reset 等待
+            rate_limit: 客户端限流，RateLimiter 或 get_rate_limiter 的参数（如
+                        {"rate": 1, "path": "/var/tmp/ratelimit.db"}），按 API Key 共享令牌桶，
+                        并按响应的 X-RateLimit-* 头自动校准（{} 表示完全依赖校准）；
+                        None 表示不限流
+            circuit_breaker: 熔断器（CircuitBreaker），统计每次上游请求的结果与耗时，
+                             打开时不再请求上游而是抛出 CircuitOpenError（缓存命中不受影响）
         """
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY")
         if not self.api_key:
@@ -36,6 +99,30 @@ class BraveSearchClient:
             "X-Subscription-Token": self.api_key
         }
 
+        # 并发相同请求合并为一次 HTTP 调用
+        self.single_flight = _single_flight
+
+        # 连接复用：同一进程内的 Brave 客户端共享一个会话
+        self.session = session if session is not None else self._default_session()
+
+        # 可重试的错误在单次调用内重试（合并的请求共享重试）
+        self.retry_policy = make_retry_policy(retry)
+
+        # 每次请求（含重试）前取令牌，同一 API Key 的客户端共享令牌桶
+        self.rate_limiter = make_rate_limiter("brave", self.api_key, rate_limit)
+
+        # 熔断器只包住上游请求：熔断期间缓存命中照常返回
+        self.circuit_breaker = circuit_breaker
+
+        # 初始化缓存
+        self.enable_cache = enable_cache and get_default_cache is not None
+        self.cache = get_default_cache() if self.enable_cache else None
+        self.admission = admission
+
+    def _default_session(self):
+        """未传会话时使用的 HTTP 会话"""
+        return get_session("brave") if get_session is not None else requests
+
     def search(
         self,
         query: str,
@@ -47,8 +134,11 @@ class BraveSearchClient:
         freshness: Optional[str] = None,
         country: str = "CN",
         text_decorations: bool = True,
-        spellcheck: bool = True
-    ) -> Dict[str, Any]:
+        spellcheck: bool = True,
+        use_cache: bool = True,
+        cache_only: bool = False,
+        deadline: Union[None, float, "Deadline"] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         执行搜索
 
@@ -63,29 +153,100 @@ class BraveSearchClient:
             country: 结果国家代码（默认 CN）
             text_decorations: 是否返回文本装饰
             spellcheck: 是否启用拼写检查
+            use_cache: 是否使用缓存
+            cache_only: 只读缓存，未命中时返回 None，不请求上游
+            deadline: 端到端截止时间（秒数或 Deadline），HTTP 请求的连接 / 读取超时
+                      由剩余预算拆分；不传时使用默认超时
 
         Returns:
-            搜索结果字典
+            搜索结果字典；cache_only 且未命中时为 None
+
+        Raises:
+            DeadlineExceeded: 截止时间已到（requests.Timeout 的子类，stage 为超时阶段）
         """
-        params = {
-            "q": query,
-            "count": min(count, 20),  # Brave 限制最多 20
-            "offset": offset,
-            "country": country,
-            "text_decorations": str(text_decorations).lower(),
-            "spellcheck": str(spellcheck).lower(),
-            "safesearch": safesearch
-        }
+        params = _request_params(
+            query, count, offset, search_lang, result_filter, safesearch,
+            freshness, country, text_decorations, spellcheck
+        )
+
+        deadline = coerce_deadline(deadline)
+
+        if not (use_cache and self.cache):
+            if cache_only:
+                return None
+            return self._fetch_shared(params, store=False, deadline=deadline)
 
-        # 可选参数
-        if search_lang:
-            params["search_lang"] = search_lang
-        if result_filter:
-            params["result_filter"] = result_filter
-        if freshness:
-            params["freshness"] = freshness
+        with deadline_stage(deadline, "brave.cache"):
+            cached = self._lookup(query, params)
+        if cached is not None or cache_only:
+            return cached
+        return self._fetch_shared(params, store=True, deadline=deadline)
 
-        response = requests.get(self.base_url, params=params, headers=self.headers)
+    def _lookup(self, query: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """读缓存：正常结果与空结果的负缓存（有效期短）都直接返回，未命中为 None"""
+        cached = self.cache.lookup(query, top_k=0, stale_seconds=0, namespace=_cache_namespace(params))
+        return cached.result if cached is not None else None
+
+    def _fetch_shared(
+        self,
+        params: Dict[str, Any],
+        store: bool,
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """请求 Brave API，并发的相同请求共享一次调用（等待同样受截止时间约束）"""
+        if store:
+            fetch = lambda: self._fetch_and_store(params, deadline)
+        else:
+            fetch = lambda: self._request(params, deadline)
+
+        if deadline is not None:
+            deadline.check("brave.fetch")
+        with deadline_stage(deadline, "brave.fetch"):
+            if self.single_flight is None:
+                return fetch()
+
+            flight_key = ("brave",) + tuple(sorted(params.items()))
+            return self.single_flight.do(flight_key, fetch, timeout=wait_timeout(deadline))
+
+    def _fetch_and_store(self, params: Dict[str, Any], deadline: Optional["Deadline"] = None) -> Dict[str, Any]:
+        """请求 Brave API 并写入缓存（没有结果时按空结果负缓存写入，有效期短）"""
+        result = self._request(params, deadline)
+        self.cache.set(
+            params["q"], result, top_k=0, kind=_result_kind(result),
+            admission=self.admission, namespace=_cache_namespace(params)
+        )
+        return result
+
+    def _request(self, params: Dict[str, Any], deadline: Optional["Deadline"] = None) -> Dict[str, Any]:
+        """
+        请求 Brave API：每次尝试先经过熔断器、再取限流令牌，可重试的错误按重试策略重试
+
+        限流与重试的等待都计入截止时间；熔断器只统计请求本身的耗时。
+        """
+        def fetch():
+            with breaker_attempt(self.circuit_breaker) as attempt:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(deadline, stage="brave.ratelimit")
+                if attempt is not None:
+                    attempt.start()
+                return self._fetch(params, deadline)
+
+        if self.retry_policy is None:
+            return fetch()
+        return self.retry_policy.call(fetch, deadline, stage="brave.retry")
+
+    def _fetch(self, params: Dict[str, Any], deadline: Optional["Deadline"] = None) -> Dict[str, Any]:
+        """请求 Brave API（响应体逐块读取，截止时间已过即放弃）"""
+        if deadline is None:
+            response = self.session.get(self.base_url, params=params, headers=self.headers, timeout=DEFAULT_TIMEOUT)
+        else:
+            response = self.session.get(
+                self.base_url, params=params, headers=self.headers,
+                timeout=deadline.timeouts(), stream=True
+            )
+            read_body(response, deadline)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response.headers)
         response.raise_for_status()
         return response.json()
 
@@ -93,7 +254,8 @@ class BraveSearchClient:
         self,
         query: str,
         count: int = 10,
-        freshness: str = "pw"  # past week
+        freshness: str = "pw",  # past week
+        deadline: Union[None, float, "Deadline"] = None
     ) -> Dict[str, Any]:
         """
         新闻搜索
@@ -102,6 +264,7 @@ class BraveSearchClient:
             query: 搜索查询字符串
             count: 返回结果数量
             freshness: 时间新鲜度（p1d=past day, pw=past week, pm=past month, py=past year）
+            deadline: 端到端截止时间（秒数或 Deadline）
 
         Returns:
             搜索结果字典
@@ -112,15 +275,251 @@ class BraveSearchClient:
             query=query,
             count=count,
             freshness=freshness,
-            search_lang="zh-hans"  # Brave API 使用 zh-hans 而不是 zh-CN
+            search_lang="zh-hans",  # Brave API 使用 zh-hans 而不是 zh-CN
+            deadline=deadline
         )
+        return _ensure_news(result)
+
+    def get_retry_stats(self) -> Optional[Dict[str, Any]]:
+        """获取重试统计（未启用重试时为 None）"""
+        if self.retry_policy is None:
+            return None
+        return self.retry_policy.stats()
 
-        # 确保 news 字段存在
-        if "news" not in result:
-            result["news"] = {"results": []}
+    def get_rate_limit_stats(self) -> Optional[Dict[str, Any]]:
+        """获取限流统计与令牌桶状态（未启用限流时为 None）"""
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.stats()
 
+
+class AsyncBraveSearchClient(BraveSearchClient):
+    """
+    Brave Search API 异步客户端
+
+    参数与返回值与 BraveSearchClient 相同，search / search_news 为协程：
+    缓存读写在线程池中执行，HTTP 请求使用带连接池的 AsyncHTTPSession，
+    任务取消时请求随之取消。
+
+        async with AsyncBraveSearchClient() as client:
+            result = await client.search("AI")
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        enable_cache: bool = True,
+        admission: Optional[str] = None,
+        session: Optional["AsyncHTTPSession"] = None,
+        retry: Union[bool, "RetryPolicy"] = True,
+        rate_limit: Union[None, Dict[str, Any], "RateLimiter"] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None
+    ):
+        """
+        初始化客户端
+
+        Args:
+            session: 异步 HTTP 会话（可在多个客户端间共享），不传则在首次请求时
+                     创建，由 close() 关闭
+            其余参数同 BraveSearchClient
+        """
+        if AsyncHTTPSession is None:
+            raise RuntimeError("异步客户端不可用：缺少 async_http 模块")
+
+        super().__init__(
+            api_key=api_key,
+            enable_cache=enable_cache,
+            admission=admission,
+            session=session,
+            retry=retry,
+            rate_limit=rate_limit,
+            circuit_breaker=circuit_breaker
+        )
+        self.single_flight = _async_single_flight
+        self._owns_session = session is None
+
+    def _default_session(self):
+        """不创建同步会话：AsyncHTTPSession 在首次请求时创建"""
+        return None
+
+    async def search(
+        self,
+        query: str,
+        count: int = 10,
+        offset: int = 0,
+        search_lang: Optional[str] = None,
+        result_filter: Optional[str] = None,
+        safesearch: str = "moderate",
+        freshness: Optional[str] = None,
+        country: str = "CN",
+        text_decorations: bool = True,
+        spellcheck: bool = True,
+        use_cache: bool = True,
+        cache_only: bool = False,
+        deadline: Union[None, float, "Deadline"] = None
+    ) -> Optional[Dict[str, Any]]:
+        """执行搜索（参数与返回值同 BraveSearchClient.search）"""
+        params = _request_params(
+            query, count, offset, search_lang, result_filter, safesearch,
+            freshness, country, text_decorations, spellcheck
+        )
+
+        deadline = coerce_deadline(deadline)
+
+        if not (use_cache and self.cache):
+            if cache_only:
+                return None
+            return await self._fetch_shared(params, store=False, deadline=deadline)
+
+        with deadline_stage(deadline, "brave.cache"):
+            cached = await asyncio.to_thread(self._lookup, query, params)
+        if cached is not None or cache_only:
+            return cached
+        return await self._fetch_shared(params, store=True, deadline=deadline)
+
+    async def _fetch_shared(
+        self,
+        params: Dict[str, Any],
+        store: bool,
+        deadline: Optional["Deadline"] = None
+    ) -> Dict[str, Any]:
+        """请求 Brave API，同一事件循环内并发的相同请求共享一次调用（截止时间到达时取消等待）"""
+        if store:
+            fetch = lambda: self._fetch_and_store(params, deadline)
+        else:
+            fetch = lambda: self._request(params, deadline)
+
+        if deadline is not None:
+            deadline.check("brave.fetch")
+        with deadline_stage(deadline, "brave.fetch"):
+            if self.single_flight is None:
+                return await asyncio.wait_for(fetch(), wait_timeout(deadline))
+
+            flight_key = ("brave",) + tuple(sorted(params.items()))
+            return await asyncio.wait_for(self.single_flight.do(flight_key, fetch), wait_timeout(deadline))
+
+    async def _fetch_and_store(self, params: Dict[str, Any], deadline: Optional["Deadline"] = None) -> Dict[str, Any]:
+        """请求 Brave API 并写入缓存（没有结果时按空结果负缓存写入，有效期短）"""
+        result = await self._request(params, deadline)
+        await asyncio.to_thread(
+            self.cache.set,
+            params["q"], result, top_k=0, kind=_result_kind(result),
+            admission=self.admission, namespace=_cache_namespace(params)
+        )
         return result
 
+    async def _request(self, params: Dict[str, Any], deadline: Optional["Deadline"] = None) -> Dict[str, Any]:
+        """请求 Brave API：每次尝试先经过熔断器、再取限流令牌，可重试的错误按重试策略重试"""
+        async def fetch():
+            with breaker_attempt(self.circuit_breaker) as attempt:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(deadline, stage="brave.ratelimit")
+                if attempt is not None:
+                    attempt.start()
+                return await self._fetch(params, deadline)
+
+        if self.retry_policy is None:
+            return await fetch()
+        return await self.retry_policy.acall(fetch, deadline, stage="brave.retry")
+
+    async def _fetch(self, params: Dict[str, Any], deadline: Optional["Deadline"] = None) -> Dict[str, Any]:
+        """请求 Brave API"""
+        if self.session is None:
+            self.session = AsyncHTTPSession()
+        timeout = deadline.timeouts() if deadline is not None else DEFAULT_TIMEOUT
+        response = await self.session.get(self.base_url, params=params, headers=self.headers, timeout=timeout)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response.headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def search_news(
+        self,
+        query: str,
+        count: int = 10,
+        freshness: str = "pw",
+        deadline: Union[None, float, "Deadline"] = None
+    ) -> Dict[str, Any]:
+        """新闻搜索（参数与返回值同 BraveSearchClient.search_news）"""
+        result = await self.search(
+            query=query,
+            count=count,
+            freshness=freshness,
+            search_lang="zh-hans",
+            deadline=deadline
+        )
+        return _ensure_news(result)
+
+    async def close(self) -> None:
+        """关闭客户端自己创建的 HTTP 会话"""
+        if self._owns_session and self.session is not None:
+            session, self.session = self.session, None
+            await session.close()
+
+    async def __aenter__(self) -> "AsyncBraveSearchClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _request_params(
+    query: str,
+    count: int,
+    offset: int,
+    search_lang: Optional[str],
+    result_filter: Optional[str],
+    safesearch: str,
+    freshness: Optional[str],
+    country: str,
+    text_decorations: bool,
+    spellcheck: bool
+) -> Dict[str, Any]:
+    """Brave API 请求参数"""
+    params = {
+        "q": query,
+        "count": min(count, 20),  # Brave 限制最多 20
+        "offset": offset,
+        "country": country,
+        "text_decorations": str(text_decorations).lower(),
+        "spellcheck": str(spellcheck).lower(),
+        "safesearch": safesearch
+    }
+
+    # 可选参数
+    if search_lang:
+        params["search_lang"] = search_lang
+    if result_filter:
+        params["result_filter"] = result_filter
+    if freshness:
+        params["freshness"] = freshness
+
+    return params
+
+
+def _result_kind(result: Dict[str, Any]) -> str:
+    """响应类型：ok，或各结果列表（web / news 等）都为空时的 empty（按负缓存短期保存）"""
+    sections = (section for section in result.values() if isinstance(section, dict))
+    return "ok" if any(section.get("results") for section in sections) else "empty"
+
+
+def _ensure_news(result: Dict[str, Any]) -> Dict[str, Any]:
+    """确保 news 字段存在（复制一份，不修改缓存中的对象）"""
+    if "news" not in result:
+        result = dict(result, news={"results": []})
+    return result
+
+
+def _cache_namespace(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    缓存键命名空间：引擎名加上除查询外的全部请求参数
+
+    count 也在其中：Brave 结果分 web / news 等多个列表，不按 top_k 截取复用。
+    """
+    namespace = {key: value for key, value in params.items() if key != "q"}
+    namespace["engine"] = "brave"
+    return namespace
+
 
 def format_result(result: Dict[str, Any]) -> str:
     """
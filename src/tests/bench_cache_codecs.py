@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+缓存条目编码基准
+
+对每种可用编码写入 / 读取一批模拟的 Anspire 结果（长 content 字段），
+报告平均条目大小与 set / get 延迟。内存层关闭，读取全部走持久层。
+
+用法:
+    python bench_cache_codecs.py [--backend file|sqlite] [--entries 200] [--results 10]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from cache_codecs import available_codecs
+from search_cache import SearchCache
+
+
+def make_result(rng: random.Random, results: int) -> dict:
+    """模拟 Anspire 响应：标题、URL 与数 KB 的正文摘要"""
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(400)]
+    return {
+        "results": [
+            {
+                "title": " ".join(rng.choices(words, k=8)),
+                "url": f"https://example.com/{i}/{rng.choice(words)}",
+                "content": " ".join(rng.choices(words, k=600)) + " 搜索结果正文" * 20,
+                "score": rng.random(),
+                "date": "2025-01-01"
+            }
+            for i in range(results)
+        ]
+    }
+
+
+def bench(codec: str, backend: str, payloads: list) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SearchCache(cache_dir=tmp_dir, backend=backend, codec=codec, memory_max_entries=0)
+
+        start = time.perf_counter()
+        for i, result in enumerate(payloads):
+            cache.set(f"query {i}", result)
+        set_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(len(payloads)):
+            if cache.get(f"query {i}") is None:
+                raise RuntimeError(f"{codec}: 条目 {i} 未命中")
+        get_seconds = time.perf_counter() - start
+
+        size_bytes = cache.stats()["size_bytes"]
+
+    return {
+        "codec": codec,
+        "size": size_bytes / len(payloads),
+        "set_ms": set_seconds * 1000 / len(payloads),
+        "get_ms": get_seconds * 1000 / len(payloads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存条目编码基准")
+    parser.add_argument("--backend", choices=["file", "sqlite"], default="file")
+    parser.add_argument("--entries", type=int, default=200, help="条目数")
+    parser.add_argument("--results", type=int, default=10, help="每个条目的结果数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    payloads = [make_result(rng, args.results) for _ in range(args.entries)]
+
+    print(f"后端: {args.backend}, 条目: {args.entries}, 每条结果数: {args.results}")
+    print(f"{'编码':<8} {'平均大小(KB)':>12} {'set(ms)':>9} {'get(ms)':>9}")
+    for codec in available_codecs():
+        row = bench(codec, args.backend, payloads)
+        print(f"{row['codec']:<8} {row['size'] / 1024:>12.1f} {row['set_ms']:>9.3f} {row['get_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+HTTP 连接复用基准
+
+对本地替身服务（HTTP/1.1、keep-alive、gzip）比较每次 requests.get 新建连接
+与共享会话复用连接的单请求平均延迟，分顺序请求与多线程并发两种情况，
+并给出服务端实际建立的连接数。
+
+本地回环上没有 TLS，也几乎没有网络往返，结果只体现 TCP 建连与会话对象
+的开销；访问真实 HTTPS 接口时握手省下的时间会大得多。
+
+用法:
+    python bench_http_session.py [--requests 500] [--threads 8] [--delay 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+
+from http_session import create_session
+from stub_server import StubServer
+
+
+def run(fetch, url: str, total: int, threads: int) -> float:
+    """执行 total 个请求，返回单请求平均耗时（毫秒）"""
+    params = {"query": "bench", "top_k": 10}
+
+    def one(_):
+        response = fetch(url, params=params)
+        response.raise_for_status()
+        response.json()
+
+    start = time.perf_counter()
+    if threads <= 1:
+        for i in range(total):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(one, range(total)))
+    return (time.perf_counter() - start) / total * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 连接复用基准")
+    parser.add_argument("--requests", type=int, default=500, help="每种情况的请求数")
+    parser.add_argument("--threads", type=int, default=8, help="并发情况下的线程数")
+    parser.add_argument("--delay", type=float, default=0, help="服务端每个请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    print(f"请求数: {args.requests}, 线程数: {args.threads}, 服务端延迟: {args.delay}s")
+    print(f"{'方式':<16} {'线程':>4} {'平均(ms)':>10} {'连接数':>8}")
+
+    for threads in (1, args.threads):
+        for name in ("requests.get", "shared session"):
+            with StubServer(delay=args.delay) as server:
+                if name == "requests.get":
+                    fetch = requests.get
+                    session = None
+                else:
+                    session = create_session(pool_maxsize=max(threads, 1))
+                    fetch = session.get
+                mean_ms = run(fetch, server.url, args.requests, threads)
+                if session is not None:
+                    session.close()
+                print(f"{name:<16} {threads:>4} {mean_ms:>10.3f} {server.connections:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+缓存准入策略模拟
+
+按顺序回放查询日志：每个查询先 lookup，未命中则 set 一个模拟结果，
+统计 always（原有行为）与 tinylfu 两种准入策略下持久层的命中率。
+内存层关闭，命中全部来自有容量上限的持久层。
+
+查询日志每行一个查询（或 JSONL，取 "query" 字段）；不提供时生成
+合成日志：少量热门查询按 Zipf 分布重复出现，夹杂大量只出现一次的长尾查询。
+
+用法:
+    python simulate_admission.py [--log queries.txt] [--capacity 200] [--policy lru|lfu]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from search_cache import SearchCache
+
+
+def load_log(path: str) -> list:
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line)["query"]
+            queries.append(line)
+    return queries
+
+
+def synthetic_log(length: int, hot: int, one_off_ratio: float, seed: int = 42) -> list:
+    """热门查询按 Zipf(s=1) 抽样，one_off_ratio 比例的查询只出现一次"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, hot + 1)]
+    queries = []
+    for i in range(length):
+        if rng.random() < one_off_ratio:
+            queries.append(f"long tail question {i}")
+        else:
+            queries.append(f"hot query {rng.choices(range(hot), weights)[0]}")
+    return queries
+
+
+def replay(queries: list, admission: str, capacity: int, eviction_policy: str, backend: str) -> dict:
+    result = {"results": [{"title": "simulated", "content": "x" * 200}]}
+    hits = 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SearchCache(
+            cache_dir=tmp_dir,
+            backend=backend,
+            memory_max_entries=0,
+            max_entries=capacity,
+            eviction_policy=eviction_policy,
+            admission_policy=admission,
+            bloom_filter=False
+        )
+
+        start = time.perf_counter()
+        for query in queries:
+            if cache.get(query) is not None:
+                hits += 1
+            else:
+                cache.set(query, result)
+        elapsed = time.perf_counter() - start
+        stats = cache.stats()
+
+    return {
+        "admission": admission,
+        "hit_rate": hits / len(queries),
+        "rejected": stats["admission"]["rejected"],
+        "evictions": stats["evictions"],
+        "seconds": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存准入策略模拟")
+    parser.add_argument("--log", help="查询日志（每行一个查询或 JSONL），不传则使用合成日志")
+    parser.add_argument("--length", type=int, default=20000, help="合成日志长度")
+    parser.add_argument("--hot", type=int, default=500, help="合成日志中的热门查询数")
+    parser.add_argument("--one-off", type=float, default=0.6, help="合成日志中一次性查询的比例")
+    parser.add_argument("--capacity", type=int, default=200, help="持久层最大条目数")
+    parser.add_argument("--policy", choices=["lru", "lfu"], default="lru", help="淘汰策略")
+    parser.add_argument("--backend", choices=["file", "sqlite"], default="sqlite")
+    args = parser.parse_args()
+
+    if args.log:
+        queries = load_log(args.log)
+    else:
+        queries = synthetic_log(args.length, args.hot, args.one_off)
+
+    print(f"查询数: {len(queries)}, 不同查询: {len(set(queries))}, "
+          f"容量: {args.capacity}, 淘汰: {args.policy}, 后端: {args.backend}")
+    print(f"{'准入':<8} {'命中率':>8} {'拒绝写入':>8} {'淘汰':>8} {'耗时(s)':>8}")
+    for admission in ("always", "tinylfu"):
+        row = replay(queries, admission, args.capacity, args.policy, args.backend)
+        print(f"{row['admission']:<8} {row['hit_rate']:>8.2%} {row['rejected']:>8} "
+              f"{row['evictions']:>8} {row['seconds']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
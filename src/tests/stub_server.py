@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+本地 HTTP 替身服务
+
+代替 Anspire / Brave 接口供测试与基准使用的 HTTP/1.1 服务：支持
+keep-alive 与 gzip，统计连接数和请求数，响应内容由 handler 函数决定。
+StubServer 在后台线程中运行；AsyncStubServer 运行在调用方的事件循环上，
+供异步客户端测试使用。FaultInjector 按顺序注入 429 / 5xx / 断开连接等故障。
+
+    with StubServer() as server:
+        agent.base_url = server.url
+        ...
+        print(server.connections, server.requests)
+
+    faults = FaultInjector([503, (429, {"Retry-After": "1"}), DROP])
+    with StubServer(faults) as server:
+        ...
+
+    async with AsyncStubServer() as server:
+        ...
+"""
+
+import asyncio
+import gzip
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+# handler(path, params, headers) -> (status, 响应头, 响应体)；响应体为 dict 时按 JSON 编码，
+# status 为 DROP 时不响应，直接断开连接
+Handler = Callable[[str, Dict[str, str], Dict[str, str]], Tuple[int, Dict[str, str], Any]]
+
+DROP = "drop"
+
+
+def default_handler(path: str, params: Dict[str, str], headers: Dict[str, str]):
+    """返回与 Anspire 结构相同的结果，带一段较长的正文以体现 gzip"""
+    query = params.get("query") or params.get("q", "")
+    return 200, {}, {
+        "results": [
+            {"title": f"{query} {i}", "url": f"https://example.com/{i}", "content": "content " * 100}
+            for i in range(int(params.get("top_k") or params.get("count") or 10))
+        ]
+    }
+
+
+class FaultInjector:
+    """按顺序为每个请求注入一个故障，故障用完后交给 handler 正常响应"""
+
+    def __init__(self, faults: List[Any], handler: Optional[Handler] = None):
+        """
+        Args:
+            faults: 每项对应一个请求：状态码、(状态码, 响应头)、DROP，None 表示正常响应
+            handler: 正常响应使用的 handler，默认 default_handler
+        """
+        self.faults = list(faults)
+        self.handler = handler or default_handler
+        self.served: List[Any] = []  # 每个请求实际返回的状态码（或 DROP）
+        self._lock = threading.Lock()
+
+    def __call__(self, path: str, params: Dict[str, str], headers: Dict[str, str]):
+        with self._lock:
+            fault = self.faults.pop(0) if self.faults else None
+
+        if fault is None:
+            status, extra_headers, body = self.handler(path, params, headers)
+        elif fault == DROP:
+            status, extra_headers, body = DROP, {}, None
+        else:
+            status, extra_headers = fault if isinstance(fault, tuple) else (fault, {})
+            body = {"error": HTTPStatus(status).phrase}
+
+        with self._lock:
+            self.served.append(status)
+        return status, extra_headers, body
+
+
+def render(status: int, extra_headers: Dict[str, str], body: Any, accept_encoding: str) -> Tuple[Dict[str, str], bytes]:
+    """handler 返回值 → (响应头, 响应体)；客户端接受 gzip 时压缩"""
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if "gzip" in accept_encoding:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    headers["Content-Length"] = str(len(body))
+    headers.update(extra_headers)
+    return headers, body
+
+
+class StubServer:
+    """本地 HTTP 替身服务"""
+
+    def __init__(self, handler: Optional[Handler] = None, delay: float = 0):
+        """
+        Args:
+            handler: 响应函数，默认 default_handler
+            delay: 每个请求处理前的等待（秒），模拟上游延迟
+        """
+        self.handler = handler or default_handler
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def _make_handler(self):
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头与响应体分两次写出，不关闭 Nagle 时 keep-alive 连接上会遇到 40ms 的延迟确认
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                if stub.delay:
+                    threading.Event().wait(stub.delay)
+
+                parts = urlsplit(self.path)
+                params = dict(parse_qsl(parts.query))
+                headers = {k.lower(): v for k, v in self.headers.items()}
+                status, extra_headers, body = stub.handler(parts.path, params, headers)
+                if status == DROP:
+                    self.close_connection = True
+                    return
+
+                response_headers, body = render(status, extra_headers, body, headers.get("accept-encoding", ""))
+
+                self.send_response(status)
+                for name, value in response_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return RequestHandler
+
+    def start(self) -> "StubServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class AsyncStubServer:
+    """运行在当前事件循环上的本地 HTTP 替身服务"""
+
+    def __init__(self, handler: Optional[Handler] = None, delay: float = 0):
+        """
+        Args:
+            handler: 响应函数，默认 default_handler
+            delay: 每个请求处理前的等待（秒），模拟上游延迟
+        """
+        self.handler = handler or default_handler
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.cancelled = 0  # 客户端在响应前断开的请求数
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._handlers = set()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/search"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                self.requests += 1
+                if self.delay:
+                    # 等待期间客户端断开（请求被取消）则不再响应
+                    try:
+                        await asyncio.wait_for(reader.read(1), self.delay)
+                        self.cancelled += 1
+                        return
+                    except asyncio.TimeoutError:
+                        pass
+
+                parts = urlsplit(request_line.decode("latin-1").split(" ")[1])
+                status, extra_headers, body = self.handler(parts.path, dict(parse_qsl(parts.query)), headers)
+                if status == DROP:
+                    return
+                response_headers, body = render(status, extra_headers, body, headers.get("accept-encoding", ""))
+                head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n" + "".join(
+                    f"{name}: {value}\r\n" for name, value in response_headers.items()
+                ) + "\r\n"
+                writer.write(head.encode("latin-1") + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def start(self) -> "AsyncStubServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # 结束仍保持 keep-alive 的连接，否则 wait_closed 会一直等待
+            handlers = list(self._handlers)
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "AsyncStubServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
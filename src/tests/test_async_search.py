@@ -0,0 +1,846 @@
+#!/usr/bin/env python3
+"""
+异步客户端测试
+
+AsyncAnspireSearchAgent / AsyncBraveSearchClient / AsyncUnifiedSearchClient
+对本地 asyncio 替身服务运行，不需要 API Key。
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import requests
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from anspire_search import AsyncAnspireSearchAgent, CACHE_NAMESPACE
+from async_http import AsyncHTTPSession
+from brave_search import AsyncBraveSearchClient
+from deadline import Deadline, DeadlineExceeded
+from search_cache import SearchCache
+from retry_policy import RetryPolicy
+from stub_server import AsyncStubServer, FaultInjector
+from circuit_breaker import CircuitOpenError
+from unified_search import AsyncUnifiedSearchClient, SearchEngine
+
+
+def brave_handler(path, params, headers):
+    """返回与 Brave 结构相同的结果"""
+    return 200, {}, {
+        "web": {"results": [
+            {"title": f"{params['q']} {i}", "url": f"https://example.com/{i}", "description": "brave"}
+            for i in range(int(params["count"]))
+        ]}
+    }
+
+
+def test_async_anspire():
+    """测试 Anspire 异步客户端：缓存与连接复用"""
+    print("=== 测试 Anspire 异步客户端 ===")
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            async with AsyncStubServer() as server:
+                async with AsyncAnspireSearchAgent(api_key="test-key") as agent:
+                    agent.base_url = server.url
+                    agent.cache = SearchCache(cache_dir=tmp_dir)
+
+                    first = await agent.search("async query", top_k=3)
+                    second = await agent.search("async query", top_k=3)
+                    if len(first["results"]) != 3 or second != first or server.requests != 1:
+                        print(f"✗ 缓存未命中: 请求数 {server.requests}")
+                        return False
+                    print("✓ 结果结构与同步客户端一致，重复查询命中缓存")
+
+                    for i in range(3):
+                        await agent.search(f"other query {i}", top_k=2, use_cache=False)
+                    if server.connections != 1:
+                        print(f"✗ 未复用连接: {server.connections} 个连接")
+                        return False
+                    print("✓ 顺序请求复用同一连接")
+
+                    multi = await agent.search_multi_site("site query", ["a.com", "b.com"])
+                    if len(multi["results"]) != 10:
+                        print("✗ 多站搜索结果异常")
+                        return False
+                    print("✓ search_multi_site 返回协程结果")
+
+                    stats = await agent.get_cache_stats()
+                    if stats["engines"]["anspire"]["hits"] != 1:
+                        print(f"✗ 缓存统计错误: {stats['engines']}")
+                        return False
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_brave():
+    """测试 Brave 异步客户端"""
+    print("=== 测试 Brave 异步客户端 ===")
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            async with AsyncStubServer(brave_handler) as server:
+                async with AsyncBraveSearchClient(api_key="test-key") as client:
+                    client.base_url = server.url
+                    client.cache = SearchCache(cache_dir=tmp_dir)
+
+                    result = await client.search("brave async", count=4)
+                    await client.search("brave async", count=4)
+                    if len(result["web"]["results"]) != 4 or server.requests != 1:
+                        print(f"✗ 搜索或缓存异常: 请求数 {server.requests}")
+                        return False
+                    print("✓ 搜索结果正确，重复查询命中缓存")
+
+                    news = await client.search_news("brave news", count=2)
+                    if news["news"] != {"results": []}:
+                        print("✗ 新闻搜索未补齐 news 字段")
+                        return False
+                    print("✓ search_news 补齐 news 字段")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_unified_concurrency():
+    """测试统一异步客户端的并发与请求合并"""
+    print("=== 测试统一异步客户端并发 ===")
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            async with AsyncStubServer(delay=0.2) as anspire_server, AsyncStubServer(brave_handler) as brave_server:
+                async with AsyncUnifiedSearchClient(anspire_api_key="test-key", brave_api_key="test-key") as client:
+                    cache = SearchCache(cache_dir=tmp_dir)
+                    client.anspire_client.base_url = anspire_server.url
+                    client.anspire_client.cache = cache
+                    client.brave_client.base_url = brave_server.url
+                    client.brave_client.cache = cache
+
+                    # 50 个不同查询并发：不受线程池大小限制，总耗时接近单个请求
+                    loop = asyncio.get_running_loop()
+                    start = loop.time()
+                    results = await asyncio.gather(*(
+                        client.search(f"concurrent {i}", count=2) for i in range(50)
+                    ))
+                    elapsed = loop.time() - start
+                    if any(len(r["results"]) != 2 for r in results) or elapsed > 2:
+                        print(f"✗ 并发搜索异常: 耗时 {elapsed:.2f}s")
+                        return False
+                    print(f"✓ 50 个查询并发完成，耗时 {elapsed:.2f}s（单请求 0.2s）")
+
+                    # 相同查询并发只发出一次请求
+                    before = anspire_server.requests
+                    results = await asyncio.gather(*(client.search("same query") for _ in range(10)))
+                    if anspire_server.requests - before != 1 or any(r["items"] != results[0]["items"] for r in results):
+                        print(f"✗ 请求合并失败: {anspire_server.requests - before} 次请求")
+                        return False
+                    print("✓ 10 个相同查询合并为一次请求")
+
+                    brave = await client.search("brave via unified", engine=SearchEngine.BRAVE, count=3)
+                    news = await client.search_news("brave news", engine=SearchEngine.BRAVE)
+                    if len(brave["web"]["results"]) != 3 or "news" not in news:
+                        print("✗ Brave 路由异常")
+                        return False
+                    print("✓ Brave 搜索与新闻搜索路由正确")
+
+                    stats = await client.get_cache_stats()
+                    if set(stats["engines"]) != {"anspire", "brave"}:
+                        print(f"✗ 分引擎统计缺失: {stats['engines']}")
+                        return False
+                    print(f"✓ 分引擎统计: {stats['engines']}")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_search_many():
+    """测试异步批量搜索"""
+    print("=== 测试异步批量搜索 ===")
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            async with AsyncStubServer(delay=0.1) as server:
+                async with AsyncUnifiedSearchClient(anspire_api_key="test-key") as client:
+                    client.anspire_client.base_url = server.url
+                    client.anspire_client.cache = SearchCache(cache_dir=tmp_dir)
+
+                    await client.search("warm", count=2)
+                    queries = ["warm", "Batch  Query", "batch query"] + [f"q{i}" for i in range(8)]
+                    start = asyncio.get_running_loop().time()
+                    results = await client.search_many(queries, count=2, max_concurrency=4)
+                    elapsed = asyncio.get_running_loop().time() - start
+
+                    if server.requests != 10 or results[1] is not results[2] or len(results) != len(queries):
+                        print(f"✗ 去重或缓存失败: 请求数 {server.requests}")
+                        return False
+                    if results[0]["results"][0]["title"] != "warm 0" or not 0.2 <= elapsed < 0.6:
+                        print(f"✗ 顺序或并发上限异常: 耗时 {elapsed:.2f}s")
+                        return False
+                    print(f"✓ 9 个未命中查询以并发 4 完成，耗时 {elapsed:.2f}s，重复与已缓存查询不请求上游")
+
+                    results = await client.search_many(["ok", "brave only"], per_query_kwargs=[None, {"engine": SearchEngine.BRAVE}])
+                    if results[1]["engine"] != "anspire" or results[1]["fallback"][0]["engine"] != "brave":
+                        print(f"✗ 批量搜索未经过回退链: {results}")
+                        return False
+                    print(f"✓ 批量搜索经过回退链: {results[1]['fallback']}")
+
+                    server.handler = lambda path, params, headers: (503, {}, {"error": "down"})
+                    client.anspire_client.retry_policy = None
+                    results = await client.search_many(["down"])
+                    if "503" not in results[0].get("error", ""):
+                        print(f"✗ 错误未按查询捕获: {results}")
+                        return False
+                    print(f"✓ 单个查询失败记录为 error: {results[0]['error']}")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_stale_refresh():
+    """测试异步客户端的 stale-while-revalidate：刷新线程把请求交回事件循环执行"""
+    print("=== 测试异步后台刷新 ===")
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            async with AsyncStubServer() as server:
+                async with AsyncAnspireSearchAgent(api_key="test-key", stale_seconds=3600) as agent:
+                    agent.base_url = server.url
+                    agent.cache = SearchCache(cache_dir=tmp_dir, ttl_hours=0)  # 写入即过期
+                    agent.cache.set("swr query", {"results": [{"title": "stale"}]}, namespace=CACHE_NAMESPACE)
+
+                    result = await agent.search("swr query")
+                    if result["results"][0]["title"] != "stale":
+                        print("✗ 未返回陈旧结果")
+                        return False
+
+                    for _ in range(50):
+                        if agent.cache.stats()["refresh"]["refreshed"] == 1:
+                            break
+                        await asyncio.sleep(0.02)
+                    if server.requests != 1 or agent.cache.stats()["refresh"]["refreshed"] != 1:
+                        print(f"✗ 后台刷新未执行: 请求数 {server.requests}")
+                        return False
+                    print("✓ 返回陈旧结果，后台刷新经事件循环完成")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_cancellation():
+    """测试取消：请求随任务取消，合并的请求在全部等待方取消后才取消"""
+    print("=== 测试异步取消 ===")
+
+    async def scenario():
+        async with AsyncStubServer(delay=1) as server:
+            async with AsyncAnspireSearchAgent(api_key="test-key", enable_cache=False) as agent:
+                agent.base_url = server.url
+
+                task = asyncio.create_task(agent.search("cancel me"))
+                await asyncio.sleep(0.1)
+                task.cancel()
+                try:
+                    await task
+                    print("✗ 任务未被取消")
+                    return False
+                except asyncio.CancelledError:
+                    pass
+                await asyncio.sleep(0.1)
+                if server.cancelled != 1:
+                    print(f"✗ 连接未随取消关闭: {server.cancelled}")
+                    return False
+                print("✓ 取消任务后连接立即关闭，服务端不再响应")
+
+                first = asyncio.create_task(agent.search("shared"))
+                second = asyncio.create_task(agent.search("shared"))
+                await asyncio.sleep(0.1)
+                first.cancel()
+                result = await second
+                if len(result["results"]) != 10 or server.requests != 2:
+                    print(f"✗ 合并请求被单个等待方取消: 请求数 {server.requests}")
+                    return False
+                print("✓ 单个等待方取消不影响合并请求的其他等待方")
+
+                server.delay = 0
+                result = await agent.search("after cancel", top_k=2)
+                if len(result["results"]) != 2:
+                    print("✗ 取消后会话不可用")
+                    return False
+                print("✓ 取消后会话仍可正常使用")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_http_errors():
+    """测试 HTTP 错误与负缓存"""
+    print("=== 测试异步 HTTP 错误 ===")
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            async with AsyncStubServer(lambda path, params, headers: (503, {}, {"detail": "busy"})) as server:
+                async with AsyncAnspireSearchAgent(api_key="test-key", retry=False) as agent:
+                    agent.base_url = server.url
+                    agent.cache = SearchCache(cache_dir=tmp_dir)
+
+                    for _ in range(2):
+                        try:
+                            await agent.search("failing query")
+                            print("✗ 未抛出 HTTPError")
+                            return False
+                        except requests.HTTPError as e:
+                            if e.response.status_code != 503:
+                                print(f"✗ 状态码错误: {e.response.status_code}")
+                                return False
+                    if server.requests != 1:
+                        print(f"✗ 负缓存未生效: {server.requests} 次请求")
+                        return False
+                    print("✓ 503 抛出 requests.HTTPError，第二次命中负缓存")
+
+            try:
+                await agent.search("unreachable", use_cache=False)
+                print("✗ 服务关闭后未抛出连接错误")
+                return False
+            except requests.ConnectionError:
+                print("✓ 连接失败抛出 requests.ConnectionError")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_deadline():
+    """测试异步截止时间：到期即关闭连接并记录超时阶段"""
+    print("=== 测试异步截止时间 ===")
+
+    async def scenario():
+        async with AsyncStubServer(delay=1) as server:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                client = AsyncUnifiedSearchClient(
+                    anspire_api_key="test-key", brave_api_key="test-key", fallback_on_error=False
+                )
+                client.anspire_client.base_url = server.url
+                client.anspire_client.cache = SearchCache(cache_dir=tmp_dir)
+                async with client:
+                    deadline = Deadline(0.3)
+                    loop = asyncio.get_running_loop()
+                    start = loop.time()
+                    try:
+                        await client.search("slow upstream", engine=SearchEngine.ANSPIRE, deadline=deadline)
+                        print("✗ 未抛出 DeadlineExceeded")
+                        return False
+                    except DeadlineExceeded as e:
+                        elapsed = loop.time() - start
+                        # 请求读取超时与等待合并请求的超时同时到期，两者皆可
+                        if not e.stage.startswith("anspire.fetch.") or elapsed > 0.6:
+                            print(f"✗ 超时阶段错误: {e.stage}, {elapsed:.2f}s")
+                            return False
+                        print(f"✓ {elapsed:.2f}s 后超时返回: {e}")
+
+                    await asyncio.sleep(0.1)
+                    if server.cancelled != 1:
+                        print(f"✗ 超时后连接未关闭: {server.cancelled}")
+                        return False
+                    if [stage["stage"] for stage in deadline.stages][0] != "anspire.cache":
+                        print(f"✗ 阶段记录错误: {deadline.stages}")
+                        return False
+                    print("✓ 超时后连接立即关闭，阶段记录完整")
+
+                    try:
+                        await client.search_news("no time left", engine=SearchEngine.BRAVE, deadline=0)
+                        print("✗ 过期截止时间仍然发出请求")
+                        return False
+                    except DeadlineExceeded as e:
+                        if e.stage != "brave.fetch" or server.requests != 1:
+                            print(f"✗ 过期后仍请求上游: {e.stage}")
+                            return False
+                    print("✓ 截止时间已过时不再发出请求")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_retry():
+    """测试异步重试：5xx / 429 后按策略重试，等待不阻塞事件循环"""
+    print("=== 测试异步重试 ===")
+
+    async def scenario():
+        faults = FaultInjector([502, (429, {"Retry-After": "0.2"}), None])
+        async with AsyncStubServer(faults) as server:
+            async with AsyncBraveSearchClient(
+                api_key="test-key", enable_cache=False, retry=RetryPolicy(base_delay=0.01)
+            ) as client:
+                client.base_url = server.url
+                ticks = 0
+
+                async def ticker():
+                    nonlocal ticks
+                    while True:
+                        await asyncio.sleep(0.01)
+                        ticks += 1
+
+                ticking = asyncio.create_task(ticker())
+                deadline = Deadline(5)
+                result = await client.search("flaky", count=2, deadline=deadline)
+                ticking.cancel()
+
+                stats = client.get_retry_stats()
+                if len(result["results"]) != 2 or faults.served != [502, 429, 200]:
+                    print(f"✗ 未重试成功: {faults.served}")
+                    return False
+                if stats["retries"] != 2 or stats["server_delays"] != 1 or ticks < 10:
+                    print(f"✗ 重试统计错误或等待阻塞了事件循环: {stats}, ticks={ticks}")
+                    return False
+                retry_stages = [stage for stage in deadline.stages if stage["stage"] == "brave.retry"]
+                if len(retry_stages) != 2 or retry_stages[1]["elapsed"] < 0.2:
+                    print(f"✗ 重试等待未计入截止时间: {deadline.stages}")
+                    return False
+                print(f"✓ 502 与 429 后重试成功，按 Retry-After 等待，重试统计: {stats}")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_rate_limit():
+    """测试异步客户端限流：并发请求按令牌桶排队，等待不阻塞事件循环"""
+    print("=== 测试异步限流 ===")
+
+    async def scenario():
+        async with AsyncStubServer() as server:
+            async with AsyncBraveSearchClient(
+                api_key="async-limit-key", enable_cache=False, rate_limit={"rate": 5, "burst": 1}
+            ) as client:
+                client.base_url = server.url
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                await asyncio.gather(*(client.search(f"paced {i}", count=1) for i in range(5)))
+                elapsed = loop.time() - start
+                stats = client.get_rate_limit_stats()
+                if elapsed < 0.75 or stats["acquired"] != 5 or stats["waited"] != 4:
+                    print(f"✗ 并发请求未按速率排队: {elapsed:.2f}s, {stats}")
+                    return False
+                print(f"✓ 5 个并发请求按每秒 5 个排队，耗时 {elapsed:.2f}s")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_circuit_breaker():
+    """测试异步熔断：引擎熔断后回退到下一个引擎，取消的请求不计入错误率"""
+    print("=== 测试异步熔断 ===")
+
+    async def scenario():
+        down = AsyncStubServer(lambda path, params, headers: (503, {}, {"error": "down"}))
+        async with down as anspire_server, AsyncStubServer(brave_handler) as brave_server:
+            async with AsyncUnifiedSearchClient(
+                anspire_api_key="test-key",
+                brave_api_key="test-key",
+                retry={"anspire": False},
+                circuit_breaker={"anspire": {"min_calls": 2}},
+                fallback_on_error=False
+            ) as client:
+                client.anspire_client.base_url = anspire_server.url
+                client.brave_client.base_url = brave_server.url
+                client.anspire_client.cache = None
+                client.brave_client.cache = None
+
+                anspire_server.delay = 1
+                task = asyncio.create_task(client.search("cancelled"))
+                await asyncio.sleep(0.1)
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                if client.get_breaker_stats()["anspire"]["calls"] != 0:
+                    print("✗ 取消的请求计入了熔断统计")
+                    return False
+                anspire_server.delay = 0
+
+                for i in range(2):
+                    try:
+                        await client.search(f"failing {i}")
+                        print("✗ 熔断前 HTTP 错误未抛出")
+                        return False
+                    except requests.HTTPError:
+                        pass
+
+                result = await client.search("served elsewhere", count=2)
+                if anspire_server.requests != 3 or len(result["web"]["results"]) != 2:
+                    print(f"✗ 熔断后未回退到 Brave: {anspire_server.requests}")
+                    return False
+                if client.get_breaker_stats()["anspire"]["state"] != "open":
+                    print("✗ 熔断器状态错误")
+                    return False
+                print("✓ 取消不计入错误率；Anspire 熔断后改用 Brave")
+
+                client.fallback_on_open = False
+                try:
+                    await client.search("fail fast")
+                    print("✗ 未抛出 CircuitOpenError")
+                    return False
+                except CircuitOpenError:
+                    print("✓ fallback_on_open=False 时直接抛出 CircuitOpenError")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_async_fallback():
+    """测试异步回退链：失败或无结果时改用下一个引擎并记录返回结果的引擎"""
+    print("=== 测试异步回退链 ===")
+
+    def empty_handler(path, params, headers):
+        return 200, {}, {"results": []}
+
+    async def scenario():
+        async with AsyncStubServer(FaultInjector([503], empty_handler)) as anspire_server, \
+                AsyncStubServer(brave_handler) as brave_server, \
+                AsyncStubServer(lambda path, params, headers: (200, {}, {"web": {"results": []}})) as empty_brave:
+            async with AsyncUnifiedSearchClient(
+                anspire_api_key="test-key",
+                brave_api_key="test-key",
+                retry={"anspire": False, "brave": False},
+                circuit_breaker=False
+            ) as client:
+                client.anspire_client.base_url = anspire_server.url
+                client.brave_client.base_url = brave_server.url
+                client.anspire_client.cache = None
+                client.brave_client.cache = None
+
+                failed = await client.search("http error", count=2, deadline=2)
+                empty = await client.search("nothing here", count=2, deadline=2)
+                for result, reason in ((failed, "503"), (empty, "empty")):
+                    if (result["engine"] != "brave" or len(result["items"]) != 2
+                            or reason not in result["fallback"][0]["error"]):
+                        print(f"✗ 未回退到 Brave: {result}")
+                        return False
+                print("✓ Anspire 返回 503 或无结果时由 Brave 返回结果")
+
+                client.brave_client.base_url = empty_brave.url
+                news = await client.search_news("no news", engine=SearchEngine.BRAVE, count=2, deadline=2)
+                if (news["engine"] != "brave" or news["items"]
+                        or [f["engine"] for f in news["fallback"]] != ["brave", "anspire", "brave"]):
+                    print(f"✗ Brave 新闻无结果时未回退: {news}")
+                    return False
+                print("✓ Brave 新闻无结果时回退，全部为空时返回 Brave 的空结果并记录每个引擎")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def proxy_env(**values):
+    """只保留给定代理环境变量（大小写两种写法）的 os.environ 补丁"""
+    names = ("http_proxy", "https_proxy", "no_proxy", "all_proxy")
+    env = {name: value for name, value in os.environ.items() if name.lower() not in names}
+    for name, value in values.items():
+        env[name.lower()] = env[name.upper()] = value
+    return mock.patch.dict(os.environ, env, clear=True)
+
+
+def test_async_proxy_redirect():
+    """测试异步 HTTP 会话：代理环境变量、重定向，异步客户端不创建同步会话"""
+    print("=== 测试异步代理与重定向 ===")
+
+    seen = []
+
+    def handler(path, params, headers):
+        seen.append((path, headers.get("host")))
+        if path == "/old":
+            return 302, {"Location": f"/search?query={params['query']}"}, {}
+        if path == "/loop":
+            return 301, {"Location": "/loop"}, {}
+        return 200, {}, {"results": [{"title": params["query"]}]}
+
+    async def scenario():
+        async with AsyncStubServer(handler) as server:
+            base = server.url.rsplit("/", 1)[0]
+            async with AsyncHTTPSession() as session:
+                with proxy_env():
+                    response = await session.get(f"{base}/old", params={"query": "moved"})
+                    if response.json()["results"][0]["title"] != "moved" or not response.url.endswith("/search?query=moved"):
+                        print(f"✗ 未跟随重定向: {response.status_code} {response.url}")
+                        return False
+                    print("✓ 302 跟随到新地址")
+
+                    try:
+                        await session.get(f"{base}/loop")
+                        print("✗ 循环重定向未抛出 TooManyRedirects")
+                        return False
+                    except requests.TooManyRedirects:
+                        print("✓ 循环重定向抛出 requests.TooManyRedirects")
+
+                seen.clear()
+                with proxy_env(http_proxy=base):
+                    response = await session.get("http://search.invalid/search", params={"query": "proxied"})
+                    if response.json()["results"][0]["title"] != "proxied" or seen != [("/search", "search.invalid")]:
+                        print(f"✗ 未经 HTTP_PROXY 转发: {seen}")
+                        return False
+                print("✓ 按 HTTP_PROXY 经代理转发，Host 为目标主机")
+
+                with proxy_env(http_proxy="http://127.0.0.1:9", no_proxy="127.0.0.1"):
+                    response = await session.get(f"{base}/search", params={"query": "direct"})
+                    if response.status_code != 200:
+                        print("✗ NO_PROXY 中的主机仍经代理")
+                        return False
+                print("✓ NO_PROXY 中的主机直连")
+
+                with proxy_env(https_proxy="socks5://127.0.0.1:1080"):
+                    try:
+                        await session.get("https://search.invalid/search")
+                        print("✗ 不支持的代理未报错")
+                        return False
+                    except requests.exceptions.InvalidProxyURL:
+                        print("✓ 不支持的代理抛出 InvalidProxyURL")
+
+            async with AsyncHTTPSession(trust_env=False) as session:
+                with proxy_env(http_proxy="http://127.0.0.1:9"):
+                    response = await session.get(f"{base}/search", params={"query": "no env"})
+                    if response.status_code != 200:
+                        print("✗ trust_env=False 时仍读取代理环境变量")
+                        return False
+                print("✓ trust_env=False 时忽略代理环境变量")
+
+        agent = AsyncAnspireSearchAgent(api_key="test-key")
+        if agent.session is not None:
+            print(f"✗ 异步客户端创建了同步会话: {agent.session!r}")
+            return False
+        print("✓ 异步客户端不创建同步会话")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e!r}")
+        return False
+
+    print()
+    return True
+
+
+async def raw_server(responses):
+    """按顺序对每个请求原样写回 responses 中的字节（用于构造不规范的响应）"""
+    responses = list(responses)
+
+    async def handle(reader, writer):
+        try:
+            while responses:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                writer.write(responses.pop(0))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    return server, f"http://{host}:{port}/search"
+
+
+def test_async_http_parsing():
+    """测试异步 HTTP 响应解析：1xx、重复响应头、不规范响应的异常类型"""
+    print("=== 测试异步 HTTP 响应解析 ===")
+
+    ok = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}"
+    cases = [
+        ("无效状态行", b"HTTX 2OO whatever\r\n\r\n", requests.ConnectionError),
+        ("无效响应头", b"HTTP/1.1 200 OK\r\nno colon here\r\n\r\n", requests.ConnectionError),
+        ("无效 Content-Length", b"HTTP/1.1 200 OK\r\nContent-Length: ten\r\n\r\n", requests.ConnectionError),
+        ("无效 chunk 长度", b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n", requests.exceptions.ChunkedEncodingError),
+        ("无效 gzip", b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: 4\r\n\r\nnope", requests.exceptions.ContentDecodingError),
+    ]
+
+    async def scenario():
+        with proxy_env():
+            server, url = await raw_server([
+                b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 103 Early Hints\r\nLink: </a>\r\n\r\n"
+                b"HTTP/1.1 200 OK\r\nX-Trace: a\r\nX-Trace: b\r\nContent-Length: 12\r\n\r\n{\"ok\": true}",
+                ok
+            ])
+            async with server, AsyncHTTPSession() as session:
+                response = await session.get(url)
+                if response.json() != {"ok": True} or response.headers["x-trace"] != "a, b":
+                    print(f"✗ 1xx 或重复响应头处理错误: {response.status_code} {dict(response.headers)}")
+                    return False
+                if (await session.get(url)).json() != {} or session.connections_opened != 1:
+                    print("✗ 1xx 后连接未复用")
+                    return False
+            print("✓ 跳过 1xx 中间响应，重复响应头以逗号合并，连接照常复用")
+
+            for name, raw, expected in cases:
+                server, url = await raw_server([raw])
+                async with server, AsyncHTTPSession() as session:
+                    try:
+                        await session.get(url)
+                        print(f"✗ {name}未抛出异常")
+                        return False
+                    except expected:
+                        pass
+                    except Exception as e:
+                        print(f"✗ {name}抛出 {type(e).__name__}，应为 {expected.__name__}")
+                        return False
+            print("✓ 无效状态行 / 响应头 / Content-Length / chunk / gzip 抛出 requests 异常")
+
+            for body in (b"not json", b"\xff\xfe"):
+                server, url = await raw_server([b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)])
+                async with server, AsyncHTTPSession() as session:
+                    response = await session.get(url)
+                try:
+                    response.json()
+                    print("✗ 无效 JSON 未抛出异常")
+                    return False
+                except requests.exceptions.JSONDecodeError:
+                    pass
+            print("✓ 无效 JSON / 非 UTF-8 响应体抛出 requests.JSONDecodeError")
+        return True
+
+    try:
+        if not asyncio.run(scenario()):
+            return False
+    except Exception as e:
+        print(f"✗ 测试失败: {e!r}")
+        return False
+
+    print()
+    return True
+
+
+def main():
+    """运行所有测试"""
+    print("异步客户端测试\n")
+    print("=" * 60)
+    print()
+
+    tests = [
+        ("Anspire 异步客户端", test_async_anspire),
+        ("Brave 异步客户端", test_async_brave),
+        ("统一异步客户端并发", test_async_unified_concurrency),
+        ("异步批量搜索", test_async_search_many),
+        ("异步后台刷新", test_async_stale_refresh),
+        ("异步取消", test_async_cancellation),
+        ("异步 HTTP 错误", test_async_http_errors),
+        ("异步代理与重定向", test_async_proxy_redirect),
+        ("异步 HTTP 响应解析", test_async_http_parsing),
+        ("异步截止时间", test_async_deadline),
+        ("异步重试", test_async_retry),
+        ("异步限流", test_async_rate_limit),
+        ("异步熔断", test_async_circuit_breaker),
+        ("异步回退链", test_async_fallback),
+    ]
+
+    passed = 0
+    failed = 0
+
+    for name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"✗ {name} 测试异常: {e}\n")
+            failed += 1
+
+    print("=" * 60)
+    print(f"\n测试完成: {passed} 通过, {failed} 失败")
+
+
+if __name__ == "__main__":
+    main()
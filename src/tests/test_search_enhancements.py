@@ -5,15 +5,33 @@
 测试搜索缓存和意图识别功能。
 """
 
+import hashlib
+import io
 import os
+import json
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import requests
+from datetime import datetime
 
 # 添加 tools 目录到路径
 sys.path.insert(0, os.path.dirname(__file__))
 
-from anspire_search import AnspireSearchAgent
+from anspire_search import AnspireSearchAgent, CACHE_NAMESPACE, _result_kind, write_raw
 from search_cache import SearchCache
+from cache_codecs import RawResult, available_codecs
+from cache_backends import EntryHeader, HEADER_SIZE, decode_header, encode_header
 from search_intent import SearchIntentClassifier, SearchEngineSelector
+from unified_search import UnifiedSearchClient, SearchEngine, normalize_result, _attempt_kwargs
+from brave_search import BraveSearchClient, _cache_namespace
+from stub_server import DROP, FaultInjector, StubServer
+from deadline import Deadline, DeadlineExceeded, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from retry_policy import RetryPolicy, server_wait
+from rate_limiter import TokenBucket, get_rate_limiter, rate_limit_windows
+from circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError
 
 
 def test_cache():
@@ -61,6 +79,1680 @@ def test_cache():
     return True
 
 
+def test_cache_sqlite_backend():
+    """测试 SQLite 缓存后端"""
+    print("=== 测试 SQLite 缓存后端 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, ttl_hours=1, backend="sqlite")
+            test_result = {"query": "sqlite query", "results": [{"title": "中文结果"}]}
+
+            cache.set("sqlite query", test_result, top_k=10)
+            if cache.get("sqlite query", top_k=10) != test_result:
+                print("✗ SQLite 缓存读取失败：数据不匹配")
+                return False
+            print("✓ SQLite 缓存读写成功")
+
+            # 命中只记在内存里，不是写事务
+            backend = cache.backend
+            key = next(backend.keys())
+            changes = backend._conn.total_changes
+            hits = [backend.get(key) for _ in range(3)]
+            if None in hits or backend._conn.total_changes != changes or backend._conn.in_transaction:
+                print("✗ SQLite 缓存命中时写库")
+                return False
+            print("✓ SQLite 缓存命中不写库，访问记录延后批量写入")
+
+            # 写入一条已过期的条目
+            expired = SearchCache(cache_dir=tmp_dir, ttl_hours=-1, backend="sqlite")
+            expired.set("old query", test_result, top_k=10)
+
+            stats = cache.stats()
+            if stats["total"] != 2 or stats["expired"] != 1 or stats["backend"] != "sqlite":
+                print(f"✗ SQLite 缓存统计错误: {stats}")
+                return False
+            print(f"✓ SQLite 缓存统计: {stats['total']} 个, 过期 {stats['expired']} 个")
+
+            if cache.clear_expired() != 1 or cache.get("sqlite query", top_k=10) is None:
+                print("✗ SQLite 过期清理失败")
+                return False
+            print("✓ SQLite 过期清理成功")
+
+            if cache.clear() != 1:
+                print("✗ SQLite 缓存清空失败")
+                return False
+            print("✓ SQLite 缓存清空成功")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_cache_memory_tier():
+    """测试内存 LRU 层"""
+    print("=== 测试内存 LRU 层 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, ttl_hours=1, memory_max_entries=2)
+
+            for i in range(3):
+                cache.set(f"query {i}", {"results": [{"title": f"Result {i}"}]}, top_k=10)
+
+            if len(cache.memory) != 2:
+                print(f"✗ 内存层未按条目数淘汰: {len(cache.memory)} 个")
+                return False
+            print("✓ 内存层按 LRU 淘汰")
+
+            cache.get("query 2", top_k=10)  # 内存命中
+            cache.get("query 0", top_k=10)  # 内存未命中，磁盘命中并回填
+            cache.get("query 0", top_k=10)  # 内存命中
+
+            tiers = cache.stats()["tiers"]
+            if tiers["memory"]["hits"] != 2 or tiers["disk"]["hits"] != 1:
+                print(f"✗ 分层统计错误: {tiers}")
+                return False
+            print(f"✓ 分层统计: 内存命中 {tiers['memory']['hits']}, 磁盘命中 {tiers['disk']['hits']}")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_cache_eviction():
+    """测试容量限制与淘汰策略"""
+    print("=== 测试容量限制与淘汰策略 ===")
+    try:
+        for backend in ("file", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                cache = SearchCache(
+                    cache_dir=tmp_dir,
+                    backend=backend,
+                    memory_max_entries=0,
+                    max_entries=2,
+                    eviction_policy="lfu"
+                )
+
+                cache.set("hot", {"results": [{"title": "hot"}]})
+                cache.set("warm", {"results": [{"title": "warm"}]})
+                cache.get("hot")
+                cache.get("hot")
+                cache.set("new", {"results": [{"title": "new"}]})
+
+                stats = cache.stats()
+                if stats["total"] != 2 or cache.get("hot") is None or cache.get("warm") is not None:
+                    print(f"✗ {backend} LFU 淘汰错误: {stats}")
+                    return False
+                print(f"✓ {backend} 后端按 LFU 淘汰最冷条目，淘汰 {stats['evictions']} 个")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_stale_while_revalidate():
+    """测试 stale-while-revalidate"""
+    print("=== 测试 stale-while-revalidate ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent = AnspireSearchAgent(api_key="test-key", enable_intent=False, stale_seconds=3600)
+            agent.cache = SearchCache(cache_dir=tmp_dir, ttl_hours=0)  # 写入即过期
+
+            calls = []
+
+            def fake_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append(query)
+                return {"results": [{"title": f"fresh {len(calls)}"}]}
+
+            agent._fetch = fake_fetch
+            agent.cache.set("swr query", {"results": [{"title": "stale"}]}, namespace=CACHE_NAMESPACE)
+
+            result = agent.search("swr query")
+            if result["results"][0]["title"] != "stale":
+                print("✗ 未返回陈旧结果")
+                return False
+            print("✓ 过期条目在宽限期内直接返回")
+
+            for _ in range(50):
+                if agent.cache.stats()["refresh"]["refreshed"] == 1:
+                    break
+                time.sleep(0.02)
+
+            stats = agent.cache.stats()
+            if len(calls) != 1 or stats["served_stale"] != 1 or stats["refresh"]["refreshed"] != 1:
+                print(f"✗ 后台刷新异常: calls={calls}, stats={stats}")
+                return False
+            print(f"✓ 后台刷新 {stats['refresh']['refreshed']} 次，返回陈旧结果 {stats['served_stale']} 次")
+
+            agent.search("swr query", stale_seconds=0)
+            if len(calls) != 2:
+                print("✗ 单次调用关闭宽限期无效")
+                return False
+            print("✓ 单次调用可关闭宽限期")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_refresh_ahead():
+    """测试热门条目提前刷新与 TTL 抖动"""
+    print("=== 测试 refresh-ahead 与 TTL 抖动 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent = AnspireSearchAgent(api_key="test-key", enable_intent=False)
+            # refresh_ahead=1：整个 TTL 都在提前刷新窗口内，只看访问频率
+            agent.cache = SearchCache(
+                cache_dir=tmp_dir, ttl_hours=1, refresh_ahead=1.0, refresh_ahead_min_frequency=3
+            )
+
+            calls = []
+
+            def fake_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append(query)
+                return {"results": [{"title": f"fresh {len(calls)}"}]}
+
+            agent._fetch = fake_fetch
+            agent.search("cold query")
+            agent.search("cold query")
+            for _ in range(3):
+                agent.search("hot query")
+
+            for _ in range(50):
+                if agent.cache.stats()["refresh"]["refreshed"] == 1:
+                    break
+                time.sleep(0.02)
+
+            if calls.count("hot query") != 2 or calls.count("cold query") != 1:
+                print(f"✗ 提前刷新异常: calls={calls}")
+                return False
+            print("✓ 热门条目临近过期时提前刷新，冷门条目不刷新")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, ttl_hours=1, ttl_jitter=0.5, memory_max_entries=0)
+            now = time.time()
+            expiries = []
+            for i in range(20):
+                cache.set(f"jitter query {i}", {"results": [{"title": str(i)}]})
+                expiries.append(cache.backend.get(cache._get_cache_key(f"jitter query {i}")).expires_at)
+
+            if len(set(expiries)) < 10 or min(expiries) < now + 1800 - 1 or max(expiries) > time.time() + 3600:
+                print(f"✗ TTL 抖动范围错误: {min(expiries) - now:.0f}s ~ {max(expiries) - now:.0f}s")
+                return False
+            print(f"✓ TTL 抖动: {min(expiries) - now:.0f}s ~ {max(expiries) - now:.0f}s")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_intent_ttl():
+    """测试按意图计算有效期"""
+    print("=== 测试意图 TTL 策略 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(
+                cache_dir=tmp_dir, ttl_hours=24, ttl_jitter=0, memory_max_entries=0,
+                ttl_policy={"technical": 72}
+            )
+            cases = [
+                ("最新新闻发布", None, 1),
+                ("python install error", None, 72),
+                ("今天的天气", None, 6),
+                ("人工智能", None, 24),
+                ("人工智能", "2025-01-01", 6),
+            ]
+            for query, from_time, hours in cases:
+                cache.set(query, {"results": [{"title": query}]}, from_time=from_time)
+                entry = cache.backend.get(cache._get_cache_key(query, from_time=from_time))
+                actual = (entry.expires_at - time.time()) / 3600
+                if abs(actual - hours) > 0.01:
+                    print(f"✗ {query} (from_time={from_time}) 有效期 {actual:.2f}h，期望 {hours}h")
+                    return False
+            print("✓ 新闻 1h / 技术 72h（覆盖）/ 时间范围 6h / 通用 24h / 带 from_time 6h")
+
+            cache.get("最新新闻发布")
+            cache.get("最新新闻动态")
+            news = cache.stats()["intents"]["news"]
+            if news["hits"] != 1 or news["misses"] != 1 or news["hit_rate"] != 0.5:
+                print(f"✗ 意图命中率统计错误: {news}")
+                return False
+            print(f"✓ 意图命中率: news {news}")
+
+        try:
+            SearchCache(cache_dir=tempfile.gettempdir(), ttl_policy={"weather": 1})
+            print("✗ 未知策略项未报错")
+            return False
+        except ValueError:
+            print("✓ 未知策略项报错")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_single_flight():
+    """测试并发请求合并"""
+    print("=== 测试并发请求合并 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent = AnspireSearchAgent(api_key="test-key", enable_intent=False)
+            agent.cache = SearchCache(cache_dir=tmp_dir)
+
+            calls = []
+
+            def slow_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append(query)
+                time.sleep(0.2)
+                return {"results": [{"title": "shared"}]}
+
+            agent._fetch = slow_fetch
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(agent.search("flight query")))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            if len(calls) != 1 or len(results) != 5:
+                print(f"✗ 并发请求未合并: 上游调用 {len(calls)} 次")
+                return False
+            print(f"✓ 5 个并发请求只调用上游 {len(calls)} 次")
+
+            def failing_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                time.sleep(0.2)
+                raise RuntimeError("upstream down")
+
+            agent._fetch = failing_fetch
+            errors = []
+
+            def search_failing():
+                try:
+                    agent.search("failing query")
+                except RuntimeError as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=search_failing) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            if len(errors) != 3 or len({id(e) for e in errors}) != 1:
+                print("✗ 异常未共享给所有等待方")
+                return False
+            print("✓ 异常共享给所有等待方")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_top_k_subsumption():
+    """测试 top_k 覆盖命中"""
+    print("=== 测试 top_k 覆盖命中 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, memory_max_entries=0)
+            result = {"results": [{"title": f"Result {i}"} for i in range(50)]}
+            cache.set("subsume query", result, top_k=50)
+
+            cached = cache.get("subsume query", top_k=10)
+            if cached is None or len(cached["results"]) != 10:
+                print("✗ top_k=10 未由 top_k=50 条目命中")
+                return False
+            print("✓ top_k=10 由 top_k=50 条目截取命中")
+
+            if cache.get("subsume query", top_k=50)["results"] != result["results"]:
+                print("✗ 截取影响了缓存条目")
+                return False
+
+            cache.set("small query", {"results": result["results"][:10]}, top_k=10)
+            if cache.get("small query", top_k=20) is not None:
+                print("✗ top_k 不足的条目不应命中")
+                return False
+            print("✓ top_k 不足时未命中")
+
+            if cache.stats()["subsumed_hits"] != 1:
+                print("✗ 覆盖命中计数错误")
+                return False
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_query_canonicalization():
+    """测试查询规范化"""
+    print("=== 测试查询规范化 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent = AnspireSearchAgent(api_key="test-key", enable_intent=False)
+            agent.cache = SearchCache(cache_dir=tmp_dir)
+
+            calls = []
+
+            def fake_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append((query, insite))
+                return {"results": [{"title": "canonical"}]}
+
+            agent._fetch = fake_fetch
+            agent.search("site:pypi.org  Requests site:GitHub.com")
+            agent.search("ｒｅｑｕｅｓｔｓ", insite="github.com,pypi.org")
+            agent.search("requests", insite="pypi.org, github.com")
+
+            if calls != [("requests", "github.com,pypi.org")]:
+                print(f"✗ 规范化后仍重复请求: {calls}")
+                return False
+            print("✓ 三种写法只请求一次，site: 已提取为 insite")
+
+            canonicalization = agent.cache.stats()["canonicalization"]
+            if canonicalization["hits"] != 2:
+                print(f"✗ 规范化命中统计错误: {canonicalization}")
+                return False
+            print(f"✓ 规范化带来命中 {canonicalization['hits']} 次")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            client = UnifiedSearchClient(anspire_api_key="test-key")
+            client.anspire_client.cache = SearchCache(cache_dir=tmp_dir)
+            calls = []
+            client.anspire_client._fetch = fake_fetch
+            for query in ("Hello  World", "hello world", "ＨＥＬＬＯ world"):
+                client.search(query)
+            canonicalization = client.anspire_client.cache.stats()["canonicalization"]
+            if len(calls) != 1 or canonicalization != {"canonicalized": 2, "hits": 1}:
+                print(f"✗ 统一客户端的规范化未计入统计: {calls}, {canonicalization}")
+                return False
+            print(f"✓ 统一客户端原样传入查询，规范化统计: {canonicalization}")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_negative_cache():
+    """测试负缓存"""
+    print("=== 测试负缓存 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            agent = AnspireSearchAgent(api_key="test-key", enable_intent=False, retry=False)
+            agent.cache = SearchCache(cache_dir=tmp_dir)
+
+            calls = []
+
+            def failing_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append(query)
+                response = requests.Response()
+                response.status_code = 503
+                response.reason = "Service Unavailable"
+                raise requests.HTTPError("503 Error", response=response)
+
+            def empty_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append(query)
+                return {"results": []}
+
+            agent._fetch = failing_fetch
+            for _ in range(2):
+                try:
+                    agent.search("down query")
+                except requests.HTTPError as e:
+                    status = e.response.status_code
+
+            if len(calls) != 1 or status != 503:
+                print(f"✗ HTTP 错误未写入负缓存: calls={calls}")
+                return False
+            print("✓ HTTP 503 写入负缓存，重复请求直接抛出")
+
+            agent._fetch = empty_fetch
+            agent.search("down query", allow_negative=False)
+            agent.search("empty query")
+            agent.search("empty query")
+            if len(calls) != 3:
+                print(f"✗ 负缓存跳过或空结果缓存异常: calls={calls}")
+                return False
+            print("✓ allow_negative=False 跳过负缓存，空结果单独缓存")
+
+            negative_hits = agent.cache.stats()["negative_hits"]
+            if negative_hits["http_error"] != 1 or negative_hits["empty"] != 1:
+                print(f"✗ 负缓存命中统计错误: {negative_hits}")
+                return False
+            print(f"✓ 负缓存命中统计: {negative_hits}")
+
+            agent.cache.set("kept query", {"results": [{"title": "kept"}]}, top_k=10, namespace=CACHE_NAMESPACE)
+            agent._fetch = failing_fetch
+            for _ in range(2):
+                try:
+                    agent.search("kept query", top_k=50)
+                    print("✗ 更大 top_k 的请求失败未抛出")
+                    return False
+                except requests.HTTPError:
+                    pass
+            kept = agent.search("kept query", top_k=10)
+            if len(calls) != 4 or kept["results"][0]["title"] != "kept":
+                print(f"✗ HTTP 错误覆盖了已有结果: calls={calls}, {kept}")
+                return False
+            print("✓ top_k=50 的 HTTP 错误单独缓存，不覆盖 top_k=10 的结果")
+
+            try:
+                agent._fetch_and_store("refresh query", 10, None, None, None, refresh=True)
+            except requests.HTTPError:
+                pass
+            try:
+                agent.search("refresh query")
+            except requests.HTTPError:
+                pass
+            if len(calls) != 6:
+                print(f"✗ 后台刷新失败写入了负缓存: calls={calls}")
+                return False
+            print("✓ 后台刷新失败不写入负缓存")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_sharded_layout():
+    """测试分片目录与旧版平铺条目清理"""
+    print("=== 测试分片目录与旧版平铺条目清理 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, memory_max_entries=0)
+            cache.set("sharded query", {"results": [{"title": "sharded"}]})
+
+            key = cache._get_cache_key("sharded query")
+            sharded_file = os.path.join(tmp_dir, key[:2], key[2:4], f"{key}.json")
+            if not os.path.exists(sharded_file):
+                print("✗ 条目未写入分片目录")
+                return False
+            print("✓ 条目写入两级分片目录")
+
+            # 旧版 SearchCache 平铺写入的条目：旧缓存键（含 top_k）新版不可达，启动后在后台删除
+            params = {"query": "flat query", "top_k": 10, "insite": None, "from_time": None, "to_time": None}
+            legacy_key = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+            flat_file = os.path.join(tmp_dir, f"{legacy_key}.json")
+            with open(flat_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "query": "flat query",
+                    "cached_at": datetime.now().isoformat(),
+                    "ttl_hours": 24,
+                    "result": {"results": [{"title": "flat"}]}
+                }, f, ensure_ascii=False, indent=2)
+            purged = SearchCache(cache_dir=tmp_dir, memory_max_entries=0)
+            for _ in range(50):
+                if purged.backend.purged:
+                    break
+                time.sleep(0.02)
+            if os.path.exists(flat_file) or purged.backend.purged != 1:
+                print("✗ 平铺目录中的旧条目未删除")
+                return False
+            print("✓ 平铺目录中的旧条目在启动后删除")
+
+            if purged.get("flat query", top_k=10) is not None:
+                print("✗ 旧版条目仍被返回")
+                return False
+            if purged.get("sharded query") is None or purged.stats()["total"] != 1 or purged.clear() != 1:
+                print("✗ 分片目录统计或清空失败")
+                return False
+            print("✓ 分片目录统计与清空正常")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_atomic_writes():
+    """测试文件后端原子写入：并发读取不会看到写了一半的条目"""
+    print("=== 测试文件后端原子写入 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = SearchCache(cache_dir=tmp_dir, memory_max_entries=0)
+            reader = SearchCache(cache_dir=tmp_dir, memory_max_entries=0)
+            big = {"results": [{"title": "atomic", "content": "x" * 200_000}]}
+            writer.set("atomic query", big)
+
+            stop = threading.Event()
+
+            def rewrite():
+                while not stop.is_set():
+                    writer.set("atomic query", big)
+
+            thread = threading.Thread(target=rewrite)
+            thread.start()
+            try:
+                misses = sum(reader.get("atomic query") is None for _ in range(200))
+            finally:
+                stop.set()
+                thread.join()
+
+            leftovers = [name for _, _, files in os.walk(tmp_dir) for name in files if name.endswith(".tmp")]
+            if misses or leftovers:
+                print(f"✗ 并发读取未命中 {misses} 次，残留临时文件 {leftovers}")
+                return False
+            print("✓ 重写条目期间并发读取始终命中，无残留临时文件")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_entry_header():
+    """测试条目头与旧版文件清理"""
+    print("=== 测试条目头与旧版文件清理 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, memory_max_entries=0)
+            cache.set("header query", {"results": [{"title": "header"}]})
+
+            key = cache._get_cache_key("header query")
+            entry_file = os.path.join(tmp_dir, key[:2], key[2:4], f"{key}.json")
+            with open(entry_file, "rb") as f:
+                header = decode_header(f.read(HEADER_SIZE))
+            if header is None or header.expires_at <= time.time():
+                print("✗ 条目头缺失或过期时间错误")
+                return False
+            print(f"✓ 固定长度条目头: expires_at={header.expires_at}, kind={header.kind}")
+
+            # 头部标记过期，负载损坏也不会被读取
+            expired = EntryHeader(int(time.time()) - 1, "ok", 0, "json")
+            with open(entry_file, "wb") as f:
+                f.write(encode_header(expired) + b"not json")
+            if cache.stats()["expired"] != 1 or cache.get("header query") is not None:
+                print("✗ 过期条目未按头部拒绝")
+                return False
+            print("✓ 过期条目只读头部即被拒绝")
+
+            # 旧版 SearchCache 写出的文件：键为 md5(query/top_k/insite/from_time/to_time)，
+            # 内容为不带条目头的整份 JSON；被旧的平铺迁移移入分片目录后不可读取，按无效条目清理
+            cache.clear()
+            params = {"query": "header query", "top_k": 10, "insite": None, "from_time": None, "to_time": None}
+            legacy_key = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+            legacy_file = os.path.join(tmp_dir, legacy_key[:2], legacy_key[2:4], f"{legacy_key}.json")
+            os.makedirs(os.path.dirname(legacy_file), exist_ok=True)
+            with open(legacy_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "query": "header query",
+                    "cached_at": datetime.now().isoformat(),
+                    "ttl_hours": 24,
+                    "result": {"results": [{"title": "legacy"}]}
+                }, f, ensure_ascii=False, indent=2)
+
+            stats = cache.stats()
+            if cache.get("header query") is not None or stats["total"] != 1 or stats["expired"] != 1:
+                print(f"✗ 旧版条目被当作有效条目: {stats}")
+                return False
+            if cache.clear_expired() != 1 or os.path.exists(legacy_file):
+                print("✗ 旧版条目未被清理")
+                return False
+            print("✓ 旧版（无条目头）文件不计为有效条目，clear_expired 删除")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_cache_codecs():
+    """测试条目编码与混合读取"""
+    print("=== 测试条目编码 ===")
+    try:
+        result = {"results": [{"title": "codec", "content": "内容 " * 200}]}
+        for backend in ("file", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                sizes = {}
+                for codec in available_codecs():
+                    cache = SearchCache(cache_dir=tmp_dir, backend=backend, codec=codec, memory_max_entries=0)
+                    cache.set(f"query {codec}", result)
+                    sizes[codec] = cache.stats()["size_bytes"] - sum(sizes.values())
+
+                # 用默认编码打开，读取所有编码写入的条目
+                cache = SearchCache(cache_dir=tmp_dir, backend=backend, memory_max_entries=0)
+                for codec in available_codecs():
+                    if cache.get(f"query {codec}") != result:
+                        print(f"✗ {backend} 后端读取 {codec} 条目失败")
+                        return False
+                print(f"✓ {backend} 后端混合编码可读: {sizes}")
+
+                if sizes["zlib"] >= sizes["json"]:
+                    print("✗ 压缩编码未减小条目体积")
+                    return False
+
+        try:
+            SearchCache(cache_dir=tempfile.gettempdir(), codec="unknown")
+            print("✗ 未知编码未报错")
+            return False
+        except ValueError:
+            print("✓ 未知编码报错")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_raw_responses():
+    """测试原始响应缓存"""
+    print("=== 测试原始响应缓存 ===")
+    try:
+        body = json.dumps({"results": [{"title": "raw", "url": "https://example.com"}]}).encode("utf-8")
+        for backend in ("file", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                agent = AnspireSearchAgent(api_key="test-key", enable_intent=False, raw_responses=True)
+                agent.cache = SearchCache(cache_dir=tmp_dir, backend=backend, memory_max_entries=0)
+                agent._fetch = lambda query, top_k, insite, from_time, to_time, deadline=None: RawResult(body)
+
+                agent.search("raw query")
+                cached = agent.search("raw query")
+                if not isinstance(cached, RawResult) or cached.raw != body or cached.parsed:
+                    print(f"✗ {backend} 后端命中未返回原始字节: {cached!r}")
+                    return False
+                if cached["results"][0]["title"] != "raw":
+                    print("✗ 原始响应解析失败")
+                    return False
+                print(f"✓ {backend} 后端原样缓存响应字节，访问时才解析")
+
+                agent.search("raw query", top_k=5)
+                subsumed = agent.search("raw query", top_k=3)
+                if subsumed.parsed or len(subsumed["results"]) != 1 or subsumed.limit != 3:
+                    print(f"✗ 截取较大 top_k 的原始响应时解析了结果: {subsumed!r}")
+                    return False
+                print(f"✓ {backend} 后端截取较大 top_k 的原始响应，访问时才解析")
+
+        empty = RawResult(b'{"results": [ ]}')
+        if _result_kind(empty) != "empty" or _result_kind(RawResult(b'{"detail": "x"}')) != "error" or empty.parsed:
+            print("✗ 原始响应类型判断错误或触发了解析")
+            return False
+        print("✓ 原始响应按字节判断类型，不解析")
+
+        stream = io.TextIOWrapper(io.BytesIO())
+        write_raw(RawResult(body), stream)
+        if stream.buffer.getvalue() != body + b"\n":
+            print("✗ --raw 输出与响应字节不一致")
+            return False
+        binary, text = io.BytesIO(), io.StringIO()
+        write_raw(RawResult(body), binary)
+        write_raw(RawResult(body), text)
+        if binary.getvalue() != body + b"\n" or text.getvalue() != body.decode() + "\n":
+            print("✗ 二进制流或无 buffer 的文本流输出错误")
+            return False
+        print("✓ --raw 直接输出缓存字节（文本流、二进制流均可）")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_bloom_filter():
+    """测试布隆过滤器跳过未命中"""
+    print("=== 测试布隆过滤器 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(cache_dir=tmp_dir, memory_max_entries=0, max_entries=2, bloom_filter=True)
+            for i in range(3):
+                cache.set(f"bloom query {i}", {"results": [{"title": str(i)}]})
+
+            # 重启后由持久层的键重建
+            cache = SearchCache(cache_dir=tmp_dir, memory_max_entries=0, max_entries=2, bloom_filter=True)
+            backend_reads = []
+            backend_get = cache.backend.get
+            cache.backend.get = lambda key, stale_seconds=0: backend_reads.append(key) or backend_get(key, stale_seconds)
+
+            if cache.get("bloom query 2") is None or cache.get("bloom query 1") is None:
+                print("✗ 重启后已有条目未命中")
+                return False
+
+            for i in range(100):
+                cache.get(f"absent query {i}")
+            bloom = cache.stats()["bloom"]
+            if bloom["entries"] != 2 or bloom["skipped"] + bloom["false_positives"] != 100:
+                print(f"✗ 过滤器统计错误: {bloom}")
+                return False
+            if len(backend_reads) != 2 + bloom["false_positives"]:
+                print(f"✗ 一定不存在的键仍访问了持久层: {len(backend_reads)} 次")
+                return False
+            print(f"✓ 100 次未命中跳过持久层 {bloom['skipped']} 次，假阳性率 {bloom['false_positive_rate']}")
+
+            # 淘汰的键从过滤器移除
+            cache.set("bloom query 3", {"results": []})
+            if len(cache.bloom) != 2:
+                print(f"✗ 淘汰后过滤器键数错误: {len(cache.bloom)}")
+                return False
+            print("✓ 写入与淘汰同步更新过滤器")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_admission_policy():
+    """测试 TinyLFU 准入"""
+    print("=== 测试 TinyLFU 准入 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SearchCache(
+                cache_dir=tmp_dir, memory_max_entries=0, max_entries=2, admission_policy="tinylfu"
+            )
+            for query in ("hot a", "hot b"):
+                for _ in range(3):
+                    if cache.get(query) is None:
+                        cache.set(query, {"results": [{"title": query}]})
+
+            # 只查询一次的长尾查询不挤掉热门条目
+            cache.get("one-off")
+            cache.set("one-off", {"results": [{"title": "one-off"}]})
+            if cache.get("hot a") is None or cache.get("hot b") is None:
+                print("✗ 长尾查询挤掉了热门条目")
+                return False
+            if cache.stats()["admission"]["rejected"] != 1:
+                print(f"✗ 准入统计错误: {cache.stats()['admission']}")
+                return False
+            print("✓ 长尾查询未准入，热门条目保留")
+
+            # 变热后准入
+            for _ in range(5):
+                cache.get("rising")
+            cache.set("rising", {"results": [{"title": "rising"}]})
+            if cache.get("rising") is None:
+                print("✗ 高频新查询未准入")
+                return False
+            print("✓ 高频新查询替换较冷条目")
+
+            # 按调用覆盖为 always
+            cache.set("forced", {"results": []}, admission="always")
+            if cache.get("forced") is None:
+                print("✗ admission='always' 未写入")
+                return False
+            print("✓ 单次写入可覆盖准入策略")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_brave_cache():
+    """测试 Brave 缓存与分引擎统计"""
+    print("=== 测试 Brave 缓存 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            client = UnifiedSearchClient(anspire_api_key="test-key", brave_api_key="test-key")
+            cache = SearchCache(cache_dir=tmp_dir)
+            client.anspire_client.cache = cache
+            client.brave_client.cache = cache
+
+            calls = []
+
+            def brave_fetch(params, deadline=None):
+                calls.append(("brave", params["offset"]))
+                return {"web": {"results": [{"title": f"brave {len(calls)}"}]}}
+
+            def anspire_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                calls.append(("anspire", 0))
+                return {"results": [{"title": "anspire"}]}
+
+            client.brave_client._fetch = brave_fetch
+            client.anspire_client._fetch = anspire_fetch
+
+            client.search("brave query", engine=SearchEngine.BRAVE)
+            client.search("brave query", engine=SearchEngine.BRAVE)
+            client.search("brave query", engine=SearchEngine.BRAVE, offset=1)
+            if calls != [("brave", 0), ("brave", 1)]:
+                print(f"✗ Brave 缓存未命中或 offset 未区分: {calls}")
+                return False
+            print("✓ Brave 重复查询命中缓存，offset 不同则分开缓存")
+
+            client.search_news("brave news", engine=SearchEngine.BRAVE)
+            news = client.search_news("brave news", engine=SearchEngine.BRAVE)
+            if len(calls) != 3 or news["news"] != {"results": []}:
+                print(f"✗ 新闻搜索缓存异常: {calls}")
+                return False
+            print("✓ 新闻搜索命中缓存")
+
+            empty_calls = []
+
+            def empty_fetch(params, deadline=None):
+                empty_calls.append(params)
+                return {"type": "search", "query": {"original": params["q"]}, "web": {"results": []}}
+
+            brave = BraveSearchClient(api_key="test-key")
+            brave.cache = SearchCache(cache_dir=tmp_dir, negative_ttl_seconds={"empty": 30})
+            brave._fetch = empty_fetch
+            brave.search("nothing on brave")
+            result = brave.search("nothing on brave")
+            cached = brave.cache.lookup("nothing on brave", top_k=0, namespace=_cache_namespace(empty_calls[0]))
+            if (len(empty_calls) != 1 or result["web"]["results"] or cached.kind != "empty"
+                    or cached.expires_at - time.time() > 30):
+                print(f"✗ 空结果未按负缓存短期保存: {empty_calls}, {cached}")
+                return False
+            print("✓ 空结果按负缓存保存（短有效期），有效期内直接返回")
+
+            client.search("brave query", engine=SearchEngine.ANSPIRE)
+            if calls[-1] != ("anspire", 0):
+                print("✗ 不同引擎的相同查询互相命中")
+                return False
+            print("✓ 不同引擎的键互不命中")
+
+            engines = client.get_cache_stats()["engines"]
+            if engines["brave"]["hits"] != 2 or engines["brave"]["misses"] != 3 or engines["anspire"]["misses"] != 1:
+                print(f"✗ 分引擎统计错误: {engines}")
+                return False
+            print(f"✓ 分引擎统计: {engines}")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_http_session():
+    """测试共享 HTTP 会话与连接复用"""
+    print("=== 测试共享 HTTP 会话 ===")
+    try:
+        first = AnspireSearchAgent(api_key="test-key", enable_cache=False)
+        second = AnspireSearchAgent(api_key="other-key", enable_cache=False)
+        brave = BraveSearchClient(api_key="test-key", enable_cache=False)
+        if first.session is not second.session or first.session is brave.session:
+            print("✗ 会话未按引擎共享")
+            return False
+        print("✓ 同一引擎的客户端共享会话，不同引擎各自独立")
+
+        with StubServer() as server:
+            first.base_url = server.url
+            second.base_url = server.url
+
+            first.search("session query", top_k=3)
+            first.search("session query", top_k=3)
+            if server.connections != 1:
+                print(f"✗ 顺序请求未复用连接: {server.connections} 个连接")
+                return False
+            print("✓ 顺序请求复用同一连接")
+
+            errors = []
+
+            def worker(agent, i):
+                try:
+                    result = agent.search(f"thread {i}", top_k=2)
+                    if len(result["results"]) != 2:
+                        errors.append(result)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [
+                threading.Thread(target=worker, args=(first if i % 2 else second, i))
+                for i in range(16)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            if errors or server.requests != 18:
+                print(f"✗ 多线程共用会话出错: {errors[:3]}, 请求数 {server.requests}")
+                return False
+            print(f"✓ 16 个线程共用会话，服务端连接数 {server.connections}")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_search_many():
+    """测试批量搜索：去重、缓存、并发上限、顺序与错误捕获"""
+    print("=== 测试批量搜索 ===")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # "broken" 的连接错误不重试，以便检查并发与耗时
+            client = UnifiedSearchClient(
+                anspire_api_key="test-key", brave_api_key="test-key", retry={"anspire": False, "brave": False}
+            )
+            cache = SearchCache(cache_dir=tmp_dir)
+            client.anspire_client.cache = cache
+            client.brave_client.cache = cache
+
+            calls = []
+            active = [0, 0]  # 当前并发数、最大并发数
+            lock = threading.Lock()
+
+            def anspire_fetch(query, top_k, insite, from_time, to_time, deadline=None):
+                with lock:
+                    calls.append(query)
+                    active[0] += 1
+                    active[1] = max(active[1], active[0])
+                time.sleep(0.1)
+                with lock:
+                    active[0] -= 1
+                if query == "broken":
+                    raise requests.ConnectionError("upstream down")
+                return {"results": [{"title": query}] * top_k}
+
+            def brave_fetch(params, deadline=None):
+                calls.append(("brave", params["q"]))
+                if params["q"] in ("broken", "flaky"):
+                    raise requests.ConnectionError("upstream down")
+                return {"web": {"results": [{"title": params["q"]}]}}
+
+            client.anspire_client._fetch = anspire_fetch
+            client.brave_client._fetch = brave_fetch
+
+            client.search("cached query", count=3)
+            calls.clear()
+
+            queries = ["Python  Asyncio", "cached query", "python asyncio", "broken", "q1", "q2", "q3", "q4", "brave q", "flaky"]
+            per_query = [None] * len(queries)
+            per_query[-2] = {"engine": SearchEngine.BRAVE}
+            per_query[-1] = {"engine": SearchEngine.BRAVE}
+            start = time.time()
+            results = client.search_many(queries, count=3, max_concurrency=3, per_query_kwargs=per_query)
+            elapsed = time.time() - start
+
+            if [r.get("results", [{}])[0].get("title") for r in results[:3]] != ["python asyncio", "cached query", "python asyncio"]:
+                print(f"✗ 结果顺序或去重错误: {results[:3]}")
+                return False
+            if results[0] is not results[2] or calls.count("python asyncio") != 1 or "cached query" in calls:
+                print(f"✗ 重复查询或缓存命中仍请求上游: {calls}")
+                return False
+            print("✓ 规范化后相同的查询只请求一次，缓存命中不请求上游，结果按输入顺序返回")
+
+            if results[3] != {"error": "upstream down"} or results[-2]["web"]["results"][0]["title"] != "brave q":
+                print(f"✗ 错误捕获或按查询指定引擎失败: {results[3]}, {results[-2]}")
+                return False
+            print("✓ 所有引擎都失败的查询记录为 error，按查询参数指定引擎")
+
+            if results[-1]["engine"] != "anspire" or results[-1]["fallback"][0]["engine"] != "brave" or results[1]["engine"] != "anspire":
+                print(f"✗ 批量搜索未经过回退链或结果格式不一致: {results[-1]}")
+                return False
+            print("✓ 批量搜索与单个搜索一样回退并统一结果格式")
+
+            if active[1] != 3 or elapsed > 0.5:
+                print(f"✗ 并发上限异常: 最大并发 {active[1]}, 耗时 {elapsed:.2f}s")
+                return False
+            print(f"✓ 上游请求以并发 3 执行，耗时 {elapsed:.2f}s")
+
+            try:
+                client.search_many(["a", "b"], per_query_kwargs=[None])
+                print("✗ per_query_kwargs 长度不符未报错")
+                return False
+            except ValueError:
+                print("✓ per_query_kwargs 长度校验")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_deadline():
+    """测试端到端截止时间：超时拆分、分阶段记录、过期不再请求"""
+    print("=== 测试截止时间 ===")
+    try:
+        if Deadline().timeouts() != (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT):
+            print("✗ 未设截止时间时未使用默认超时")
+            return False
+        connect, read = Deadline(2).timeouts()
+        child = Deadline(2).child(share=0.5, reserve=1)
+        if not (0.59 < connect <= 0.6 and 1.9 < read <= 2) or not 0.45 < child.remaining() <= 0.5:
+            print(f"✗ 预算拆分错误: connect={connect}, read={read}, child={child.remaining()}")
+            return False
+        print(f"✓ 2s 预算拆分为连接 {connect:.2f}s / 读取 {read:.2f}s，子预算为回退保留时间")
+
+        with tempfile.TemporaryDirectory() as tmp_dir, StubServer(delay=2) as server:
+            agent = AnspireSearchAgent(api_key="test-key", enable_intent=False)
+            agent.base_url = server.url
+            agent.cache = SearchCache(cache_dir=tmp_dir)
+
+            deadline = Deadline(0.5)
+            start = time.time()
+            try:
+                agent.search("slow upstream", deadline=deadline)
+                print("✗ 未抛出 DeadlineExceeded")
+                return False
+            except DeadlineExceeded as e:
+                elapsed = time.time() - start
+                stages = {stage["stage"]: stage["timed_out"] for stage in e.stages}
+                if e.stage != "anspire.fetch.read" or stages != {"anspire.cache": False, "anspire.fetch.read": True} or elapsed > 1:
+                    print(f"✗ 超时阶段记录错误: {e.stage}, {e.stages}, {elapsed:.2f}s")
+                    return False
+                if not isinstance(e, requests.Timeout):
+                    print("✗ DeadlineExceeded 不是 requests.Timeout")
+                    return False
+                print(f"✓ 上游挂起 {elapsed:.2f}s 后按读取阶段超时返回: {e}")
+
+            requests_before = server.requests
+            try:
+                agent.search("no time left", deadline=0)
+                print("✗ 过期截止时间仍然发出请求")
+                return False
+            except DeadlineExceeded as e:
+                if e.stage != "anspire.fetch" or server.requests != requests_before:
+                    print(f"✗ 过期后仍请求上游: {e.stage}")
+                    return False
+            print("✓ 截止时间已过时不再发出请求")
+
+            agent.cache.set("cached query", {"results": [{"title": "cached"}]}, namespace=CACHE_NAMESPACE)
+            if agent.search("cached query", deadline=0)["results"][0]["title"] != "cached":
+                print("✗ 截止时间已过时未返回缓存结果")
+                return False
+            print("✓ 缓存命中不受截止时间影响")
+
+            # 连接超时：阶段记为 connect
+            def connect_timeout(*args, **kwargs):
+                raise requests.ConnectTimeout("connect timed out")
+
+            agent.session = type("Session", (), {"get": staticmethod(connect_timeout)})()
+            try:
+                agent.search("unreachable", deadline=5, use_cache=False)
+                print("✗ 连接超时未抛出 DeadlineExceeded")
+                return False
+            except DeadlineExceeded as e:
+                if e.stage != "anspire.fetch.connect":
+                    print(f"✗ 连接超时阶段错误: {e.stage}")
+                    return False
+            print("✓ 连接超时记为 connect 阶段")
+
+            # 未传截止时间：普通请求，不流式读取
+            calls = []
+
+            def plain_get(*args, **kwargs):
+                calls.append(kwargs)
+                raise requests.ConnectionError("offline")
+
+            agent.session = type("Session", (), {"get": staticmethod(plain_get)})()
+            try:
+                agent.search("no deadline", use_cache=False)
+            except requests.ConnectionError:
+                pass
+            if not calls or calls[0].get("stream") or calls[0].get("timeout") != (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT):
+                print(f"✗ 未传截止时间时仍走流式读取: {calls}")
+                return False
+            print("✓ 未传截止时间时使用普通请求与默认超时")
+
+        attempt = _attempt_kwargs({"deadline": Deadline(10)}, 1)["deadline"]
+        _, read = attempt.timeouts()
+        if not 4.7 < read <= 4.8:
+            print(f"✗ 有回退引擎时单次读取超时未封顶: {read:.2f}s")
+            return False
+        print(f"✓ 有回退引擎时单次读取超时封顶为 {read:.2f}s（10s 预算）")
+
+        with tempfile.TemporaryDirectory() as tmp_dir, StubServer(delay=1) as server:
+            client = UnifiedSearchClient(anspire_api_key="test-key")
+            client.anspire_client.base_url = server.url
+            client.anspire_client.cache = SearchCache(cache_dir=tmp_dir)
+            start = time.time()
+            results = client.search_many([f"batch {i}" for i in range(4)], deadline=0.3)
+            elapsed = time.time() - start
+            if any("超时" not in r.get("error", "") for r in results) or elapsed > 0.8:
+                print(f"✗ 批量搜索未共用截止时间: {results}, {elapsed:.2f}s")
+                return False
+            print(f"✓ 批量搜索共用一个截止时间，{elapsed:.2f}s 内全部返回超时")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_retry_policy():
+    """测试重试策略：指数退避、Retry-After / Brave 限流头、截止时间与重试统计"""
+    print("=== 测试重试策略 ===")
+    try:
+        policy = RetryPolicy(base_delay=0.5, max_delay=2)
+        delays = [policy.backoff(retries) for retries in range(8) for _ in range(50)]
+        if min(delays) < 0 or max(delays[:50]) > 0.5 or max(delays) > 2 or max(delays[-50:]) < 1:
+            print(f"✗ 退避时间不在封顶的全抖动范围内: {min(delays)}..{max(delays)}")
+            return False
+        print("✓ 退避时间为 [0, min(max_delay, base_delay * 2^n)] 内的随机值")
+
+        http_date = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 10))
+        waits = [
+            server_wait({"Retry-After": "2"}),
+            server_wait({"Retry-After": http_date}),
+            server_wait({"X-RateLimit-Remaining": "0, 900", "X-RateLimit-Reset": "1, 2000000"}),
+            server_wait({"X-RateLimit-Remaining": "3, 0", "X-RateLimit-Reset": "1, 2000000"}),
+            server_wait({"X-RateLimit-Remaining": "3, 900", "X-RateLimit-Reset": "1, 2000000"}),
+        ]
+        if waits[0] != 2 or not 8 < waits[1] <= 10 or waits[2:] != [1, 2000000, None]:
+            print(f"✗ 服务端等待时间解析错误: {waits}")
+            return False
+        print("✓ 解析 Retry-After（秒数 / HTTP 日期）与 Brave X-RateLimit-* 限流头")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            faults = FaultInjector([503, DROP, None])
+            with StubServer(faults) as server:
+                agent = AnspireSearchAgent(
+                    api_key="test-key", enable_intent=False,
+                    retry=RetryPolicy(base_delay=0.01)
+                )
+                agent.base_url = server.url
+                agent.cache = SearchCache(cache_dir=tmp_dir)
+                deadline = Deadline(5)
+                result = agent.search("flaky upstream", top_k=2, deadline=deadline)
+                stats = agent.get_retry_stats()
+                retry_stages = [stage["stage"] for stage in deadline.stages if stage["stage"] == "anspire.retry"]
+                if len(result["results"]) != 2 or faults.served != [503, DROP, 200] or len(retry_stages) != 2:
+                    print(f"✗ 503 与断开连接未重试成功: {faults.served}, {deadline.stages}")
+                    return False
+                if stats["retries"] != 2 or stats["recovered"] != 1 or stats["reasons"] != {"503": 1, "connection": 1}:
+                    print(f"✗ 重试统计错误: {stats}")
+                    return False
+                print(f"✓ 503 与连接断开后重试成功，重试统计: {stats}")
+
+            faults = FaultInjector([503] * 3)
+            with StubServer(faults) as server:
+                agent.base_url = server.url
+                retries = []
+                for _ in range(2):
+                    try:
+                        agent.search("always down")
+                        print("✗ 重试用完后未抛出 HTTPError")
+                        return False
+                    except requests.HTTPError as e:
+                        retries.append(getattr(e, "retries", None))
+                # 第二次命中负缓存，不经过重试
+                if server.requests != 3 or retries != [2, None] or agent.get_retry_stats()["exhausted"] != 1:
+                    print(f"✗ 重试次数或负缓存错误: 请求 {server.requests} 次, retries={retries}")
+                    return False
+                print("✓ 最多尝试 max_attempts 次，最终错误写入负缓存，再次搜索不再请求")
+
+            faults = FaultInjector([400, (503, {"Retry-After": "5"})])
+            with StubServer(faults) as server:
+                agent.base_url = server.url
+                for query, expected_status in (("bad request", 400), ("retry later", 503)):
+                    start = time.time()
+                    try:
+                        agent.search(query, deadline=2)
+                    except requests.HTTPError as e:
+                        status, retries = e.response.status_code, e.retries
+                    if status != expected_status or retries != 0 or time.time() - start > 0.5:
+                        print(f"✗ 不应重试的错误被重试: {query}, {status}, retries={retries}")
+                        return False
+                print("✓ 4xx 不重试；Retry-After 超出剩余截止时间时立即放弃")
+
+        faults = FaultInjector([
+            (429, {"X-RateLimit-Remaining": "0, 900", "X-RateLimit-Reset": "1, 2000000"}),
+            None,
+            (429, {"X-RateLimit-Remaining": "5, 0", "X-RateLimit-Reset": "1, 2000000"}),
+        ])
+        with StubServer(faults) as server:
+            brave = BraveSearchClient(api_key="test-key", enable_cache=False, retry=RetryPolicy(base_delay=0.01))
+            brave.base_url = server.url
+            start = time.time()
+            brave.search("rate limited", count=2)
+            elapsed = time.time() - start
+            if faults.served != [429, 200] or elapsed < 1:
+                print(f"✗ 未按 X-RateLimit-Reset 等待: {faults.served}, {elapsed:.2f}s")
+                return False
+            print(f"✓ Brave 每秒限额用完时按 X-RateLimit-Reset 等待 {elapsed:.2f}s 后重试")
+
+            try:
+                brave.search("monthly quota", count=2)
+                print("✗ 月度配额耗尽时未抛出 HTTPError")
+                return False
+            except requests.HTTPError as e:
+                if server.requests != 3 or e.retries != 0:
+                    print(f"✗ 月度配额耗尽时仍然重试: {server.requests}")
+                    return False
+            print("✓ 等待时间超过 max_retry_after（月度配额耗尽）时不重试")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_rate_limiter():
+    """测试客户端限流：令牌桶、按 API Key 共享、跨进程共享与按限流头校准"""
+    print("=== 测试客户端限流 ===")
+    try:
+        now = [0.0]
+        bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+        waits = [bucket.take()[0] for _ in range(3)]
+        rejected = bucket.take(max_wait=0.5)
+        if waits != [0, 0, 0.5] or rejected != (1.0, False) or bucket.take()[0] != 1.0:
+            print(f"✗ 令牌桶等待时间错误: {waits}, {rejected}")
+            return False
+        now[0] = 10
+        if bucket.take()[0] != 0:
+            print("✗ 令牌未按速率补充")
+            return False
+        print("✓ 令牌桶按速率补充、允许突发，超过最长等待时不取令牌")
+
+        headers = {
+            "X-RateLimit-Limit": "1, 15000",
+            "X-RateLimit-Remaining": "0, 14000",
+            "X-RateLimit-Reset": "1, 100000",
+            "X-RateLimit-Policy": "1;w=1, 15000;w=2592000"
+        }
+        bucket = TokenBucket(clock=lambda: now[0])
+        if bucket.take()[0] != 0:
+            print("✗ 未校准的桶应不限速")
+            return False
+        bucket.calibrate(rate_limit_windows(headers))
+        state = bucket.state()
+        if state["rate"] != 1 or state["blocked_for"] != 1 or bucket.take()[0] != 1:
+            print(f"✗ 按限流头校准错误: {state}")
+            return False
+        print(f"✓ 按 X-RateLimit-* 校准速率，窗口耗尽时暂停到重置: {state}")
+
+        first = BraveSearchClient(api_key="limit-key-a", enable_cache=False, rate_limit={"rate": 1})
+        second = BraveSearchClient(api_key="limit-key-a", enable_cache=False, rate_limit={"rate": 5})
+        other = BraveSearchClient(api_key="limit-key-b", enable_cache=False, rate_limit={"rate": 1})
+        if first.rate_limiter is not second.rate_limiter or first.rate_limiter is other.rate_limiter:
+            print("✗ 限流器未按 API Key 共享")
+            return False
+        print("✓ 同一 API Key 的客户端共享令牌桶，不同 Key 各自独立")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "ratelimit.db")
+            script = (
+                "import sys; sys.path[:0] = sys.argv[2:];"
+                "from rate_limiter import get_rate_limiter;"
+                "limiter = get_rate_limiter('brave', 'shared-key', rate=5, burst=1, path=sys.argv[1]);"
+                "print(max(limiter.reserve() for _ in range(5)))"
+            )
+            paths = [os.path.join(os.path.dirname(__file__), "..", "utils")]
+            processes = [
+                subprocess.Popen([sys.executable, "-c", script, path] + paths, stdout=subprocess.PIPE, text=True)
+                for _ in range(2)
+            ]
+            max_wait = max(float(process.communicate(timeout=30)[0]) for process in processes)
+            # 两个进程共 10 个令牌、每秒 5 个：最后一个需等待约 1.8s；不共享时只需 0.8s
+            if not 1.5 < max_wait < 2.1:
+                print(f"✗ 跨进程未共享预算: 最长等待 {max_wait:.2f}s")
+                return False
+            print(f"✓ 两个进程通过 SQLite 共享令牌桶，最后一个请求等待 {max_wait:.2f}s")
+
+        def limited_handler(path, params, headers):
+            return 200, {
+                "X-RateLimit-Limit": "2, 15000",
+                "X-RateLimit-Remaining": "1, 14000",
+                "X-RateLimit-Reset": "1, 100000"
+            }, {"web": {"results": []}}
+
+        with StubServer(limited_handler) as server:
+            brave = BraveSearchClient(api_key="limit-key-c", enable_cache=False, rate_limit={})
+            brave.base_url = server.url
+            start = time.time()
+            for i in range(5):
+                brave.search(f"paced {i}")
+            elapsed = time.time() - start
+            stats = brave.get_rate_limit_stats()
+            if elapsed < 1.4 or stats["calibrations"] != 5 or stats["bucket"]["rate"] != 2:
+                print(f"✗ 未按校准后的速率限流: {elapsed:.2f}s, {stats}")
+                return False
+            print(f"✓ 首个响应校准为每秒 2 次，后续请求按速率排队，5 个请求耗时 {elapsed:.2f}s")
+
+            for _ in range(3):
+                brave.rate_limiter.reserve()
+            start = time.time()
+            try:
+                brave.search("no budget", deadline=0.5)
+                print("✗ 等待令牌超过截止时间未抛出")
+                return False
+            except DeadlineExceeded as e:
+                if e.stage != "brave.fetch.ratelimit" or time.time() - start > 0.2:
+                    print(f"✗ 限流超时阶段错误: {e.stage}")
+                    return False
+            print("✓ 等待令牌会超过截止时间时立即抛出 DeadlineExceeded")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_circuit_breaker():
+    """测试熔断器：按错误率 / 耗时熔断、半开探测、状态转换回调与统一客户端回退"""
+    print("=== 测试熔断器 ===")
+    try:
+        now = [0.0]
+        transitions = []
+        breaker = CircuitBreaker("test", window_seconds=10, min_calls=4, open_seconds=5, clock=lambda: now[0])
+        breaker.add_listener(lambda name, old, new, reason: transitions.append((old, new)))
+
+        def call(error=None, latency=0.0, target=None):
+            with (target or breaker).attempt():
+                now[0] += latency
+                if error is not None:
+                    raise error
+
+        def http_error(status):
+            response = requests.Response()
+            response.status_code = status
+            return requests.HTTPError(f"{status} Error", response=response)
+
+        for error in (None, http_error(404), None, None, requests.ConnectionError("down"), http_error(503)):
+            try:
+                call(error)
+            except requests.RequestException:
+                pass
+        if breaker.state != BreakerState.CLOSED or breaker.stats()["calls"] != 5:
+            print(f"✗ 未满 min_calls 或 4xx 计入统计: {breaker.stats()}")
+            return False
+        try:
+            call(requests.ConnectionError("down"))
+        except requests.ConnectionError:
+            pass
+        if breaker.state != BreakerState.OPEN:
+            print(f"✗ 错误率达到阈值未熔断: {breaker.stats()}")
+            return False
+        try:
+            call()
+            print("✗ 熔断时仍放行请求")
+            return False
+        except CircuitOpenError as e:
+            if e.retry_in != 5:
+                print(f"✗ 重新探测时间错误: {e.retry_in}")
+                return False
+        print("✓ 窗口内错误率达到 50% 时熔断（4xx 不计入），熔断期间直接抛出 CircuitOpenError")
+
+        now[0] += 5
+        probe = breaker.attempt().__enter__()
+        try:
+            call()
+            print("✗ 半开状态放行了多个探测请求")
+            return False
+        except CircuitOpenError:
+            pass
+        probe.__exit__(requests.ConnectionError, requests.ConnectionError("still down"), None)
+        now[0] += 5
+        call(latency=0.1)
+        if breaker.state != BreakerState.CLOSED or transitions != [
+            ("closed", "open"), ("open", "half_open"), ("half_open", "open"),
+            ("open", "half_open"), ("half_open", "closed")
+        ]:
+            print(f"✗ 半开探测转换错误: {transitions}")
+            return False
+        print(f"✓ 半开时只放行一个探测，失败重新熔断、成功恢复: {' → '.join(new for _, new in transitions)}")
+
+        slow = CircuitBreaker("slow", min_calls=2, slow_call_seconds=1, clock=lambda: now[0])
+        call(latency=2, target=slow)
+        call(latency=3, target=slow)
+        if slow.state != BreakerState.OPEN or "slow calls" not in slow.stats()["transitions"][-1]["reason"]:
+            print(f"✗ 慢调用比例达到阈值未熔断: {slow.stats()}")
+            return False
+        print("✓ 慢调用比例达到阈值时熔断")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            brave_queries = []
+
+            def brave_handler(path, params, headers):
+                brave_queries.append(params["q"])
+                return 200, {}, {"web": {"results": [{"title": params["q"]}]}}
+
+            down = StubServer(lambda path, params, headers: (503, {}, {"error": "down"}))
+            with down as anspire_server, StubServer(brave_handler) as brave_server:
+                client = UnifiedSearchClient(
+                    anspire_api_key="test-key",
+                    brave_api_key="test-key",
+                    retry={"anspire": False},
+                    circuit_breaker={"anspire": {"min_calls": 3, "open_seconds": 60}},
+                    fallback_on_error=False
+                )
+                client.anspire_client.base_url = anspire_server.url
+                client.brave_client.base_url = brave_server.url
+                cache = SearchCache(cache_dir=tmp_dir)
+                client.anspire_client.cache = cache
+                client.brave_client.cache = cache
+                cache.set("cached query", {"results": [{"title": "cached"}]}, top_k=10, namespace=CACHE_NAMESPACE)
+
+                for i in range(3):
+                    try:
+                        client.search(f"failing {i}")
+                        print("✗ 熔断前 HTTP 错误未抛出")
+                        return False
+                    except requests.HTTPError:
+                        pass
+
+                result = client.search("served elsewhere", insite="example.com")
+                if anspire_server.requests != 3 or result["web"]["results"][0]["title"] != "site:example.com served elsewhere":
+                    print(f"✗ 熔断后未回退到 Brave: {anspire_server.requests}, {result}")
+                    return False
+                print("✓ Anspire 熔断后不再请求，按回退链改用 Brave（insite 转为 site: 语法）")
+
+                if client.search("cached query")["results"][0]["title"] != "cached" or len(brave_queries) != 1:
+                    print("✗ 熔断期间缓存命中未直接返回")
+                    return False
+                print("✓ 熔断期间缓存命中照常返回")
+
+                stats = client.get_breaker_stats()
+                if stats["anspire"]["state"] != "open" or stats["anspire"]["rejected"] != 1 or stats["brave"]["state"] != "closed":
+                    print(f"✗ 熔断器统计错误: {stats}")
+                    return False
+                print(f"✓ 熔断器状态可观察: anspire {stats['anspire']['state']}（{stats['anspire']['transitions'][-1]['reason']}）")
+
+                client.fallback_on_open = False
+                start = time.time()
+                try:
+                    client.search("fail fast")
+                    print("✗ fallback_on_open=False 时未抛出 CircuitOpenError")
+                    return False
+                except CircuitOpenError:
+                    if time.time() - start > 0.1:
+                        print("✗ 熔断时未快速失败")
+                        return False
+                print("✓ fallback_on_open=False 时直接抛出 CircuitOpenError")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
+def test_fallback_chain():
+    """测试回退链：失败、无结果、超时时改用下一个引擎，总预算内完成并统一结果格式"""
+    print("=== 测试回退链 ===")
+    try:
+        raw = RawResult(json.dumps({"results": [{"title": "cached", "url": "https://a", "content": "c"}]}).encode())
+        normalized = normalize_result(SearchEngine.ANSPIRE, raw)
+        if normalized["items"] != [{"title": "cached", "url": "https://a", "snippet": "c", "date": ""}] or "engine" in raw:
+            print(f"✗ 结果统一格式错误: {normalized}")
+            return False
+        print("✓ 只读的缓存结果复制后统一格式，原结果不变")
+
+        def brave_handler(path, params, headers):
+            return 200, {}, {"web": {"results": [
+                {"title": params["q"], "url": "https://b", "description": "brave", "page_age": "2026-01-01"}
+            ]}}
+
+        def empty_handler(path, params, headers):
+            return 200, {}, {"results": []}
+
+        def make_client(anspire_server, brave_server):
+            client = UnifiedSearchClient(
+                anspire_api_key="test-key", brave_api_key="test-key",
+                retry={"anspire": False, "brave": False}, circuit_breaker=False
+            )
+            client.anspire_client.base_url = anspire_server.url
+            client.brave_client.base_url = brave_server.url
+            client.anspire_client.cache = None
+            client.brave_client.cache = None
+            return client
+
+        with StubServer(FaultInjector([503])) as anspire_server, StubServer(brave_handler) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            result = client.search("http error", count=2)
+            if (result["engine"] != "brave" or result["fallback"][0]["engine"] != "anspire"
+                    or "503" not in result["fallback"][0]["error"]
+                    or result["items"][0] != {"title": "http error", "url": "https://b", "snippet": "brave", "date": "2026-01-01"}):
+                print(f"✗ HTTP 错误后未回退到 Brave: {result}")
+                return False
+            print(f"✓ Anspire 返回 503 后由 Brave 返回结果: {result['fallback']}")
+
+            result = client.search("recovered", count=2)
+            if result["engine"] != "anspire" or "fallback" in result or len(result["items"]) != 2:
+                print(f"✗ 正常时未由指定引擎返回: {result}")
+                return False
+            print("✓ 指定引擎正常时直接返回，记录 engine")
+
+            client.anspire_client = None
+            result = client.search("no anspire")
+            if result["engine"] != "brave" or "未初始化" not in result["fallback"][0]["error"]:
+                print(f"✗ 引擎未初始化时未回退: {result}")
+                return False
+            print("✓ 指定引擎未初始化时改用其他引擎")
+
+            try:
+                client.search("no time left", deadline=0.0001)
+                print("✗ 回退前预算已用完未抛出 DeadlineExceeded")
+                return False
+            except DeadlineExceeded as e:
+                if e.failures[0]["engine"] != "anspire":
+                    print(f"✗ 失败记录错误: {e.failures}")
+                    return False
+            print("✓ 指定引擎未初始化且回退前预算已用完时抛出 DeadlineExceeded")
+
+        with StubServer(empty_handler) as anspire_server, StubServer(brave_handler) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            result = client.search("nothing here")
+            if result["engine"] != "brave" or result["fallback"] != [{"engine": "anspire", "error": "empty"}]:
+                print(f"✗ 无结果时未回退: {result}")
+                return False
+            print("✓ Anspire 无结果时改用 Brave")
+
+        with StubServer(empty_handler) as anspire_server, StubServer(empty_handler) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            result = client.search("nothing anywhere")
+            if result["engine"] != "anspire" or [f["engine"] for f in result["fallback"]] != ["anspire", "brave"]:
+                print(f"✗ 全部无结果时返回错误: {result}")
+                return False
+            print("✓ 全部无结果时返回第一个空结果并记录每个引擎")
+
+        def brave_empty(path, params, headers):
+            return 200, {}, {"web": {"results": []}}
+
+        with StubServer() as anspire_server, StubServer(brave_empty) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            result = client.search_news("no news", engine=SearchEngine.BRAVE, count=2)
+            if result["engine"] != "anspire" or result["fallback"] != [{"engine": "brave", "error": "empty"}]:
+                print(f"✗ Brave 新闻无结果时未回退: {result}")
+                return False
+            print("✓ Brave 新闻无结果时改用 Anspire")
+
+        with StubServer(empty_handler) as anspire_server, StubServer(brave_empty) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            result = client.search_news("no news anywhere", engine=SearchEngine.BRAVE)
+            if (result["engine"] != "brave" or result["items"]
+                    or [f["engine"] for f in result["fallback"]][:2] != ["brave", "anspire"]):
+                print(f"✗ 新闻全部无结果时返回错误: {result}")
+                return False
+            print("✓ 新闻全部无结果时返回 Brave 的空结果并记录每个引擎")
+
+        with StubServer(FaultInjector([503])) as anspire_server, StubServer(brave_handler) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            result = client.search("multi site", insite="b.com,a.com")
+            if result["items"][0]["title"] != "(site:b.com OR site:a.com) multi site":
+                print(f"✗ 多个站点未转为 OR 连接的 site: 语法: {result['items'][0]['title']}")
+                return False
+            print("✓ 回退到 Brave 时多个站点转为 (site:a OR site:b)")
+
+        with StubServer(delay=2) as anspire_server, StubServer(brave_handler) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            deadline = Deadline(1.0)
+            start = time.time()
+            result = client.search("slow primary", deadline=deadline)
+            elapsed = time.time() - start
+            if result["engine"] != "brave" or elapsed > 1.0 or not any(s["timed_out"] for s in deadline.stages):
+                print(f"✗ 超时后未在预算内回退: {elapsed:.2f}s, {result}")
+                return False
+            print(f"✓ Anspire 超时后为 Brave 留出预算，{elapsed:.2f}s 内返回")
+
+        with StubServer(delay=2) as anspire_server, StubServer(delay=2) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            start = time.time()
+            try:
+                client.search("slow everywhere", deadline=0.6)
+                print("✗ 总预算用完未抛出 DeadlineExceeded")
+                return False
+            except DeadlineExceeded:
+                elapsed = time.time() - start
+                if elapsed > 0.9:
+                    print(f"✗ 超出总预算: {elapsed:.2f}s")
+                    return False
+            print(f"✓ 所有引擎超时时在总预算内（{elapsed:.2f}s）抛出 DeadlineExceeded")
+
+        with StubServer(FaultInjector([503])) as anspire_server, StubServer(brave_handler) as brave_server:
+            client = make_client(anspire_server, brave_server)
+            client.fallback_on_error = False
+            try:
+                client.search("no fallback")
+                print("✗ fallback_on_error=False 时未抛出 HTTP 错误")
+                return False
+            except requests.HTTPError:
+                pass
+            print("✓ fallback_on_error=False 时直接抛出")
+
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        return False
+
+    print()
+    return True
+
+
 def test_intent_classification():
     """测试意图分类"""
     print("=== 测试意图分类 ===")
@@ -209,6 +1901,31 @@ def main():
     # 运行测试
     tests = [
         ("缓存功能", test_cache),
+        ("SQLite 缓存后端", test_cache_sqlite_backend),
+        ("内存 LRU 层", test_cache_memory_tier),
+        ("容量淘汰", test_cache_eviction),
+        ("stale-while-revalidate", test_stale_while_revalidate),
+        ("请求合并", test_single_flight),
+        ("top_k 覆盖命中", test_top_k_subsumption),
+        ("查询规范化", test_query_canonicalization),
+        ("负缓存", test_negative_cache),
+        ("分片目录", test_sharded_layout),
+        ("条目头", test_entry_header),
+        ("原子写入", test_atomic_writes),
+        ("条目编码", test_cache_codecs),
+        ("原始响应缓存", test_raw_responses),
+        ("布隆过滤器", test_bloom_filter),
+        ("TinyLFU 准入", test_admission_policy),
+        ("refresh-ahead", test_refresh_ahead),
+        ("意图 TTL", test_intent_ttl),
+        ("Brave 缓存", test_brave_cache),
+        ("共享 HTTP 会话", test_http_session),
+        ("批量搜索", test_search_many),
+        ("截止时间", test_deadline),
+        ("重试策略", test_retry_policy),
+        ("客户端限流", test_rate_limiter),
+        ("熔断器", test_circuit_breaker),
+        ("回退链", test_fallback_chain),
         ("意图分类", test_intent_classification),
         ("引擎选择", test_engine_selection),
         ("Anspire+缓存", test_anspire_with_cache),
@@ -8,9 +8,52 @@
 """
 
 import os
-from typing import Optional, Dict, Any
+import json
+import asyncio
+import inspect
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Sequence, Tuple, Union
 from enum import Enum
 
+import requests
+
+try:
+    from query_canonical import canonicalize
+except ImportError:
+    canonicalize = None
+
+try:
+    from deadline import Deadline
+except ImportError:
+    Deadline = None
+
+try:
+    from circuit_breaker import CircuitBreaker, CircuitOpenError
+except ImportError:
+    CircuitBreaker = None
+    CircuitOpenError = None
+
+try:
+    from search_intent import SearchIntentClassifier, SearchEngineSelector
+except ImportError:
+    SearchIntentClassifier = None
+    SearchEngineSelector = None
+
+
+# search_many 默认的最大并发请求数
+DEFAULT_MAX_CONCURRENCY = 8
+
+# search 未传截止时间时的总预算（秒，含回退）
+DEFAULT_LATENCY_BUDGET = 30.0
+
+# 每次尝试为之后每个回退引擎预留的预算（秒），最多预留剩余预算的一半
+FALLBACK_RESERVE = 2.0
+
+# 之后还有回退引擎时，一次尝试最多使用（扣除预留后）剩余预算的比例；
+# 单次慢读取因此不会耗尽回退引擎的预算
+ATTEMPT_SHARE = 0.6
+
 
 class SearchEngine(Enum):
     """搜索引擎类型"""
@@ -25,7 +68,16 @@ class UnifiedSearchClient:
         self,
         anspire_api_key: Optional[str] = None,
         brave_api_key: Optional[str] = None,
-        default_engine: SearchEngine = SearchEngine.ANSPIRE
+        default_engine: SearchEngine = SearchEngine.ANSPIRE,
+        stale_seconds: Optional[Dict[str, float]] = None,
+        admission: Optional[Dict[str, str]] = None,
+        retry: Optional[Dict[str, Any]] = None,
+        rate_limit: Optional[Dict[str, Any]] = None,
+        circuit_breaker: Union[bool, Dict[str, Any]] = True,
+        fallback_on_open: bool = True,
+        fallback_on_error: bool = True,
+        fallback_on_empty: bool = True,
+        latency_budget: Optional[float] = DEFAULT_LATENCY_BUDGET
     ):
         """
         初始化客户端
@@ -34,8 +86,36 @@ class UnifiedSearchClient:
             anspire_api_key: Anspire API Key
             brave_api_key: Brave API Key
             default_engine: 默认搜索引擎
+            stale_seconds: 各引擎的 stale-while-revalidate 宽限期（秒），
+                           如 {"anspire": 3600}，未配置的引擎不返回陈旧结果
+            admission: 各引擎写入缓存的准入策略（always / tinylfu），
+                       如 {"anspire": "tinylfu"}，未配置的引擎使用缓存的默认策略
+            retry: 各引擎的重试策略（RetryPolicy，False 表示不重试），
+                   如 {"brave": RetryPolicy(max_attempts=5)}，未配置的引擎使用默认策略
+            rate_limit: 各引擎的客户端限流（get_rate_limiter 的参数或 RateLimiter），
+                        如 {"brave": {"rate": 1, "path": "/var/tmp/ratelimit.db"}}，未配置的引擎不限流
+            circuit_breaker: 各引擎的熔断器，True 为每个引擎使用默认配置，False 关闭；
+                             也可按引擎给出 CircuitBreaker 参数或实例，如
+                             {"anspire": {"error_rate": 0.3}, "brave": False}
+            fallback_on_open: 引擎熔断时按 SearchEngineSelector.get_fallback_chain
+                              改用下一个引擎；False 时直接抛出 CircuitOpenError
+            fallback_on_error: 引擎请求失败（HTTP 错误、连接错误、超时、客户端限流）
+                               时改用下一个引擎；False 时直接抛出
+            fallback_on_empty: 引擎没有返回结果时改用下一个引擎；全部为空时返回
+                               第一个空结果
+            latency_budget: search 未传 deadline 时的总预算（秒，含回退），None 表示不限
         """
         self.default_engine = default_engine
+        self.stale_seconds = stale_seconds or {}
+        self.admission = admission or {}
+        self.retry = retry or {}
+        self.rate_limit = rate_limit or {}
+        self.fallback_on_open = fallback_on_open
+        self.fallback_on_error = fallback_on_error
+        self.fallback_on_empty = fallback_on_empty
+        self.latency_budget = latency_budget
+        self.breakers = _create_breakers(circuit_breaker)
+        self._classifier = None
 
         # Anspire
         self.anspire_api_key = anspire_api_key or os.environ.get("ANSPIRE_API_KEY")
@@ -43,12 +123,7 @@ class UnifiedSearchClient:
 
         if self.anspire_api_key:
             try:
-                from anspire_search import AnspireSearchAgent
-                self.anspire_client = AnspireSearchAgent(
-                    api_key=self.anspire_api_key,
-                    enable_cache=True,
-                    enable_intent=True
-                )
+                self.anspire_client = self._create_anspire_client()
             except ImportError:
                 pass
 
@@ -58,13 +133,39 @@ class UnifiedSearchClient:
 
         if self.brave_api_key:
             try:
-                from brave_search import BraveSearchClient
-                self.brave_client = BraveSearchClient(
-                    api_key=self.brave_api_key
-                )
+                self.brave_client = self._create_brave_client()
             except ImportError:
                 pass
 
+    def _create_anspire_client(self):
+        from anspire_search import AnspireSearchAgent
+        return AnspireSearchAgent(**self._anspire_options())
+
+    def _create_brave_client(self):
+        from brave_search import BraveSearchClient
+        return BraveSearchClient(**self._brave_options())
+
+    def _anspire_options(self) -> Dict[str, Any]:
+        return {
+            "api_key": self.anspire_api_key,
+            "enable_cache": True,
+            "enable_intent": True,
+            "stale_seconds": self.stale_seconds.get(SearchEngine.ANSPIRE.value, 0),
+            "admission": self.admission.get(SearchEngine.ANSPIRE.value),
+            "retry": self.retry.get(SearchEngine.ANSPIRE.value, True),
+            "rate_limit": self.rate_limit.get(SearchEngine.ANSPIRE.value),
+            "circuit_breaker": self.breakers.get(SearchEngine.ANSPIRE.value)
+        }
+
+    def _brave_options(self) -> Dict[str, Any]:
+        return {
+            "api_key": self.brave_api_key,
+            "admission": self.admission.get(SearchEngine.BRAVE.value),
+            "retry": self.retry.get(SearchEngine.BRAVE.value, True),
+            "rate_limit": self.rate_limit.get(SearchEngine.BRAVE.value),
+            "circuit_breaker": self.breakers.get(SearchEngine.BRAVE.value)
+        }
+
     def search(
         self,
         query: str,
@@ -72,34 +173,176 @@ class UnifiedSearchClient:
         count: int = 10,
         from_time: Optional[str] = None,
         to_time: Optional[str] = None,
+        stale_seconds: Optional[float] = None,
+        deadline: Union[None, float, "Deadline"] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
         执行搜索
 
+        指定引擎失败、超时或没有结果时，按回退链依次改用其他引擎，全部尝试共用
+        一个总预算（deadline，未传时为 latency_budget）。
+
         Args:
             query: 搜索查询
             engine: 指定引擎，不指定则使用默认
             count: 返回结果数量
             from_time: 起始时间（Anspire）
             to_time: 结束时间（Anspire）
+            stale_seconds: 本次调用的 stale-while-revalidate 宽限期（秒），
+                           不传则使用引擎配置（Anspire）
+            deadline: 端到端截止时间（秒数或 Deadline），传给引擎拆分为连接 / 读取超时；
+                      超时抛出 DeadlineExceeded，传入 Deadline 时可从其 stages 查看各阶段耗时
             **kwargs: 其他参数
 
         Returns:
-            搜索结果字典
+            搜索结果字典（见 normalize_result）：engine 为实际返回结果的引擎，
+            发生回退时 fallback 按顺序记录之前各引擎的失败原因
+
+        Raises:
+            最后一个引擎的异常：所有引擎都失败，或错误不允许回退
+            （如 fallback_on_open=False 时的 CircuitOpenError）；failures 属性为
+            各引擎的失败记录。没有尝试任何引擎时为 DeadlineExceeded（总预算已用完）
+            或 RuntimeError
+        """
+        kwargs = _with_deadline(kwargs, deadline if deadline is not None else self.latency_budget)
+        failures: List[Dict[str, str]] = []
+        empty = None
+        error = None
+        for engine, client, call_kwargs in self._attempts(
+            query, engine, count, from_time, to_time, stale_seconds, kwargs, failures
+        ):
+            try:
+                result = client.search(**call_kwargs)
+            except Exception as e:
+                error = self._fallback_error(e)
+                failures.append(_failure(engine, error))
+                continue
+            result = _served(engine, result, failures)
+            if result is None or result["items"] or not self.fallback_on_empty:
+                return result
+            failures.append(_failure(engine, result.get("detail") or "empty"))
+            empty = empty or result
+        if empty is not None:
+            # 全部为空：返回第一个空结果，fallback 记录每个引擎
+            empty["fallback"] = failures
+            return empty
+        raise _exhausted(error, failures, kwargs.get("deadline"))
+
+    def _attempts(
+        self,
+        query: str,
+        engine: Optional[SearchEngine],
+        count: int,
+        from_time: Optional[str],
+        to_time: Optional[str],
+        stale_seconds: Optional[float],
+        kwargs: Dict[str, Any],
+        failures: List[Dict[str, str]]
+    ):
+        """
+        依次给出要尝试的 (引擎, 客户端, 调用参数)
+
+        先是指定（或默认）引擎；调用方在其失败或没有结果时继续迭代，得到回退链上的
+        下一个引擎。每次尝试使用总预算的子预算，为之后的引擎各预留 FALLBACK_RESERVE 秒，
+        且最多使用剩余预算的 ATTEMPT_SHARE（最后一个引擎可用完剩余预算）；
+        总预算用完后不再回退。指定引擎未初始化且有其他引擎时跳过（记入 failures）。
+        """
+        engine = engine or self.default_engine
+        fallbacks = self._fallback_count(engine)
+        reserve = fallbacks if self.fallback_on_error or self.fallback_on_empty else 0
+
+        if self._client(engine) is None and fallbacks:
+            failures.append(_failure(engine, f"{engine.value} 客户端未初始化"))
+        else:
+            yield self._route(
+                query, engine, count, from_time, to_time, stale_seconds, _attempt_kwargs(kwargs, reserve)
+            )
+        if not fallbacks:
+            return
+
+        deadline = kwargs.get("deadline")
+        for i, fallback in enumerate(self._engine_chain(query, engine)[1:], 1):
+            if deadline is not None and deadline.expired:
+                return
+            fallback_query, fallback_kwargs = _fallback_request(self._client(fallback), query, kwargs)
+            yield self._route(
+                fallback_query, fallback, count, from_time, to_time, stale_seconds,
+                _attempt_kwargs(fallback_kwargs, max(0, reserve - i))
+            )
+
+    def _fallback_count(self, engine: SearchEngine) -> int:
+        """engine 之后可回退的引擎数（回退全部关闭时为 0）"""
+        if not (self.fallback_on_open or self.fallback_on_error or self.fallback_on_empty):
+            return 0
+        return sum(1 for candidate in SearchEngine if candidate != engine and self._client(candidate) is not None)
+
+    def _fallback_error(self, error: Exception) -> Exception:
+        """
+        引擎调用失败：可以回退时返回该错误以继续尝试下一个引擎，否则原样抛出
+
+        熔断按 fallback_on_open；其他请求错误（HTTP 错误、连接错误、超时、客户端限流）
+        按 fallback_on_error；参数错误等其他异常不回退。
+        """
+        if CircuitOpenError is not None and isinstance(error, CircuitOpenError):
+            fallback = self.fallback_on_open
+        else:
+            fallback = self.fallback_on_error and isinstance(error, (requests.RequestException, TimeoutError))
+        if not fallback:
+            raise error
+        return error
+
+    def _engine_chain(self, query: str, engine: SearchEngine) -> List[SearchEngine]:
+        """
+        回退链：engine 在前，其余已初始化的引擎按 SearchEngineSelector.get_fallback_chain
+        给出的顺序排在后面
         """
+        available = [candidate.value for candidate in SearchEngine if self._client(candidate) is not None]
+        order = available
+        if SearchEngineSelector is not None:
+            if self._classifier is None:
+                self._classifier = SearchIntentClassifier()
+            order = SearchEngineSelector(available).get_fallback_chain(self._classifier.classify(query))
+        return [engine] + [SearchEngine(name) for name in order if name in available and name != engine.value]
+
+    def _client(self, engine: SearchEngine):
+        """引擎对应的客户端（未初始化为 None）"""
+        if engine == SearchEngine.ANSPIRE:
+            return self.anspire_client
+        if engine == SearchEngine.BRAVE:
+            return self.brave_client
+        return None
+
+    def _route(
+        self,
+        query: str,
+        engine: Optional[SearchEngine],
+        count: int,
+        from_time: Optional[str],
+        to_time: Optional[str],
+        stale_seconds: Optional[float],
+        kwargs: Dict[str, Any]
+    ):
+        """选择引擎客户端并转换参数；返回 (引擎, 客户端, 调用参数)"""
         engine = engine or self.default_engine
 
+        # 查询规范化：Anspire 客户端自行规范化（site: 语法提取为 insite），原始查询
+        # 直接交给它，缓存才能统计规范化带来的命中；Brave 客户端不做规范化，
+        # 这里只做文本归一并保留查询中的 site: 语法
+        if canonicalize is not None and engine == SearchEngine.BRAVE:
+            query = canonicalize(query, lift_sites=False).query
+
         # Anspire
         if engine == SearchEngine.ANSPIRE:
             if not self.anspire_client:
                 raise RuntimeError("Anspire 客户端未初始化")
 
-            return self.anspire_client.search(
+            return engine, self.anspire_client, dict(
                 query=query,
                 top_k=count,
                 from_time=from_time,
                 to_time=to_time,
+                stale_seconds=stale_seconds,
                 **kwargs
             )
 
@@ -121,7 +364,7 @@ class UnifiedSearchClient:
                 elif "py" in from_time or "年" in from_time:
                     freshness = "py"
 
-            return self.brave_client.search(
+            return engine, self.brave_client, dict(
                 query=query,
                 count=count,
                 freshness=freshness,
@@ -137,6 +380,7 @@ class UnifiedSearchClient:
         engine: Optional[SearchEngine] = None,
         count: int = 10,
         freshness: Optional[str] = None,
+        deadline: Union[None, float, "Deadline"] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -147,31 +391,147 @@ class UnifiedSearchClient:
             engine: 指定引擎，不指定则使用默认
             count: 返回结果数量
             freshness: 时间新鲜度
+            deadline: 端到端截止时间（秒数或 Deadline）
 
         Returns:
-            搜索结果字典
+            搜索结果字典；Brave 新闻失败或没有结果时按回退链改用下一个引擎的 search，
+            回退规则与 fallback 记录同 search
         """
+        engine = self._news_engine(engine)
+        failures: List[Dict[str, str]] = []
+        empty = None
+        if engine == SearchEngine.BRAVE and self.brave_client:
+            # Brave 失败时改用回退链上的下一个引擎，共用同一个截止时间
+            deadline = _with_deadline({}, deadline if deadline is not None else self.latency_budget).get("deadline")
+            fallbacks = self._fallback_count(engine)
+            try:
+                result = self.brave_client.search_news(
+                    query=query,
+                    count=count,
+                    freshness=freshness or "pw",
+                    **_attempt_kwargs({"deadline": deadline}, fallbacks)
+                )
+            except Exception as e:
+                failures.append(_failure(engine, self._fallback_error(e)))
+                if not fallbacks:
+                    raise
+            else:
+                result = _served(engine, result, failures)
+                if result is None or result["items"] or not self.fallback_on_empty or not fallbacks:
+                    return result
+                failures.append(_failure(engine, result.get("detail") or "empty"))
+                empty = result
+            engine = self._engine_chain(query, engine)[1]
+
+        try:
+            result = self.search(
+                query=query,
+                engine=engine,
+                count=count,
+                deadline=deadline,
+                **kwargs
+            )
+        except Exception as e:
+            return _news_fallback(empty, failures, error=e)
+        return _news_fallback(empty, failures, result)
+
+    def _news_engine(self, engine: Optional[SearchEngine]) -> SearchEngine:
+        """新闻搜索使用的引擎：未指定时用默认引擎，Brave 不可用时回退 Anspire"""
         # 优先使用 Anspire
         if engine is None:
             engine = self.default_engine
 
         # Brave 新闻搜索已修复（使用普通搜索的 news 字段）
-        if engine == SearchEngine.BRAVE:
-            if self.brave_client:
-                return self.brave_client.search_news(
-                    query=query,
-                    count=count,
-                    freshness=freshness or "pw"
-                )
-            elif self.anspire_client:
-                engine = SearchEngine.ANSPIRE
+        if engine == SearchEngine.BRAVE and not self.brave_client and self.anspire_client:
+            engine = SearchEngine.ANSPIRE
+        return engine
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        engine: Optional[SearchEngine] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_query_kwargs: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        批量搜索
+
+        规范化后相同的查询（且参数相同）只搜索一次；先在调用线程中读缓存，
+        命中的直接返回，其余在线程池中最多 max_concurrency 个并发搜索。
+        每个查询都经过 search（回退链、熔断与结果统一格式）。
 
-        return self.search(
-            query=query,
-            engine=engine,
-            count=count,
-            **kwargs
-        )
+        Args:
+            queries: 查询列表
+            engine: 指定引擎，不指定则使用默认
+            max_concurrency: 最大并发请求数
+            per_query_kwargs: 与 queries 等长的参数列表，覆盖公共参数（可含 engine、
+                              count、from_time 等 search 的全部参数），None 表示不覆盖
+            **kwargs: 各查询共用的 search 参数；deadline 为整批共用的截止时间
+
+        Returns:
+            与 queries 顺序一致的结果列表，格式同 search；所有引擎都失败的查询为
+            {"error": 错误信息}，不抛出异常。重复的查询共享同一个结果对象
+        """
+        slots, unique = self._plan_batch(queries, engine, max_concurrency, per_query_kwargs, kwargs)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for key, search_kwargs in unique.items():
+            try:
+                cached = self.search(cache_only=True, **search_kwargs)
+            except Exception as e:
+                results[key] = _error_result(e)
+                continue
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending.append(key)
+
+        def run(key: str) -> Dict[str, Any]:
+            try:
+                return self.search(**unique[key])
+            except Exception as e:
+                return _error_result(e)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending))) as pool:
+                results.update(zip(pending, pool.map(run, pending)))
+
+        return [results[key] for key in slots]
+
+    def _plan_batch(
+        self,
+        queries: Sequence[str],
+        engine: Optional[SearchEngine],
+        max_concurrency: int,
+        per_query_kwargs: Optional[Sequence[Optional[Dict[str, Any]]]],
+        kwargs: Dict[str, Any]
+    ) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """
+        批量搜索去重
+
+        Returns:
+            (slots, unique)：slots 与 queries 一一对应，为去重键；
+            unique 为去重键 → search 的参数
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency 必须大于 0")
+        if per_query_kwargs is not None and len(per_query_kwargs) != len(queries):
+            raise ValueError("per_query_kwargs 长度必须与 queries 一致")
+
+        # 整批共用一个截止时间
+        kwargs = _with_deadline(kwargs, kwargs.pop("deadline", None))
+
+        slots: List[str] = []
+        unique: Dict[str, Dict[str, Any]] = {}
+        for i, query in enumerate(queries):
+            options = dict(kwargs, **((per_query_kwargs[i] or {}) if per_query_kwargs else {}))
+            options["engine"] = options.get("engine", engine) or self.default_engine
+            key = _batch_key(query, options)
+            unique.setdefault(key, dict(options, query=query))
+            slots.append(key)
+        return slots, unique
 
     def analyze_intent(self, query: str):
         """分析搜索意图"""
@@ -180,10 +540,390 @@ class UnifiedSearchClient:
         return None
 
     def get_cache_stats(self) -> Optional[Dict[str, Any]]:
-        """获取缓存统计"""
-        if self.anspire_client:
-            return self.anspire_client.get_cache_stats()
+        """
+        获取缓存统计
+
+        两个引擎默认共享同一个缓存，总体统计只计算一次；"engines" 给出
+        各引擎自己的命中统计（未启用缓存的引擎不出现）。
+        """
+        caches = {}
+        for engine, client in (
+            (SearchEngine.ANSPIRE.value, self.anspire_client),
+            (SearchEngine.BRAVE.value, self.brave_client)
+        ):
+            if client is not None and client.cache is not None:
+                caches[engine] = client.cache
+
+        if not caches:
+            return None
+
+        stats = next(iter(caches.values())).stats()
+        empty = {"hits": 0, "misses": 0, "hit_rate": 0.0}
+        stats["engines"] = {
+            engine: cache.engine_stats().get(engine, empty)
+            for engine, cache in caches.items()
+        }
+        return stats
+
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """各引擎的重试统计（调用数、重试数、重试后成功 / 失败数、按原因的重试次数）"""
+        stats = {}
+        for engine, client in (
+            (SearchEngine.ANSPIRE.value, self.anspire_client),
+            (SearchEngine.BRAVE.value, self.brave_client)
+        ):
+            if client is not None and client.get_retry_stats() is not None:
+                stats[engine] = client.get_retry_stats()
+        return stats
+
+    def get_breaker_stats(self) -> Dict[str, Any]:
+        """各引擎熔断器的状态、窗口统计与最近的状态转换（未启用熔断的引擎不出现）"""
+        return {engine: breaker.stats() for engine, breaker in self.breakers.items()}
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """各引擎的限流统计与令牌桶状态（未启用限流的引擎不出现）"""
+        stats = {}
+        for engine, client in (
+            (SearchEngine.ANSPIRE.value, self.anspire_client),
+            (SearchEngine.BRAVE.value, self.brave_client)
+        ):
+            if client is not None and client.get_rate_limit_stats() is not None:
+                stats[engine] = client.get_rate_limit_stats()
+        return stats
+
+
+class AsyncUnifiedSearchClient(UnifiedSearchClient):
+    """
+    统一搜索异步客户端
+
+    参数与返回值与 UnifiedSearchClient 相同，底层使用 AsyncAnspireSearchAgent /
+    AsyncBraveSearchClient；search、search_news、get_cache_stats 为协程。
+
+        async with AsyncUnifiedSearchClient() as client:
+            result = await client.search("AI")
+    """
+
+    def _create_anspire_client(self):
+        from anspire_search import AsyncAnspireSearchAgent
+        return AsyncAnspireSearchAgent(**self._anspire_options())
+
+    def _create_brave_client(self):
+        from brave_search import AsyncBraveSearchClient
+        return AsyncBraveSearchClient(**self._brave_options())
+
+    async def search(
+        self,
+        query: str,
+        engine: Optional[SearchEngine] = None,
+        count: int = 10,
+        from_time: Optional[str] = None,
+        to_time: Optional[str] = None,
+        stale_seconds: Optional[float] = None,
+        deadline: Union[None, float, "Deadline"] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """执行搜索（参数与返回值同 UnifiedSearchClient.search）"""
+        kwargs = _with_deadline(kwargs, deadline if deadline is not None else self.latency_budget)
+        failures: List[Dict[str, str]] = []
+        empty = None
+        error = None
+        for engine, client, call_kwargs in self._attempts(
+            query, engine, count, from_time, to_time, stale_seconds, kwargs, failures
+        ):
+            try:
+                result = await client.search(**call_kwargs)
+            except Exception as e:
+                error = self._fallback_error(e)
+                failures.append(_failure(engine, error))
+                continue
+            result = _served(engine, result, failures)
+            if result is None or result["items"] or not self.fallback_on_empty:
+                return result
+            failures.append(_failure(engine, result.get("detail") or "empty"))
+            empty = empty or result
+        if empty is not None:
+            # 全部为空：返回第一个空结果，fallback 记录每个引擎
+            empty["fallback"] = failures
+            return empty
+        raise _exhausted(error, failures, kwargs.get("deadline"))
+
+    async def search_news(
+        self,
+        query: str,
+        engine: Optional[SearchEngine] = None,
+        count: int = 10,
+        freshness: Optional[str] = None,
+        deadline: Union[None, float, "Deadline"] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """新闻搜索（参数与返回值同 UnifiedSearchClient.search_news）"""
+        engine = self._news_engine(engine)
+        failures: List[Dict[str, str]] = []
+        empty = None
+        if engine == SearchEngine.BRAVE and self.brave_client:
+            # Brave 失败时改用回退链上的下一个引擎，共用同一个截止时间
+            deadline = _with_deadline({}, deadline if deadline is not None else self.latency_budget).get("deadline")
+            fallbacks = self._fallback_count(engine)
+            try:
+                result = await self.brave_client.search_news(
+                    query=query,
+                    count=count,
+                    freshness=freshness or "pw",
+                    **_attempt_kwargs({"deadline": deadline}, fallbacks)
+                )
+            except Exception as e:
+                failures.append(_failure(engine, self._fallback_error(e)))
+                if not fallbacks:
+                    raise
+            else:
+                result = _served(engine, result, failures)
+                if result is None or result["items"] or not self.fallback_on_empty or not fallbacks:
+                    return result
+                failures.append(_failure(engine, result.get("detail") or "empty"))
+                empty = result
+            engine = self._engine_chain(query, engine)[1]
+
+        try:
+            result = await self.search(
+                query=query,
+                engine=engine,
+                count=count,
+                deadline=deadline,
+                **kwargs
+            )
+        except Exception as e:
+            return _news_fallback(empty, failures, error=e)
+        return _news_fallback(empty, failures, result)
+
+    async def search_many(
+        self,
+        queries: Sequence[str],
+        engine: Optional[SearchEngine] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_query_kwargs: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """批量搜索（参数与返回值同 UnifiedSearchClient.search_many）"""
+        slots, unique = self._plan_batch(queries, engine, max_concurrency, per_query_kwargs, kwargs)
+        limit = asyncio.Semaphore(max_concurrency)
+
+        async def run(search_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                cached = await self.search(cache_only=True, **search_kwargs)
+                if cached is not None:
+                    return cached
+                async with limit:
+                    return await self.search(**search_kwargs)
+            except Exception as e:
+                return _error_result(e)
+
+        keys = list(unique)
+        values = await asyncio.gather(*(run(unique[key]) for key in keys))
+        results = dict(zip(keys, values))
+        return [results[key] for key in slots]
+
+    async def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """获取缓存统计（在线程池中读取）"""
+        return await asyncio.to_thread(super().get_cache_stats)
+
+    async def close(self) -> None:
+        """关闭各引擎客户端的 HTTP 会话"""
+        for client in (self.anspire_client, self.brave_client):
+            if client is not None:
+                await client.close()
+
+    async def __aenter__(self) -> "AsyncUnifiedSearchClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _create_breakers(circuit_breaker: Union[bool, Dict[str, Any]]) -> Dict[str, "CircuitBreaker"]:
+    """circuit_breaker 参数 → 引擎名 → CircuitBreaker（未启用的引擎不出现）"""
+    if CircuitBreaker is None or circuit_breaker is False:
+        return {}
+    options = {} if circuit_breaker is True else circuit_breaker
+
+    breakers = {}
+    for engine in SearchEngine:
+        option = options.get(engine.value, True)
+        if option is False or option is None:
+            continue
+        if isinstance(option, CircuitBreaker):
+            breakers[engine.value] = option
+        else:
+            breakers[engine.value] = CircuitBreaker(engine.value, **({} if option is True else option))
+    return breakers
+
+
+def normalize_result(engine: SearchEngine, result: Mapping) -> Dict[str, Any]:
+    """
+    统一各引擎的响应格式
+
+    返回新字典（缓存命中的结果可能是只读的 RawResult 或与其他调用方共享，不原地修改），
+    保留原始响应的全部字段，另加：
+    - engine: 返回该结果的引擎名
+    - items: 结果列表，每项为 {"title", "url", "snippet", "date"}；Anspire 取自 results，
+      Brave 取自 web.results（没有时取 news.results）
+    """
+    normalized = dict(result)
+    if engine == SearchEngine.BRAVE:
+        section = normalized.get("web") or normalized.get("news") or {}
+        items = [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "snippet": item.get("description", item.get("snippet", "")),
+                "date": item.get("page_age", item.get("age", ""))
+            }
+            for item in section.get("results") or []
+        ]
+    else:
+        items = [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "snippet": item.get("content", ""),
+                "date": item.get("date", "")
+            }
+            for item in normalized.get("results") or []
+        ]
+    normalized["engine"] = engine.value
+    normalized["items"] = items
+    return normalized
+
+
+def _served(
+    engine: SearchEngine,
+    result: Optional[Mapping],
+    failures: List[Dict[str, str]]
+) -> Optional[Dict[str, Any]]:
+    """引擎返回的结果 → 统一格式并附上之前的失败记录（cache_only 未命中的 None 原样返回）"""
+    if result is None:
         return None
+    return _with_failures(normalize_result(engine, result), failures)
+
+
+def _with_failures(result: Optional[Dict[str, Any]], failures: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+    """把之前各引擎的失败记录加到 fallback 字段（result 为 normalize_result 返回的新字典）"""
+    if result is None or not failures:
+        return result
+    result["fallback"] = failures + result.get("fallback", [])
+    return result
+
+
+def _news_fallback(
+    empty: Optional[Dict[str, Any]],
+    failures: List[Dict[str, str]],
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[Exception] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Brave 新闻回退到下一个引擎后的返回值（error 为回退引擎抛出的异常）
+
+    回退引擎有结果时返回它并附上 Brave 的失败记录。Brave 新闻没有结果（empty）而回退
+    引擎也没有结果或全部失败（异常带 failures）时，与 search 一样返回第一个空结果，
+    fallback 记录每个引擎；其他情况原样抛出异常。
+    """
+    if error is not None:
+        if empty is None or not hasattr(error, "failures"):
+            raise error
+        empty["fallback"] = failures + error.failures
+        return empty
+    if empty is None or result is None or result["items"]:
+        return _with_failures(result, failures)
+    empty["fallback"] = failures + result.get("fallback", [])
+    return empty
+
+
+def _exhausted(
+    error: Optional[Exception],
+    failures: List[Dict[str, str]],
+    deadline: Optional["Deadline"]
+) -> Exception:
+    """
+    没有引擎返回结果时抛出的异常，failures 属性为各引擎的失败记录
+
+    没有尝试任何引擎（指定引擎未初始化、回退前总预算已用完）时 error 为 None：
+    预算用完抛出 DeadlineExceeded，否则抛出 RuntimeError。
+    """
+    if error is None:
+        if deadline is not None and deadline.expired:
+            error = deadline.exceeded("fallback")
+        else:
+            error = RuntimeError("没有可用的搜索引擎")
+    error.failures = failures
+    return error
+
+
+def _failure(engine: SearchEngine, error: Union[Exception, str]) -> Dict[str, str]:
+    """回退记录中的一项"""
+    if isinstance(error, Exception):
+        error = str(error) or type(error).__name__
+    return {"engine": engine.value, "error": error}
+
+
+def _attempt_kwargs(kwargs: Dict[str, Any], fallbacks: int) -> Dict[str, Any]:
+    """
+    一次尝试的调用参数：截止时间换为子预算
+
+    为之后 fallbacks 个引擎各预留 FALLBACK_RESERVE 秒，并只取其余预算的 ATTEMPT_SHARE，
+    使该次请求的读取超时（取自子预算）不会占满回退引擎的时间。
+    """
+    deadline = kwargs.get("deadline")
+    if deadline is None or not fallbacks:
+        return kwargs
+    reserve = min(FALLBACK_RESERVE * fallbacks, deadline.remaining() / 2)
+    return dict(kwargs, deadline=deadline.child(share=ATTEMPT_SHARE, reserve=reserve))
+
+
+def _fallback_request(client, query: str, kwargs: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    回退到另一个引擎时的 (查询, 参数)
+
+    去掉该引擎 search 不支持的参数；不支持 insite 时改为在查询中加 site: 语法。
+    """
+    accepted = inspect.signature(client.search).parameters
+    supported = {name: value for name, value in kwargs.items() if name in accepted}
+    insite = kwargs.get("insite")
+    if insite and "insite" not in accepted:
+        query = f"{_site_operator(insite)} {query}"
+    return query, supported
+
+
+def _site_operator(insite: str) -> str:
+    """insite（逗号分隔）转为查询中的 site: 语法，多个站点用 OR 连接"""
+    sites = [site.strip() for site in insite.split(",") if site.strip()]
+    if len(sites) == 1:
+        return f"site:{sites[0]}"
+    return "(" + " OR ".join(f"site:{site}" for site in sites) + ")"
+
+
+def _batch_key(query: str, options: Dict[str, Any]) -> str:
+    """批量搜索的去重键：规范化后的查询与站点，加上除截止时间外的 search 参数"""
+    params = {name: value for name, value in options.items() if name != "deadline"}
+    params["engine"] = params["engine"].value
+    params.setdefault("count", 10)
+    insite = params.pop("insite", None)
+    if canonicalize is not None:
+        canonical = canonicalize(query, insite)
+        query, insite = canonical.query, canonical.insite
+    return json.dumps([query, insite, params], sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _with_deadline(kwargs: Dict[str, Any], deadline: Union[None, float, "Deadline"]) -> Dict[str, Any]:
+    """把截止时间（统一转为 Deadline，便于多次调用共享预算）加入引擎调用参数"""
+    if deadline is None:
+        return kwargs
+    if Deadline is not None:
+        deadline = Deadline.coerce(deadline)
+    return dict(kwargs, deadline=deadline)
+
+
+def _error_result(error: Exception) -> Dict[str, Any]:
+    """批量搜索中单个查询的失败结果"""
+    return {"error": str(error) or type(error).__name__}
 
 
 def main():
@@ -226,6 +966,8 @@ def main():
     stats = client.get_cache_stats()
     if stats:
         print(f"缓存: {stats['total']} 个, {stats['size_mb']} MB")
+        for engine, engine_stats in stats["engines"].items():
+            print(f"  {engine}: 命中 {engine_stats['hits']} / 未命中 {engine_stats['misses']}")
     else:
         print("缓存未启用")
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+缓存准入策略
+
+有容量上限的持久层写满后，每写入一个新条目就要淘汰一个旧条目。
+大量只查询一次的长尾查询会把少数热门查询挤出缓存。TinyLFU 用
+count-min sketch 近似记录最近一段时间内每个键的访问频率（每记录
+sample_size 次访问计数减半），只有新条目的频率高于将被淘汰的条目时才允许写入。
+
+这里只有频率过滤器，没有 W-TinyLFU 的准入窗口（过滤器前的小 LRU 段）：
+新条目总会先进入内存层，持久层写满后才按频率比较。
+
+- always: 总是写入（原有行为）
+- tinylfu: 持久层已满时按频率比较决定是否写入
+"""
+
+import hashlib
+import threading
+from typing import Dict
+
+
+ADMISSION_POLICIES = ("always", "tinylfu")
+
+
+class CountMinSketch:
+    """
+    Count-min sketch 频率估计
+
+    depth 行计数器，每行用不同的哈希定位；估计值取各行最小值，
+    只会高估不会低估。计数器为 4 位（上限 15），足以区分冷热。
+    """
+
+    MAX_COUNT = 15
+
+    def __init__(self, width: int, depth: int = 4):
+        self.width = max(int(width), 16)
+        self.depth = depth
+        self._rows = [bytearray(self.width) for _ in range(depth)]
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[i * 4:(i + 1) * 4], "little") % self.width for i in range(self.depth)]
+
+    def increment(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def halve(self) -> None:
+        """所有计数减半（老化）"""
+        self._rows = [bytearray(count >> 1 for count in row) for row in self._rows]
+
+
+class TinyLFU:
+    """TinyLFU 准入过滤器"""
+
+    def __init__(self, sample_size: int = 10_000, depth: int = 4):
+        """
+        初始化
+
+        Args:
+            sample_size: 老化周期（访问次数），每记录这么多次访问所有计数减半，
+                         使频率反映近期热度而不是历史累计
+            depth: sketch 行数
+        """
+        self.sample_size = sample_size
+        self.sketch = CountMinSketch(sample_size, depth)
+        self._samples = 0
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.resets = 0
+
+    def record(self, key: str) -> None:
+        """记录一次访问"""
+        with self._lock:
+            self.sketch.increment(key)
+            self._samples += 1
+            if self._samples >= self.sample_size:
+                self.sketch.halve()
+                self._samples //= 2
+                self.resets += 1
+
+    def frequency(self, key: str) -> int:
+        with self._lock:
+            return self.sketch.estimate(key)
+
+    def admit(self, candidate: str, victim: str) -> bool:
+        """
+        新条目 candidate 能否替换将被淘汰的 victim
+
+        频率相同时拒绝：保留已在缓存中的条目。
+        """
+        with self._lock:
+            admitted = self.sketch.estimate(candidate) > self.sketch.estimate(victim)
+            if admitted:
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return admitted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sample_size": self.sample_size,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "resets": self.resets
+            }
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+asyncio HTTP 客户端
+
+异步搜索客户端使用的最小 HTTP/1.1 实现，只依赖标准库：
+- 按 (scheme, host, port) 保留空闲连接，keep-alive 复用，默认接受 gzip
+- 支持 Content-Length、chunked 与读到连接关闭三种响应体，跳过 1xx 中间响应，
+  重复的响应头以逗号合并
+- 请求被取消或出错时关闭所用连接，不会把读了一半的连接放回连接池
+- 错误类型与同步客户端一致：HTTP 4xx/5xx 抛出 requests.HTTPError，网络错误与
+  无效的状态行 / 响应头抛出 requests.ConnectionError，chunk 与解压错误分别抛出
+  ChunkedEncodingError / ContentDecodingError，json() 失败抛出 requests.JSONDecodeError
+- 与 requests 一样读取 HTTP(S)_PROXY / NO_PROXY 环境变量（trust_env=False 时忽略）；
+  只支持 http:// 代理（https 目标经 CONNECT 隧道），其他代理抛出 requests.exceptions.InvalidProxyURL
+- 跟随重定向（最多 MAX_REDIRECTS 次），跨主机时去掉 Authorization 请求头
+
+连接绑定在创建它的事件循环上，会话应在同一个事件循环内使用，
+用完调用 close()（或 async with）。
+"""
+
+import asyncio
+import gzip
+import json
+import ssl
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import requests
+from requests.auth import _basic_auth_str
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_auth_from_url, get_environ_proxies, select_proxy
+
+from http_session import DEFAULT_POOL_MAXSIZE
+
+
+# (scheme, host, port, 代理地址)，不经代理时代理地址为空串
+Origin = Tuple[str, str, int, str]
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+# 与 requests 一致的重定向上限与状态码
+MAX_REDIRECTS = requests.models.DEFAULT_REDIRECT_LIMIT
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class AsyncResponse:
+    """HTTP 响应（响应体已完整读取并解压）"""
+
+    def __init__(self, url: str, status_code: int, reason: str, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """解析 JSON 响应体，失败时抛出 requests.exceptions.JSONDecodeError（同 requests）"""
+        try:
+            return json.loads(self.content)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+        except UnicodeDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(f"响应体不是有效的 UTF-8: {e.reason}", "", e.start) from e
+
+    def raise_for_status(self) -> None:
+        """4xx/5xx 时抛出 requests.HTTPError（e.response 为等价的 requests.Response）"""
+        if self.status_code < 400:
+            return
+
+        kind = "Client" if self.status_code < 500 else "Server"
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.reason = self.reason
+        response.url = self.url
+        response.headers = self.headers
+        response._content = self.content
+        raise requests.HTTPError(
+            f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}",
+            response=response
+        )
+
+
+class AsyncHTTPSession:
+    """带连接池的 asyncio HTTP 会话"""
+
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        headers: Optional[Dict[str, str]] = None,
+        trust_env: bool = True
+    ):
+        """
+        Args:
+            pool_maxsize: 每个主机保留的最大空闲连接数（并发请求数不受限，多出的连接用完即关）
+            headers: 每个请求都带上的请求头
+            trust_env: 是否读取 HTTP(S)_PROXY / NO_PROXY 环境变量（同 requests.Session.trust_env）
+        """
+        self.pool_maxsize = pool_maxsize
+        self.trust_env = trust_env
+        self.headers = {
+            "User-Agent": f"python-requests/{requests.__version__}",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive"
+        }
+        self.headers.update(headers or {})
+        self.connections_opened = 0
+        self._idle: Dict[Origin, List[Connection]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[Tuple[float, float]] = None
+    ) -> AsyncResponse:
+        """
+        发送 GET 请求（跟随重定向）
+
+        Args:
+            url: 请求地址
+            params: 查询参数
+            headers: 本次请求附加的请求头
+            timeout: (连接超时, 读取超时)，读取超时为发出请求到读完最终响应的总时间
+                     （含重定向）；None 表示不限
+
+        Returns:
+            AsyncResponse
+
+        Raises:
+            requests.ConnectionError: 连接失败或连接被意外关闭
+            requests.ConnectTimeout / requests.ReadTimeout: 连接 / 读取超时
+            requests.TooManyRedirects: 重定向超过 MAX_REDIRECTS 次
+            requests.exceptions.ProxyError / InvalidProxyURL: 代理拒绝隧道 / 不支持的代理
+        """
+        connect_timeout, read_timeout = timeout or (None, None)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        headers = dict(headers or {})
+
+        for _ in range(MAX_REDIRECTS + 1):
+            if read_timeout is not None:
+                remaining = read_timeout - (loop.time() - started)
+                if remaining <= 0:
+                    raise requests.ReadTimeout(f"读取 {url} 超时（{read_timeout:.2f}s）")
+            else:
+                remaining = None
+            response = await self._get(url, params, headers, (connect_timeout, remaining))
+
+            location = response.headers.get("location")
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                return response
+            next_url = urljoin(response.url, location)
+            if urlsplit(next_url).hostname != urlsplit(response.url).hostname:
+                # 与 requests 相同：凭据不带到其他主机
+                headers = {name: value for name, value in headers.items() if name.lower() != "authorization"}
+            url, params = next_url, None
+
+        raise requests.TooManyRedirects(f"重定向超过 {MAX_REDIRECTS} 次: {url}")
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        headers: Dict[str, str],
+        timeout: Tuple[Optional[float], Optional[float]]
+    ) -> AsyncResponse:
+        """发送一次 GET 请求（不跟随重定向）"""
+        connect_timeout, read_timeout = timeout
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+
+        target = parts.path or "/"
+        query = parts.query
+        if params:
+            query = f"{query}&{urlencode(params)}" if query else urlencode(params)
+        if query:
+            target = f"{target}?{query}"
+        full_url = f"{scheme}://{parts.netloc}{target}"
+
+        proxy = self._proxy_for(full_url)
+        origin = (scheme, parts.hostname, port, proxy or "")
+
+        request_headers = {"Host": parts.netloc}
+        request_headers.update(self.headers)
+        request_headers.update(headers)
+        if proxy and scheme == "http":
+            # 经 HTTP 代理转发：请求行使用完整 URL，代理凭据放在 Proxy-Authorization
+            target = full_url
+            request_headers.update(_proxy_headers(proxy))
+        request = f"GET {target} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        ) + "\r\n"
+
+        for attempt in range(2):
+            try:
+                connection, reused = await asyncio.wait_for(self._acquire(origin), connect_timeout)
+            except asyncio.TimeoutError as e:
+                raise requests.ConnectTimeout(f"连接 {origin[1]}:{origin[2]} 超时（{connect_timeout:.2f}s）") from e
+
+            try:
+                response, reusable = await asyncio.wait_for(
+                    self._send(connection, request.encode("latin-1"), full_url), read_timeout
+                )
+            except asyncio.TimeoutError as e:
+                self._discard(connection)
+                raise requests.ReadTimeout(f"读取 {full_url} 超时（{read_timeout:.2f}s）") from e
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                self._discard(connection)
+                # 复用的空闲连接可能已被服务端关闭，换一条新连接重试一次（GET 幂等）
+                if reused and attempt == 0:
+                    continue
+                raise requests.ConnectionError(f"连接 {full_url} 中断: {e!r}") from e
+            except requests.RequestException:
+                # 无效的状态行 / 响应头 / chunk / 压缩数据，连接状态未知
+                self._discard(connection)
+                raise
+            except (OSError, ValueError) as e:
+                # TLS 错误、超长的响应行等
+                self._discard(connection)
+                raise requests.ConnectionError(f"读取 {full_url} 失败: {e!r}") from e
+            except BaseException:
+                # 包括取消：连接上可能残留未读完的响应，不能放回连接池
+                self._discard(connection)
+                raise
+
+            if reusable:
+                self._release(origin, connection)
+            else:
+                self._discard(connection)
+            return response
+
+    def _proxy_for(self, url: str) -> Optional[str]:
+        """该地址应使用的代理（按 HTTP(S)_PROXY / NO_PROXY 环境变量，与 requests 相同）"""
+        if not self.trust_env:
+            return None
+        proxy = select_proxy(url, get_environ_proxies(url))
+        if not proxy:
+            return None
+        if "://" not in proxy:
+            proxy = f"http://{proxy}"
+        if urlsplit(proxy).scheme.lower() != "http" or not urlsplit(proxy).hostname:
+            raise requests.exceptions.InvalidProxyURL(f"异步客户端只支持 http:// 代理: {proxy}")
+        return proxy
+
+    async def _acquire(self, origin: Origin) -> Tuple[Connection, bool]:
+        """取一条空闲连接，没有则新建；返回 (连接, 是否复用)"""
+        idle = self._idle.get(origin)
+        while idle:
+            reader, writer = idle.pop()
+            if writer.is_closing() or reader.at_eof():
+                writer.close()
+                continue
+            return (reader, writer), True
+
+        scheme, host, port, proxy = origin
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+
+        if proxy:
+            return await self._open_via_proxy(host, port, proxy, ssl_context), False
+
+        try:
+            reader, writer = await asyncio.open_connection(
+                host, port, ssl=ssl_context, server_hostname=host if ssl_context else None
+            )
+        except OSError as e:
+            raise requests.ConnectionError(f"无法连接 {host}:{port}: {e}") from e
+        self.connections_opened += 1
+        return (reader, writer), False
+
+    async def _open_via_proxy(
+        self,
+        host: str,
+        port: int,
+        proxy: str,
+        ssl_context: Optional[ssl.SSLContext]
+    ) -> Connection:
+        """连接 HTTP 代理；https 目标先用 CONNECT 建立隧道再做 TLS 握手"""
+        proxy_parts = urlsplit(proxy)
+        proxy_host, proxy_port = proxy_parts.hostname, proxy_parts.port or 80
+        try:
+            reader, writer = await asyncio.open_connection(proxy_host, proxy_port)
+        except OSError as e:
+            raise requests.exceptions.ProxyError(f"无法连接代理 {proxy_host}:{proxy_port}: {e}") from e
+        self.connections_opened += 1
+        if ssl_context is None:
+            return reader, writer
+        if not hasattr(writer, "start_tls"):
+            writer.close()
+            raise requests.exceptions.ProxyError("经 HTTP 代理访问 https 需要 Python 3.11+（StreamWriter.start_tls）")
+
+        try:
+            request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n" + "".join(
+                f"{name}: {value}\r\n" for name, value in _proxy_headers(proxy).items()
+            ) + "\r\n"
+            writer.write(request.encode("latin-1"))
+            await writer.drain()
+            status_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            status = (status_line.decode("latin-1").split(" ", 2) + ["", ""])[1]
+            if status != "200":
+                raise requests.exceptions.ProxyError(
+                    f"代理 {proxy_host}:{proxy_port} 拒绝建立到 {host}:{port} 的隧道: {status_line.decode('latin-1').strip()}"
+                )
+            await writer.start_tls(ssl_context, server_hostname=host)
+        except requests.exceptions.ProxyError:
+            writer.close()
+            raise
+        except (OSError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            raise requests.exceptions.ProxyError(f"经代理 {proxy_host}:{proxy_port} 连接 {host}:{port} 失败: {e!r}") from e
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    def _release(self, origin: Origin, connection: Connection) -> None:
+        idle = self._idle.setdefault(origin, [])
+        if len(idle) >= self.pool_maxsize:
+            self._discard(connection)
+        else:
+            idle.append(connection)
+
+    @staticmethod
+    def _discard(connection: Connection) -> None:
+        connection[1].close()
+
+    async def _send(self, connection: Connection, request: bytes, url: str) -> Tuple[AsyncResponse, bool]:
+        """发送请求并读取完整响应；返回 (响应, 连接能否复用)"""
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+
+        # 跳过 1xx 中间响应（100 Continue、103 Early Hints 等），直到最终响应
+        while True:
+            version, status, reason = await _read_status_line(reader)
+            headers = await _read_headers(reader)
+            if status == 101:
+                raise requests.ConnectionError("服务端意外切换了协议（101）")
+            if not 100 <= status < 200:
+                break
+
+        reusable = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if status in (204, 304):
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await _read_chunked(reader)
+        elif "content-length" in headers:
+            length = headers["content-length"].split(",")[0].strip()
+            if not length.isdigit():
+                raise requests.ConnectionError(f"无效的 Content-Length: {headers['content-length']!r}")
+            body = await reader.readexactly(int(length))
+        else:
+            body = await reader.read()
+            reusable = False
+
+        body = _decode_body(body, headers.get("content-encoding", "").lower())
+        return AsyncResponse(url, status, reason, headers, body), reusable
+
+    async def close(self) -> None:
+        """关闭全部空闲连接"""
+        idle, self._idle = self._idle, {}
+        writers = [writer for connections in idle.values() for _, writer in connections]
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    async def __aenter__(self) -> "AsyncHTTPSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _proxy_headers(proxy: str) -> Dict[str, str]:
+    """代理地址中带有用户名密码时的 Proxy-Authorization 请求头"""
+    username, password = get_auth_from_url(proxy)
+    if not username:
+        return {}
+    return {"Proxy-Authorization": _basic_auth_str(username, password)}
+
+
+async def _read_status_line(reader: asyncio.StreamReader) -> Tuple[str, int, str]:
+    """读取状态行，返回 (版本, 状态码, 原因短语)；格式不对时抛出 requests.ConnectionError"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("服务端关闭了连接")
+    parts = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not (len(parts[1]) == 3 and parts[1].isdigit()):
+        raise requests.ConnectionError(f"无效的状态行: {line[:100]!r}")
+    return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """读取响应头；重复的头按 RFC 9110 以逗号合并（同 requests / urllib3）"""
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n"):
+            return headers
+        if not line:
+            raise ConnectionError("响应头不完整")
+        name, sep, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if not sep or not name:
+            raise requests.ConnectionError(f"无效的响应头: {line[:100]!r}")
+        value = value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    """按 Content-Encoding 解压响应体，失败时抛出 requests.exceptions.ContentDecodingError"""
+    try:
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+    except (OSError, EOFError, zlib.error) as e:
+        raise requests.exceptions.ContentDecodingError(f"无法按 {encoding} 解压响应体: {e}") from e
+    return body
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise ConnectionError("chunked 响应体不完整")
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError as e:
+            raise requests.exceptions.ChunkedEncodingError(f"无效的 chunk 长度: {size_line[:100]!r}") from e
+        if size == 0:
+            # 跳过 trailer 直到空行
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+计数布隆过滤器
+
+记录持久层中存在的缓存键：过滤器判定不存在的键一定不在缓存中，
+查询时可以直接跳过文件系统 / 数据库；判定存在的键有一定概率误判
+（假阳性），此时照常查询持久层。
+
+每个位置是一个 8 位计数器而不是单个比特，因此淘汰条目时可以移除对应的键。
+"""
+
+import hashlib
+import math
+import threading
+from typing import Iterable
+
+
+class CountingBloomFilter:
+    """计数布隆过滤器"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        初始化过滤器
+
+        Args:
+            capacity: 预期容纳的键数量，超出后假阳性率上升
+            error_rate: 容量内的目标假阳性率
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate 必须在 0 到 1 之间: {error_rate}")
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+
+        # 最优参数：m = -n·ln(p) / ln(2)²，k = m/n·ln(2)
+        self.num_counters = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_counters / self.capacity * math.log(2)))
+
+        self._counters = bytearray(self.num_counters)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        # 双重哈希：h1 + i·h2
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_counters for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            for pos in positions:
+                # 计数器饱和后不再增减，避免溢出后误删
+                if self._counters[pos] < 255:
+                    self._counters[pos] += 1
+            self._count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def discard(self, key: str) -> None:
+        """移除键（只应移除确实加入过的键）"""
+        positions = self._positions(key)
+        with self._lock:
+            if not all(self._counters[pos] for pos in positions):
+                return
+            for pos in positions:
+                if self._counters[pos] < 255:
+                    self._counters[pos] -= 1
+            self._count -= 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters = bytearray(self.num_counters)
+            self._count = 0
+
+    def __contains__(self, key: str) -> bool:
+        counters = self._counters
+        return all(counters[pos] for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return self.num_counters
+
+    def estimated_false_positive_rate(self) -> float:
+        """按当前键数量估算的假阳性率：(1 - e^(-k·n/m))^k"""
+        return (1 - math.exp(-self.num_hashes * self._count / self.num_counters)) ** self.num_hashes
@@ -0,0 +1,818 @@
+#!/usr/bin/env python3
+"""
+搜索缓存存储后端
+
+SearchCache 的持久化层，提供两种实现：
+- file: 每个条目一个 JSON 文件（默认），按键的十六进制前缀分两级子目录存放
+- sqlite: 单个 SQLite 数据库（WAL 模式），元数据列带索引，
+          统计与过期清理均为单条 SQL
+
+两种后端都支持按条目数 / 字节数限制容量，超限时按 LRU 或 LFU 淘汰；
+条目负载的编码可配置（见 cache_codecs），编码名随条目记录。
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List
+from datetime import datetime
+
+from cache_codecs import DEFAULT_CODEC, RAW_CODEC, codec_for, get_codec
+
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+# 条目类型：正常结果，以及三类负缓存（空结果、错误响应、HTTP 4xx/5xx）
+ENTRY_KINDS = ("ok", "empty", "error", "http_error")
+
+
+@dataclass
+class CacheEntry:
+    """后端读出的缓存条目"""
+    result: Dict[str, Any]
+    expires_at: float  # 过期时间（epoch 秒）
+    size: int  # 存储占用（字节）
+    top_k: int = 0  # 条目实际保存的结果数量（0 表示未知）
+    kind: str = "ok"  # 条目类型，见 ENTRY_KINDS
+
+
+# 文件条目头：固定 64 字节的 ASCII 行，读取过期时间无需解析结果数据
+#   SC2 <expires_at:12 位 epoch 秒> <kind> <top_k> <codec><空格填充>\n
+HEADER_MAGIC = b"SC2 "
+HEADER_SIZE = 64
+
+
+@dataclass
+class EntryHeader:
+    """文件条目头"""
+    expires_at: int  # 过期时间（epoch 秒）
+    kind: str
+    top_k: int
+    codec: str  # 负载编码
+
+
+def encode_header(header: EntryHeader) -> bytes:
+    line = f"SC2 {int(header.expires_at):012d} {header.kind} {header.top_k} {header.codec}".encode("ascii")
+    if len(line) >= HEADER_SIZE:
+        raise ValueError(f"条目头超出 {HEADER_SIZE} 字节: {line!r}")
+    return line.ljust(HEADER_SIZE - 1) + b"\n"
+
+
+def decode_header(raw: bytes) -> Optional[EntryHeader]:
+    """解析条目头，没有条目头（如旧版整份 JSON）时返回 None"""
+    if not raw.startswith(HEADER_MAGIC) or len(raw) < HEADER_SIZE:
+        return None
+    _, expires_at, kind, top_k, codec = raw[:HEADER_SIZE].split()
+    return EntryHeader(int(expires_at), kind.decode("ascii"), int(top_k), codec.decode("ascii"))
+
+
+class EvictionIndex:
+    """
+    内存访问元数据索引
+
+    记录每个键的大小与访问情况，touch / add / remove / victim 均摊 O(1)：
+    - lru: 单个 OrderedDict，按最近访问排序
+    - lfu: 按访问次数分桶，每个桶内按最近访问排序
+    """
+
+    def __init__(self, policy: str = "lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"不支持的淘汰策略: {policy}（可选: {', '.join(EVICTION_POLICIES)}）")
+        self.policy = policy
+        self.size_bytes = 0
+        self._sizes: Dict[str, int] = {}
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sizes
+
+    def _bucket_key(self, key: str) -> int:
+        # LRU 只用一个桶
+        return self._freq[key] if self.policy == "lfu" else 0
+
+    def _unlink(self, key: str) -> None:
+        bucket_key = self._bucket_key(key)
+        bucket = self._buckets[bucket_key]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[bucket_key]
+            if bucket_key == self._min_freq:
+                self._min_freq = min(self._buckets) if self._buckets else 0
+
+    def _link(self, key: str) -> None:
+        bucket_key = self._bucket_key(key)
+        self._buckets.setdefault(bucket_key, OrderedDict())[key] = None
+        if len(self._buckets) == 1 or bucket_key < self._min_freq:
+            self._min_freq = bucket_key
+
+    def add(self, key: str, size: int) -> None:
+        """新增或更新条目（更新视为一次访问）"""
+        if key in self._sizes:
+            self.size_bytes += size - self._sizes[key]
+            self._sizes[key] = size
+            self.touch(key)
+            return
+
+        self._sizes[key] = size
+        self._freq[key] = 1
+        self.size_bytes += size
+        self._link(key)
+
+    def touch(self, key: str) -> None:
+        """记录一次访问"""
+        if key not in self._sizes:
+            return
+        self._unlink(key)
+        self._freq[key] += 1
+        self._link(key)
+
+    def remove(self, key: str) -> None:
+        """移除条目（不存在时忽略）"""
+        if key not in self._sizes:
+            return
+        self._unlink(key)
+        self.size_bytes -= self._sizes.pop(key)
+        del self._freq[key]
+
+    def victim(self, exclude: Optional[str] = None) -> Optional[str]:
+        """返回下一个应淘汰的键（跳过 exclude，通常是刚写入的键）"""
+        for bucket_key in [self._min_freq] + sorted(b for b in self._buckets if b != self._min_freq):
+            for key in self._buckets.get(bucket_key, ()):
+                if key != exclude:
+                    return key
+        return None
+
+    def clear(self) -> None:
+        self._sizes.clear()
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+        self.size_bytes = 0
+
+
+class CacheBackend:
+    """缓存存储后端基类"""
+
+    name = "base"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_hours: int,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        eviction_policy: str = "lru",
+        codec: str = DEFAULT_CODEC
+    ):
+        """
+        初始化后端
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_hours: 缓存有效期（小时）
+            max_bytes: 最大存储字节数（None 表示不限制）
+            max_entries: 最大条目数（None 表示不限制）
+            eviction_policy: 超限时的淘汰策略（lru / lfu）
+            codec: 新写入条目的编码（见 cache_codecs，读取时按条目记录的编码解码）
+        """
+        if eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"不支持的淘汰策略: {eviction_policy}（可选: {', '.join(EVICTION_POLICIES)}）")
+        self.cache_dir = cache_dir
+        self.ttl_hours = ttl_hours
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.eviction_policy = eviction_policy
+        self.codec = get_codec(codec)
+
+    @property
+    def bounded(self) -> bool:
+        return bool(self.max_bytes or self.max_entries)
+
+    def _over_limit(self, entries: int, size_bytes: int) -> bool:
+        return bool(
+            (self.max_entries and entries > self.max_entries)
+            or (self.max_bytes and size_bytes > self.max_bytes)
+        )
+
+    def get(self, key: str, stale_seconds: float = 0) -> Optional[CacheEntry]:
+        """
+        读取条目
+
+        过期但仍在 stale_seconds 宽限期内的条目照常返回（由调用方根据
+        expires_at 判断是否陈旧），超出宽限期的条目删除并返回 None。
+        """
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: str,
+        query: str,
+        result: Dict[str, Any],
+        top_k: int = 0,
+        ttl_seconds: Optional[float] = None,
+        kind: str = "ok"
+    ) -> List[str]:
+        """
+        写入条目，返回因容量限制被淘汰的键
+
+        Args:
+            key: 缓存键
+            query: 搜索查询
+            result: 搜索结果
+            top_k: 条目实际保存的结果数量
+            ttl_seconds: 本条目的有效期（秒），不传则使用 ttl_hours
+            kind: 条目类型（ok / empty / error / http_error）
+        """
+        raise NotImplementedError
+
+    def clear(self) -> int:
+        """删除全部条目，返回删除数量"""
+        raise NotImplementedError
+
+    def clear_expired(self) -> int:
+        """删除过期条目，返回删除数量"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """返回 total / expired / size_bytes"""
+        raise NotImplementedError
+
+    def keys(self) -> Iterator[str]:
+        """遍历全部条目的键（含已过期的）"""
+        raise NotImplementedError
+
+    def contains(self, key: str) -> bool:
+        """条目是否存在（不检查过期，不更新访问元数据）"""
+        raise NotImplementedError
+
+    def next_victim(self) -> Optional[str]:
+        """再写入一个新条目会触发淘汰时，返回最先被淘汰的键，否则返回 None"""
+        raise NotImplementedError
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    JSON 文件后端：每个缓存条目一个 <ab>/<cd>/<key>.json 文件
+
+    文件以固定长度的条目头开头（见 encode_header），过期与缺失的条目只需
+    读取头部即可判定；没有头部的文件（旧版整份 JSON）视为无效，读取或清理时删除。
+
+    按键的前两级十六进制前缀分片，单个目录内的文件数保持在可控范围。
+    旧版平铺在缓存目录下的 <key>.json 使用旧的缓存键（含 top_k、不含命名空间），
+    新版永远不会命中，启动后由后台线程逐个删除；统计与清空只看分片目录。
+
+    配置容量限制时，启动时扫描一次目录（仅 stat，不解析内容）建立
+    EvictionIndex，之后的写入只查内存索引，不再重复扫描目录。
+    """
+
+    name = "file"
+
+    _shard_name = re.compile(r"^[0-9a-f]{2}$")
+
+    def __init__(self, cache_dir: Path, ttl_hours: int, **options):
+        super().__init__(cache_dir, ttl_hours, **options)
+        self._lock = threading.Lock()
+        self.index: Optional[EvictionIndex] = None
+
+        self.purged = 0
+        purge = self._has_flat_entries()
+
+        if self.bounded:
+            self.index = EvictionIndex(self.eviction_policy)
+            self._load_index()
+
+        if purge:
+            threading.Thread(target=self._purge_flat, daemon=True).start()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key[2:4] / f"{key}.json"
+
+    def _iter_files(self):
+        """逐个产出分片目录中的所有条目文件（os.DirEntry）"""
+        with os.scandir(self.cache_dir) as top:
+            for top_entry in top:
+                if self._shard_name.match(top_entry.name) and top_entry.is_dir():
+                    with os.scandir(top_entry.path) as mid:
+                        for mid_entry in mid:
+                            if not (self._shard_name.match(mid_entry.name) and mid_entry.is_dir()):
+                                continue
+                            with os.scandir(mid_entry.path) as leaf:
+                                for leaf_entry in leaf:
+                                    if leaf_entry.name.endswith(".json") and leaf_entry.is_file():
+                                        yield leaf_entry
+
+    def _has_flat_entries(self) -> bool:
+        with os.scandir(self.cache_dir) as top:
+            return any(e.name.endswith(".json") and e.is_file() for e in top)
+
+    def _purge_flat(self) -> int:
+        """删除平铺目录中的旧版条目（旧缓存键已不可达），返回删除数量"""
+        count = 0
+        with os.scandir(self.cache_dir) as top:
+            for dir_entry in top:
+                if dir_entry.name.endswith(".json") and dir_entry.is_file():
+                    try:
+                        os.unlink(dir_entry.path)
+                        count += 1
+                    except FileNotFoundError:
+                        pass
+        self.purged += count
+        return count
+
+    def _unlink(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def _load_index(self) -> None:
+        """按修改时间顺序载入已有条目，最旧的最先被淘汰"""
+        files = []
+        for dir_entry in self._iter_files():
+            st = dir_entry.stat()
+            files.append((st.st_mtime, dir_entry.name[:-len(".json")], st.st_size))
+
+        for _, key, size in sorted(files):
+            self.index.add(key, size)
+
+    def _forget(self, key: str) -> None:
+        if self.index is not None:
+            with self._lock:
+                self.index.remove(key)
+
+    @staticmethod
+    def _read_header(f) -> EntryHeader:
+        """
+        读取固定长度的条目头
+
+        Raises:
+            ValueError: 没有条目头（旧版整份 JSON 文件，缓存键已不可达）
+        """
+        header = decode_header(f.read(HEADER_SIZE))
+        if header is None:
+            raise ValueError("缺少条目头")
+        return header
+
+    def get(self, key: str, stale_seconds: float = 0) -> Optional[CacheEntry]:
+        cache_file = self._path(key)
+
+        try:
+            f = open(cache_file, "rb")
+        except FileNotFoundError:
+            self._forget(key)
+            return None
+
+        try:
+            with f:
+                header = self._read_header(f)
+
+                # 检查是否过期（只读了头部）
+                if header.expires_at + stale_seconds <= time.time():
+                    f.close()
+                    cache_file.unlink(missing_ok=True)  # 删除过期缓存
+                    self._forget(key)
+                    return None
+
+                if header.codec == RAW_CODEC.name:
+                    # 负载就是原始响应，直接包装，不解析
+                    cache_data = {"result": RAW_CODEC.decode(f.read())}
+                else:
+                    cache_data = get_codec(header.codec).decode(f.read())
+                size = os.fstat(f.fileno()).st_size
+
+            if self.index is not None:
+                with self._lock:
+                    self.index.touch(key)
+
+            return CacheEntry(cache_data["result"], header.expires_at, size, header.top_k, header.kind)
+        except Exception:
+            # 缓存文件损坏或没有条目头，删除
+            cache_file.unlink(missing_ok=True)
+            self._forget(key)
+            return None
+
+    def set(
+        self,
+        key: str,
+        query: str,
+        result: Dict[str, Any],
+        top_k: int = 0,
+        ttl_seconds: Optional[float] = None,
+        kind: str = "ok"
+    ) -> List[str]:
+        now = datetime.now()
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_hours * 3600
+
+        codec = codec_for(result, self.codec)
+        header = EntryHeader(now.timestamp() + ttl_seconds, kind, top_k, codec.name)
+        if codec is RAW_CODEC:
+            payload = codec.encode(result)
+        else:
+            payload = codec.encode({
+                "query": query,
+                "cached_at": now.isoformat(),
+                "result": result
+            })
+
+        data = encode_header(header) + payload
+        cache_file = self._path(key)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # 先写同一分片目录下的临时文件再原子替换，读取方不会看到写了一半的文件
+        # （写了一半的文件会被当作损坏条目删除）
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if self.index is None:
+            return []
+
+        evicted = []
+        with self._lock:
+            self.index.add(key, len(data))
+            while self._over_limit(len(self.index), self.index.size_bytes):
+                victim = self.index.victim(exclude=key)
+                if victim is None:
+                    break
+                self.index.remove(victim)
+                self._unlink(victim)
+                evicted.append(victim)
+
+        return evicted
+
+    def keys(self) -> Iterator[str]:
+        for dir_entry in self._iter_files():
+            yield dir_entry.name[:-len(".json")]
+
+    def contains(self, key: str) -> bool:
+        if self.index is not None:
+            with self._lock:
+                return key in self.index
+        return self._path(key).exists()
+
+    def next_victim(self) -> Optional[str]:
+        if self.index is None:
+            return None
+        with self._lock:
+            # 条目数按写入后计算；字节数未知新条目大小，已达上限即视为会淘汰
+            full = (
+                (self.max_entries and len(self.index) + 1 > self.max_entries)
+                or (self.max_bytes and self.index.size_bytes >= self.max_bytes)
+            )
+            return self.index.victim() if full else None
+
+    def clear(self) -> int:
+        count = self._purge_flat()
+        for dir_entry in self._iter_files():
+            try:
+                os.unlink(dir_entry.path)
+                count += 1
+            except FileNotFoundError:
+                pass
+
+        if self.index is not None:
+            with self._lock:
+                self.index.clear()
+        return count
+
+    def clear_expired(self) -> int:
+        count = 0
+        now = time.time()
+
+        for dir_entry in self._iter_files():
+            file = Path(dir_entry.path)
+            try:
+                with open(file, "rb") as f:
+                    header = self._read_header(f)
+
+                if header.expires_at <= now:
+                    file.unlink()
+                    self._forget(file.stem)
+                    count += 1
+            except FileNotFoundError:
+                # 并发迁移或删除
+                pass
+            except Exception:
+                file.unlink(missing_ok=True)
+                self._forget(file.stem)
+                count += 1
+
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        total = 0
+        expired = 0
+        size_bytes = 0
+
+        now = time.time()
+
+        for dir_entry in self._iter_files():
+            try:
+                size = dir_entry.stat().st_size
+            except FileNotFoundError:
+                continue
+            total += 1
+            size_bytes += size
+
+            try:
+                with open(dir_entry.path, "rb") as f:
+                    header = self._read_header(f)
+                if header.expires_at <= now:
+                    expired += 1
+            except Exception:
+                # 损坏或没有条目头的文件不可读取，与过期条目一样等待清理
+                expired += 1
+
+        return {"total": total, "expired": expired, "size_bytes": size_bytes}
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite 后端
+
+    key / expires_at / size / query 均为索引列，stats() 与 clear_expired()
+    只走索引，不需要解析结果数据。淘汰时按 last_access / access_count 索引
+    取最冷的条目。
+
+    读取不写库：命中时的访问元数据先记在内存里（同文件后端的 EvictionIndex），
+    攒够 ACCESS_FLUSH_SIZE 条或需要按访问顺序挑选淘汰条目时再一次批量写入。
+    进程退出时未写入的部分只影响淘汰顺序。
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            cached_at REAL NOT NULL,
+            expires_at INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            last_access REAL NOT NULL DEFAULT 0,
+            access_count INTEGER NOT NULL DEFAULT 0,
+            top_k INTEGER NOT NULL DEFAULT 0,
+            kind TEXT NOT NULL DEFAULT 'ok',
+            codec TEXT NOT NULL DEFAULT 'json'
+        );
+    """
+
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_entries_expires_size ON entries(expires_at, size);
+        CREATE INDEX IF NOT EXISTS idx_entries_query ON entries(query);
+        CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(last_access);
+        CREATE INDEX IF NOT EXISTS idx_entries_lfu ON entries(access_count, last_access);
+    """
+
+    # 内存中累积的访问记录达到该条数时批量写入数据库
+    ACCESS_FLUSH_SIZE = 256
+
+    # 按淘汰策略排序的 SQL 片段
+    VICTIM_ORDER = {
+        "lru": "last_access",
+        "lfu": "access_count, last_access",
+    }
+
+    def __init__(self, cache_dir: Path, ttl_hours: int, db_name: str = "search_cache.db", **options):
+        super().__init__(cache_dir, ttl_hours, **options)
+        self.db_path = cache_dir / db_name
+        self._lock = threading.Lock()
+
+        # 后台刷新等场景会跨线程访问，统一由锁串行化
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+        self._conn.executescript(self.INDEXES)
+        self._conn.commit()
+
+        # 进程内的条目数 / 字节数计数，仅用于判断是否需要淘汰；
+        # 真正淘汰前会以数据库为准重新统计（其他进程也可能写入）
+        self._entries, self._size_bytes = self._totals()
+
+        # 尚未写入数据库的访问记录：key -> [最近访问时间, 访问次数]
+        self._access: Dict[str, List[float]] = {}
+
+    def _migrate(self) -> None:
+        """为旧版数据库补齐访问元数据列"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "last_access" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE entries SET last_access = cached_at")
+        if "access_count" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN access_count INTEGER NOT NULL DEFAULT 0")
+        if "top_k" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN top_k INTEGER NOT NULL DEFAULT 0")
+        if "kind" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN kind TEXT NOT NULL DEFAULT 'ok'")
+        if "codec" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN codec TEXT NOT NULL DEFAULT 'json'")
+
+    def _totals(self):
+        return self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+
+    def _flush_access(self) -> None:
+        """把内存中的访问记录批量写入数据库（调用方持有锁）"""
+        if not self._access:
+            return
+        self._conn.executemany(
+            "UPDATE entries SET last_access = MAX(last_access, ?), access_count = access_count + ? WHERE key = ?",
+            [(last_access, count, key) for key, (last_access, count) in self._access.items()]
+        )
+        self._conn.commit()
+        self._access.clear()
+
+    def _delete(self, key: str) -> None:
+        self._access.pop(key, None)
+        size = self._conn.execute("DELETE FROM entries WHERE key = ? RETURNING size", (key,)).fetchone()
+        if size is not None:
+            self._entries -= 1
+            self._size_bytes -= size[0]
+        self._conn.commit()
+
+    def get(self, key: str, stale_seconds: float = 0) -> Optional[CacheEntry]:
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, size, payload, top_k, kind, codec FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            expires_at, size, payload, top_k, kind, codec = row
+            if expires_at + stale_seconds <= now:
+                self._delete(key)
+                return None
+
+            access = self._access.setdefault(key, [now, 0])
+            access[0] = now
+            access[1] += 1
+            if len(self._access) >= self.ACCESS_FLUSH_SIZE:
+                self._flush_access()
+
+        try:
+            return CacheEntry(get_codec(codec).decode(payload), expires_at, size, top_k, kind)
+        except Exception:
+            with self._lock:
+                self._delete(key)
+            return None
+
+    def set(
+        self,
+        key: str,
+        query: str,
+        result: Dict[str, Any],
+        top_k: int = 0,
+        ttl_seconds: Optional[float] = None,
+        kind: str = "ok"
+    ) -> List[str]:
+        now = time.time()
+        codec = codec_for(result, self.codec)
+        payload = codec.encode(result)
+        size = len(payload)
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_hours * 3600
+        expires_at = int(now + ttl_seconds)
+
+        with self._lock:
+            # 覆盖写入重置访问元数据
+            self._access.pop(key, None)
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, query, cached_at, expires_at, size, payload, last_access, access_count, top_k, kind, codec) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)",
+                (key, query, now, expires_at, size, payload, now, top_k, kind, codec.name)
+            )
+            self._conn.commit()
+
+            if old is None:
+                self._entries += 1
+                self._size_bytes += size
+            else:
+                self._size_bytes += size - old[0]
+
+            if not self._over_limit(self._entries, self._size_bytes):
+                return []
+            return self._evict(protect=key)
+
+    def _evict(self, protect: str) -> List[str]:
+        """淘汰最冷条目直到满足容量限制（调用方持有锁）"""
+        self._flush_access()
+        self._entries, self._size_bytes = self._totals()
+        order = self.VICTIM_ORDER[self.eviction_policy]
+        evicted = []
+
+        while self._over_limit(self._entries, self._size_bytes):
+            rows = self._conn.execute(
+                f"SELECT key, size FROM entries WHERE key != ? ORDER BY {order} LIMIT 64",
+                (protect,)
+            ).fetchall()
+            if not rows:
+                break
+
+            for key, size in rows:
+                if not self._over_limit(self._entries, self._size_bytes):
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._access.pop(key, None)
+                self._entries -= 1
+                self._size_bytes -= size
+                evicted.append(key)
+
+        self._conn.commit()
+        return evicted
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM entries").fetchall()
+        for (key,) in rows:
+            yield key
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def next_victim(self) -> Optional[str]:
+        if not self.bounded:
+            return None
+        with self._lock:
+            full = (
+                (self.max_entries and self._entries + 1 > self.max_entries)
+                or (self.max_bytes and self._size_bytes >= self.max_bytes)
+            )
+            if not full:
+                return None
+            self._flush_access()
+            row = self._conn.execute(
+                f"SELECT key FROM entries ORDER BY {self.VICTIM_ORDER[self.eviction_policy]} LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def clear(self) -> int:
+        with self._lock:
+            count = self._conn.execute("DELETE FROM entries").rowcount
+            self._conn.commit()
+            self._access.clear()
+            self._entries, self._size_bytes = 0, 0
+        return count
+
+    def clear_expired(self) -> int:
+        with self._lock:
+            count = self._conn.execute(
+                "DELETE FROM entries WHERE expires_at <= ?", (int(time.time()),)
+            ).rowcount
+            self._conn.commit()
+            self._entries, self._size_bytes = self._totals()
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            total, size_bytes = self._totals()
+            expired = self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE expires_at <= ?", (int(time.time()),)
+            ).fetchone()[0]
+
+        return {"total": total, "expired": expired, "size_bytes": size_bytes}
+
+
+BACKENDS = {
+    FileCacheBackend.name: FileCacheBackend,
+    SQLiteCacheBackend.name: SQLiteCacheBackend,
+}
+
+
+def create_backend(name: str, cache_dir: Path, ttl_hours: int, **options) -> CacheBackend:
+    """
+    按名称创建后端
+
+    Args:
+        name: 后端名称（file / sqlite）
+        cache_dir: 缓存目录
+        ttl_hours: 缓存有效期（小时）
+        **options: 容量限制、淘汰策略与编码（max_bytes / max_entries / eviction_policy / codec）
+
+    Returns:
+        后端实例
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"不支持的缓存后端: {name}（可选: {', '.join(BACKENDS)}）")
+    return BACKENDS[name](cache_dir, ttl_hours, **options)
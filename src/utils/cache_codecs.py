@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+缓存条目编码
+
+持久层写入前把条目编码为字节，读取时按条目记录的编码名解码，
+因此同一缓存目录 / 数据库中可以混存不同编码的条目：
+- json: 紧凑 JSON（无缩进、分隔符不带空格）
+- zlib: 紧凑 JSON + zlib 压缩
+- lzma: 紧凑 JSON + lzma 压缩（体积最小，编码最慢）
+- orjson: orjson 编码（需安装 orjson，未安装时不可用）
+
+另有 raw 编码：条目负载就是上游响应的原始字节（RawResult），写入与
+命中时都不做 JSON 编解码，由写入方决定是否使用，不可作为默认编码。
+"""
+
+import json
+import lzma
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DEFAULT_CODEC = "json"
+
+
+class Codec:
+    """编码器基类"""
+
+    name = ""
+
+    def encode(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """紧凑 JSON（也能读取旧版带缩进的 JSON）"""
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class ZlibCodec(JSONCodec):
+    """zlib 压缩的紧凑 JSON"""
+
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def encode(self, obj: Any) -> bytes:
+        return zlib.compress(super().encode(obj), self.level)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return super().decode(zlib.decompress(data))
+
+
+class LzmaCodec(JSONCodec):
+    """lzma 压缩的紧凑 JSON"""
+
+    name = "lzma"
+
+    def __init__(self, preset: int = 1):
+        self.preset = preset
+
+    def encode(self, obj: Any) -> bytes:
+        return lzma.compress(super().encode(obj), preset=self.preset)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return super().decode(lzma.decompress(data))
+
+
+class OrjsonCodec(Codec):
+    """orjson 编码（输出同样是紧凑 JSON）"""
+
+    name = "orjson"
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class RawResult(Mapping):
+    """
+    原始响应字节，首次访问键时才解析为 JSON
+
+    只读映射，可以像结果字典一样使用（result["results"]、result.get(...)），
+    需要原样输出时直接使用 raw 字节（limit 不为 None 时 raw 含未截取的全部结果）。
+    """
+
+    def __init__(self, raw: bytes, limit: Optional[int] = None):
+        self.raw = raw
+        self.limit = limit  # 解析时 results 只保留前 limit 项
+        self._data: Optional[Dict[str, Any]] = None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """解析后的结果字典"""
+        if self._data is None:
+            data = json.loads(self.raw)
+            if self.limit is not None and isinstance(data.get("results"), list):
+                data["results"] = data["results"][:self.limit]
+            self._data = data
+        return self._data
+
+    def limited(self, limit: int) -> "RawResult":
+        """只保留前 limit 项结果的视图（共享响应字节，同样在访问时才解析）"""
+        if self.limit is not None:
+            limit = min(limit, self.limit)
+        return RawResult(self.raw, limit)
+
+    @property
+    def parsed(self) -> bool:
+        return self._data is not None
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __bool__(self) -> bool:
+        # 真值判断不触发解析
+        return bool(self.raw)
+
+    def __repr__(self) -> str:
+        if self.limit is not None:
+            return f"RawResult({len(self.raw)} bytes, limit={self.limit})"
+        return f"RawResult({len(self.raw)} bytes)"
+
+
+class RawCodec(Codec):
+    """原始响应字节，原样写入、原样读出"""
+
+    name = "raw"
+
+    def encode(self, obj: RawResult) -> bytes:
+        return obj.raw
+
+    def decode(self, data: Union[bytes, str]) -> RawResult:
+        return RawResult(data.encode("utf-8") if isinstance(data, str) else data)
+
+
+RAW_CODEC = RawCodec()
+
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec
+    for codec in (JSONCodec(), ZlibCodec(), LzmaCodec(), OrjsonCodec())
+}
+
+
+def available_codecs() -> List[str]:
+    """当前环境可用的编码名"""
+    return [name for name in CODECS if name != "orjson" or orjson is not None]
+
+
+def get_codec(name: str) -> Codec:
+    """
+    按名称获取编码器
+
+    Raises:
+        ValueError: 未知编码，或依赖库未安装
+    """
+    if name == RAW_CODEC.name:
+        return RAW_CODEC
+    if name not in available_codecs():
+        if name in CODECS:
+            raise ValueError(f"缓存编码 {name} 需要安装对应的库（pip install {name}）")
+        raise ValueError(f"不支持的缓存编码: {name}（可选: {', '.join(available_codecs())}）")
+    return CODECS[name]
+
+
+def codec_for(result: Any, default: Codec) -> Codec:
+    """选择写入编码：原始响应用 raw，其余用配置的编码"""
+    return RAW_CODEC if isinstance(result, RawResult) else default
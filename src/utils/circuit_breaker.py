@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+熔断器
+
+某个引擎持续出错或变慢时，每次搜索仍要等它失败后才能继续。CircuitBreaker
+在滑动时间窗口内统计每次上游请求的结果与耗时：
+- closed：正常放行；窗口内请求数达到 min_calls，且错误率或慢调用比例
+  超过阈值时转为 open
+- open：直接抛出 CircuitOpenError，不请求上游；open_seconds 后转为 half_open
+- half_open：放行少量探测请求，成功则恢复 closed，失败或仍然很慢则重新 open
+
+只统计上游请求本身：缓存命中不经过熔断器，open 期间缓存命中照常返回。
+调用方的原因导致的失败（4xx、截止时间在发出请求前已用完、客户端限流）
+不计入错误率。
+
+状态与转换可以观察：stats() 给出当前状态、窗口统计与最近的转换记录，
+add_listener() 注册的回调在每次转换时调用 listener(name, 原状态, 新状态, 原因)。
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import requests
+
+try:
+    from rate_limiter import RateLimitExceeded
+except ImportError:
+    RateLimitExceeded = None
+
+
+# 保留的转换记录条数
+TRANSITION_HISTORY = 50
+
+
+class BreakerState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断器打开，请求未发出"""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in  # 距离进入 half_open 的秒数
+        super().__init__(f"{name} 熔断中，{retry_in:.1f}s 后重新探测")
+
+
+def is_upstream_failure(error: BaseException) -> Optional[bool]:
+    """
+    判断一次失败是否说明上游不健康
+
+    Returns:
+        True 计为失败；None 表示与上游健康无关，不计入统计
+    """
+    # 取消（调用方放弃等待）等非 Exception 不说明上游状态
+    if not isinstance(error, Exception) or isinstance(error, CircuitOpenError):
+        return None
+    if RateLimitExceeded is not None and isinstance(error, RateLimitExceeded):
+        return None
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        if status is not None and status < 500 and status != 429:
+            return None
+        return True
+    # DeadlineExceeded：只有读取阶段的超时说明上游慢；"request" / "ratelimit"
+    # 表示请求还没发出预算就用完了
+    stage = getattr(error, "stage", None)
+    if stage is not None and stage != "read":
+        return None
+    return True
+
+
+class _Attempt:
+    """一次上游请求：进入时检查熔断器，退出时记录结果与耗时"""
+
+    def __init__(self, breaker: "CircuitBreaker"):
+        self.breaker = breaker
+        self.started: Optional[float] = None
+        self.probe = False
+
+    def start(self) -> None:
+        """从此刻开始计时（之前的客户端限流等待不计入耗时）"""
+        self.started = self.breaker.clock()
+
+    def __enter__(self) -> "_Attempt":
+        self.probe = self.breaker._admit()
+        self.started = self.breaker.clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        latency = self.breaker.clock() - self.started
+        self.breaker._complete(latency, exc, self.probe)
+        return False
+
+
+class CircuitBreaker:
+    """单个引擎的熔断器（线程安全）"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        slow_call_seconds: Optional[float] = 10.0,
+        slow_call_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        初始化熔断器
+
+        Args:
+            name: 名称（引擎名），出现在错误信息与转换回调中
+            window_seconds: 滑动窗口长度（秒）
+            min_calls: 窗口内至少有这么多次请求才判断是否熔断
+            error_rate: 错误率阈值（0~1）
+            slow_call_seconds: 超过此耗时（秒）的请求计为慢调用，None 表示不按耗时熔断
+            slow_call_rate: 慢调用比例阈值（0~1）
+            open_seconds: open 持续多久后进入 half_open（秒）
+            half_open_calls: half_open 时同时放行的探测请求数
+            clock: 单调时钟
+        """
+        if min_calls < 1 or half_open_calls < 1:
+            raise ValueError("min_calls 与 half_open_calls 必须大于等于 1")
+
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0  # half_open 时进行中的探测数
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()  # (时间, 是否失败, 是否慢)
+        self._rejected = 0
+        self._transitions: Deque[Dict[str, Any]] = deque(maxlen=TRANSITION_HISTORY)
+        self._listeners: List[Callable[[str, str, str, str], None]] = []
+
+    @property
+    def state(self) -> BreakerState:
+        """当前状态（open 超过 open_seconds 后读取即转为 half_open）"""
+        with self._lock:
+            events = self._refresh()
+        self._notify(events)
+        return self._state
+
+    def allow(self) -> bool:
+        """当前是否会放行请求（不占用探测名额）"""
+        state = self.state
+        if state == BreakerState.OPEN:
+            return False
+        if state == BreakerState.HALF_OPEN:
+            with self._lock:
+                return self._probes < self.half_open_calls
+        return True
+
+    def attempt(self) -> _Attempt:
+        """
+        一次上游请求的上下文
+
+            with breaker.attempt() as attempt:
+                ...                 # 例如等待限流令牌
+                attempt.start()
+                return fetch()
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或 half_open 时探测名额已满
+        """
+        return _Attempt(self)
+
+    def add_listener(self, listener: Callable[[str, str, str, str], None]) -> None:
+        """注册状态转换回调 listener(name, 原状态, 新状态, 原因)"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def reset(self) -> None:
+        """手动恢复为 closed 并清空窗口"""
+        with self._lock:
+            self._calls.clear()
+            events = self._transition(BreakerState.CLOSED, "manual reset")
+        self._notify(events)
+
+    def stats(self) -> Dict[str, Any]:
+        """当前状态、窗口内请求数 / 错误率 / 慢调用比例、拒绝次数与最近的转换记录"""
+        with self._lock:
+            events = self._refresh()
+            self._prune(self.clock())
+            calls, failures, slow = self._window()
+            stats = {
+                "state": self._state.value,
+                "calls": calls,
+                "failures": failures,
+                "slow_calls": slow,
+                "error_rate": round(failures / calls, 4) if calls else 0.0,
+                "slow_call_rate": round(slow / calls, 4) if calls else 0.0,
+                "rejected": self._rejected,
+                "retry_in": round(self._retry_in(), 3) if self._state == BreakerState.OPEN else None,
+                "transitions": list(self._transitions)
+            }
+        self._notify(events)
+        return stats
+
+    def _admit(self) -> bool:
+        """放行一次请求；返回是否为 half_open 探测"""
+        with self._lock:
+            events = self._refresh()
+            probe = False
+            error = None
+            if self._state == BreakerState.OPEN:
+                error = CircuitOpenError(self.name, self._retry_in())
+            elif self._state == BreakerState.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    error = CircuitOpenError(self.name, 0.0)
+                else:
+                    self._probes += 1
+                    probe = True
+            if error is not None:
+                self._rejected += 1
+        self._notify(events)
+        if error is not None:
+            raise error
+        return probe
+
+    def _complete(self, latency: float, error: Optional[BaseException], probe: bool) -> None:
+        """记录一次请求的结果"""
+        failed = False
+        if error is not None:
+            failed = is_upstream_failure(error)
+        slow = self.slow_call_seconds is not None and latency >= self.slow_call_seconds
+
+        with self._lock:
+            events = []
+            if probe and self._state == BreakerState.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+            if failed is None:
+                # 与上游健康无关：只归还探测名额
+                pass
+            elif probe and self._state == BreakerState.HALF_OPEN:
+                if failed or slow:
+                    reason = "probe failed" if failed else f"probe slow ({latency:.2f}s)"
+                    events = self._transition(BreakerState.OPEN, reason)
+                else:
+                    self._calls.clear()
+                    events = self._transition(BreakerState.CLOSED, "probe succeeded")
+            elif self._state == BreakerState.CLOSED:
+                now = self.clock()
+                self._calls.append((now, bool(failed), slow))
+                self._prune(now)
+                events = self._evaluate()
+        self._notify(events)
+
+    def _evaluate(self) -> List[Tuple[str, str, str]]:
+        """closed 状态下按窗口统计判断是否熔断（持有锁时调用）"""
+        calls, failures, slow = self._window()
+        if calls < self.min_calls:
+            return []
+        if failures / calls >= self.error_rate:
+            return self._transition(BreakerState.OPEN, f"error rate {failures}/{calls}")
+        if self.slow_call_seconds is not None and slow / calls >= self.slow_call_rate:
+            return self._transition(
+                BreakerState.OPEN, f"slow calls {slow}/{calls} over {self.slow_call_seconds:g}s"
+            )
+        return []
+
+    def _refresh(self) -> List[Tuple[str, str, str]]:
+        """open 超时后转为 half_open（持有锁时调用）"""
+        if self._state == BreakerState.OPEN and self._retry_in() <= 0:
+            return self._transition(BreakerState.HALF_OPEN, f"open for {self.open_seconds:g}s")
+        return []
+
+    def _transition(self, state: BreakerState, reason: str) -> List[Tuple[str, str, str]]:
+        """切换状态并记录（持有锁时调用）；返回待通知的转换"""
+        previous = self._state
+        if previous == state:
+            return []
+        self._state = state
+        if state == BreakerState.OPEN:
+            self._opened_at = self.clock()
+        if state != BreakerState.HALF_OPEN:
+            self._probes = 0
+        self._transitions.append({
+            "from": previous.value,
+            "to": state.value,
+            "reason": reason,
+            "at": time.time()
+        })
+        return [(previous.value, state.value, reason)]
+
+    def _notify(self, events: List[Tuple[str, str, str]]) -> None:
+        """在锁外调用转换回调，回调中的异常不影响请求"""
+        if not events:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+        for previous, state, reason in events:
+            for listener in listeners:
+                try:
+                    listener(self.name, previous, state, reason)
+                except Exception:
+                    pass
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self.clock())
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0][0] <= now - self.window_seconds:
+            self._calls.popleft()
+
+    def _window(self) -> Tuple[int, int, int]:
+        calls = len(self._calls)
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return calls, failures, slow
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+端到端截止时间
+
+一次搜索从调用方拿到一个总预算（Deadline），沿调用链向下传递：
+- 每次 HTTP 请求的超时由剩余预算拆成连接超时与读取超时，连接超时只占
+  一小部分，连接不上时大部分预算仍留给后续的回退引擎
+- 读取响应体时逐块检查截止时间，过期即关闭连接，不再等待
+- 截止时间已过的阶段不再开始（例如缓存未命中后不再发请求）
+- 各阶段的耗时与是否超时记录在 Deadline.stages 中，超时抛出的
+  DeadlineExceeded 带上超时阶段与全部阶段记录
+
+未传截止时间时仍使用默认的连接 / 读取超时，避免挂起的上游连接
+永久占住调用方。
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+
+# 未设截止时间时的默认超时（秒）
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30
+
+# 连接超时占剩余预算的比例（不超过 DEFAULT_CONNECT_TIMEOUT）
+CONNECT_SHARE = 0.3
+
+# 读取响应体时每块的大小
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class DeadlineExceeded(requests.Timeout):
+    """截止时间已到（requests.Timeout 的子类，原有的超时处理照常生效）"""
+
+    def __init__(
+        self,
+        stage: str,
+        stages: Optional[List[Dict[str, Any]]] = None,
+        budget: Optional[float] = None,
+        recorded: bool = False
+    ):
+        self.stage = stage
+        self.stages = stages if stages is not None else []
+        self.budget = budget
+        self.recorded = recorded  # 超时阶段是否已写入 stages
+        message = f"{stage} 超时"
+        if budget is not None:
+            message += f"（总预算 {budget:.2f}s）"
+        super().__init__(message)
+
+
+class Deadline:
+    """截止时间"""
+
+    def __init__(self, seconds: Optional[float] = None, clock=time.monotonic):
+        """
+        Args:
+            seconds: 总预算（秒），None 表示不设截止时间（只使用默认超时）
+            clock: 单调时钟
+        """
+        self.clock = clock
+        self.budget = seconds
+        self.expires_at = clock() + seconds if seconds is not None else None
+        self.stages: List[Dict[str, Any]] = []
+
+    @classmethod
+    def coerce(cls, value: Union[None, float, "Deadline"]) -> "Deadline":
+        """秒数或 None 转为 Deadline；已是 Deadline 则原样返回（共享预算与阶段记录）"""
+        if isinstance(value, Deadline):
+            return value
+        return cls(value)
+
+    def child(self, share: float = 1.0, reserve: float = 0.0) -> "Deadline":
+        """
+        子预算：取剩余预算扣除 reserve 秒后的 share 比例，阶段记录与父预算共享
+
+        用于给一次尝试分配预算，同时为后续回退留出时间。
+        """
+        child = Deadline(clock=self.clock)
+        child.budget = self.budget
+        child.stages = self.stages
+        if self.expires_at is not None:
+            child.expires_at = self.clock() + max(0.0, self.remaining() - reserve) * share
+        return child
+
+    def remaining(self) -> float:
+        """剩余秒数（不设截止时间时为 inf，已过期为 0）"""
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.clock() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        """截止时间已过则记录该阶段并抛出 DeadlineExceeded"""
+        if self.expired:
+            self.record(stage, 0.0, timed_out=True)
+            raise self.exceeded(stage, recorded=True)
+
+    def exceeded(self, stage: str, recorded: bool = False) -> DeadlineExceeded:
+        return DeadlineExceeded(stage, self.stages, self.budget, recorded)
+
+    def timeouts(self) -> Tuple[float, float]:
+        """
+        本次 HTTP 请求的 (连接超时, 读取超时)
+
+        读取超时为本预算的全部剩余时间；需要为回退引擎留出时间时，调用方应传入
+        child() 得到的子预算（统一客户端按 ATTEMPT_SHARE 与预留秒数切分）。
+
+        Raises:
+            DeadlineExceeded: 预算已用完
+        """
+        if self.expires_at is None:
+            return DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.exceeded("request")
+        connect = min(DEFAULT_CONNECT_TIMEOUT, remaining * CONNECT_SHARE)
+        return connect, remaining
+
+    def record(self, stage: str, elapsed: float, timed_out: bool = False) -> None:
+        self.stages.append({"stage": stage, "elapsed": round(elapsed, 4), "timed_out": timed_out})
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        记录一个阶段的耗时
+
+        阶段内的超时转为 DeadlineExceeded：requests.ConnectTimeout 记为 name.connect，
+        其他 requests.Timeout 记为 name.read，TimeoutError 记为 name.deadline，
+        未记录的 DeadlineExceeded 记为 name.<其阶段>。
+        """
+        start = self.clock()
+        try:
+            yield
+        except DeadlineExceeded as e:
+            if e.recorded:
+                raise
+            stage, cause = f"{name}.{e.stage}", e
+        except requests.ConnectTimeout as e:
+            stage, cause = f"{name}.connect", e
+        except requests.Timeout as e:
+            stage, cause = f"{name}.read", e
+        except TimeoutError as e:
+            # 等待进行中的请求、asyncio.wait_for 等到达截止时间
+            stage, cause = f"{name}.deadline", e
+        else:
+            self.record(name, self.clock() - start)
+            return
+
+        self.record(stage, self.clock() - start, timed_out=True)
+        raise self.exceeded(stage, recorded=True) from cause
+
+    def report(self) -> Dict[str, Any]:
+        """预算、剩余时间与各阶段记录"""
+        remaining = self.remaining()
+        return {
+            "budget": self.budget,
+            "remaining": None if remaining == float("inf") else round(remaining, 4),
+            "stages": list(self.stages)
+        }
+
+
+def read_body(response: requests.Response, deadline: Deadline) -> bytes:
+    """
+    逐块读取响应体（请求需以 stream=True 发出），截止时间已过则关闭连接并抛出
+
+    读完后 response.content / response.json() 照常可用。
+
+    Raises:
+        DeadlineExceeded: 读取过程中截止时间已到
+    """
+    chunks = []
+    try:
+        for chunk in response.iter_content(READ_CHUNK_SIZE):
+            chunks.append(chunk)
+            if deadline.expired:
+                raise deadline.exceeded("read")
+    except requests.ConnectionError as e:
+        # 读取响应体时的超时被 requests 包装成 ConnectionError
+        if e.args and isinstance(e.args[0], ReadTimeoutError):
+            raise deadline.exceeded("read") from e
+        raise
+    finally:
+        response.close()
+
+    body = b"".join(chunks)
+    response._content = body
+    response._content_consumed = True
+    return body
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+搜索引擎客户端的公共辅助函数
+
+Anspire 与 Brave 客户端（及其异步版本）共用：
+- 把构造参数 retry / rate_limit 转为 RetryPolicy / RateLimiter
+- 把 search 的 deadline 参数（秒数或 Deadline）转为 Deadline
+- 熔断器与阶段计时的上下文，未启用时为空上下文
+
+依赖的模块不可用时返回 None 或空上下文，客户端按未启用处理。
+"""
+
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Union
+
+try:
+    from deadline import Deadline
+except ImportError:
+    Deadline = None
+
+try:
+    from retry_policy import RetryPolicy
+except ImportError:
+    RetryPolicy = None
+
+try:
+    from rate_limiter import RateLimiter, get_rate_limiter
+except ImportError:
+    RateLimiter = None
+    get_rate_limiter = None
+
+
+# 未传截止时间（或 deadline 模块不可用）时的 (连接超时, 读取超时)
+DEFAULT_TIMEOUT = (3.05, 30)
+
+
+def make_retry_policy(retry: Union[bool, "RetryPolicy"]) -> Optional["RetryPolicy"]:
+    """retry 参数转为 RetryPolicy；不重试或 retry_policy 模块不可用时返回 None"""
+    if retry is True:
+        return RetryPolicy() if RetryPolicy is not None else None
+    return retry or None
+
+
+def make_rate_limiter(
+    engine: str,
+    api_key: str,
+    rate_limit: Union[None, Dict[str, Any], "RateLimiter"]
+) -> Optional["RateLimiter"]:
+    """rate_limit 参数转为 RateLimiter；不限流或 rate_limiter 模块不可用时返回 None"""
+    if rate_limit is None or get_rate_limiter is None:
+        return None
+    if isinstance(rate_limit, dict):
+        return get_rate_limiter(engine, api_key, **rate_limit)
+    return rate_limit
+
+
+def breaker_attempt(breaker: Optional["CircuitBreaker"]):
+    """一次上游请求的熔断器上下文（无熔断器时为空上下文）"""
+    return breaker.attempt() if breaker is not None else nullcontext()
+
+
+def coerce_deadline(deadline: Union[None, float, "Deadline"]) -> Optional["Deadline"]:
+    """
+    秒数转为 Deadline；未传截止时间或 deadline 模块不可用时返回 None
+
+    返回 None 时请求走普通的 requests 调用（默认超时），不必流式读取响应体。
+    """
+    if deadline is None or Deadline is None:
+        return None
+    return Deadline.coerce(deadline)
+
+
+def deadline_stage(deadline: Optional["Deadline"], name: str):
+    """记录阶段耗时（无 Deadline 时为空上下文）"""
+    return deadline.stage(name) if deadline is not None else nullcontext()
+
+
+def wait_timeout(deadline: Optional["Deadline"]) -> Optional[float]:
+    """等待进行中请求的最长时间（None 表示不限）"""
+    if deadline is None or deadline.expires_at is None:
+        return None
+    return deadline.remaining()
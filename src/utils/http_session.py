@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 会话
+
+每次调用 requests.get 都会新建连接，访问 HTTPS 接口时 TCP + TLS 握手
+占了大部分延迟。这里按名称（通常是引擎名）提供进程内共享的
+requests.Session：连接池常驻、keep-alive 复用连接、默认接受 gzip。
+
+Session 只在创建时配置，之后不修改其状态（请求头、参数都随单次请求传入），
+底层 urllib3 连接池是线程安全的，多个线程和客户端实例可以共用同一个会话。
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 连接池默认参数：pool_connections 为缓存的主机数，pool_maxsize 为每个主机保留的连接数
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+
+_sessions: Dict[Tuple[str, int, int], requests.Session] = {}
+_lock = threading.Lock()
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> requests.Session:
+    """
+    创建配置好连接池的会话
+
+    Args:
+        pool_connections: 连接池缓存的主机数
+        pool_maxsize: 每个主机保留的最大连接数（并发线程数超过时多出的连接用完即关）
+
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    # 重试由调用方决定，这里不在连接层静默重试
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+    return session
+
+
+def get_session(
+    name: str,
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+) -> requests.Session:
+    """
+    获取按名称共享的会话（首次调用时创建）
+
+    Args:
+        name: 会话名称，相同名称与连接池参数的调用方共用一个会话
+        pool_connections: 连接池缓存的主机数
+        pool_maxsize: 每个主机保留的最大连接数
+
+    Returns:
+        requests.Session
+    """
+    key = (name, pool_connections, pool_maxsize)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = create_session(pool_connections, pool_maxsize)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    """关闭并丢弃全部共享会话"""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+查询规范化
+
+把只在大小写、空白、全角/半角或 site: 写法上不同的查询归一为同一形式，
+提高缓存命中率、减少重复请求：
+- NFKC 归一（全角字母数字、标点、空格转半角）
+- 去除首尾空白，连续空白合并为一个空格，统一小写（大写的 OR 操作符保留）
+- site: 操作符提取到 insite 参数，站点列表去重并排序
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
+
+from search_intent import SearchIntentClassifier
+
+
+_classifier = SearchIntentClassifier()
+_whitespace = re.compile(r"\s+")
+
+
+@dataclass
+class CanonicalQuery:
+    """规范化结果"""
+    query: str
+    insite: Optional[str]
+    changed: bool  # 与原始输入是否不同
+
+
+def normalize_text(query: str) -> str:
+    """NFKC 归一、合并空白、统一小写；大写的 OR 是 Brave 的布尔操作符，保持原样"""
+    query = unicodedata.normalize("NFKC", query)
+    words = _whitespace.sub(" ", query).strip().split(" ")
+    return " ".join(word if word == "OR" else word.lower() for word in words)
+
+
+def normalize_sites(sites: List[str]) -> Optional[str]:
+    """站点列表去重排序，返回逗号分隔字符串（空列表返回 None）"""
+    normalized = set()
+    for site in sites:
+        site = normalize_text(site).rstrip("/")
+        if site:
+            normalized.add(site)
+    return ",".join(sorted(normalized)) or None
+
+
+def _lift_sites(query: str) -> Tuple[str, List[str]]:
+    """提取查询中的 site: 操作符"""
+    sites = []
+    while True:
+        analysis = _classifier._check_site_search(query, query)
+        if analysis is None:
+            break
+
+        # 只提取 site: 语法，中文"在 X 搜索"属于查询本身的语义
+        operator = f"site:{analysis.sites[0]}"
+        if operator not in query:
+            break
+
+        sites.append(analysis.sites[0])
+        query = _whitespace.sub(" ", query.replace(operator, " ", 1)).strip()
+
+    return query, sites
+
+
+def canonicalize(
+    query: str,
+    insite: Optional[str] = None,
+    lift_sites: bool = True
+) -> CanonicalQuery:
+    """
+    规范化查询
+
+    Args:
+        query: 原始查询
+        insite: 站内搜索（逗号分隔）
+        lift_sites: 是否把 site: 操作符提取到 insite（引擎不支持 insite 时传 False）
+
+    Returns:
+        规范化结果；site: 提取后查询为空时保留原查询
+    """
+    canonical = normalize_text(query)
+    sites = [s for s in (insite or "").split(",")]
+
+    if lift_sites:
+        lifted, lifted_sites = _lift_sites(canonical)
+        if lifted:
+            canonical = lifted
+            sites.extend(lifted_sites)
+
+    canonical_insite = normalize_sites(sites)
+    changed = canonical != query or canonical_insite != (insite or None)
+    return CanonicalQuery(canonical, canonical_insite, changed)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+客户端限流（令牌桶）
+
+多个 Agent 进程共用一个 Brave / Anspire Key 时，不在客户端控制请求速率
+就会超出服务商配额，引发成片的 429。RateLimiter 按 API Key 维护一个令牌桶，
+每次 HTTP 请求（含重试）前取一个令牌，令牌不足时等待：
+- TokenBucket：进程内，线程安全
+- SQLiteTokenBucket：桶状态存放在共享的 SQLite 文件中，同一主机上的
+  进程共用预算（BEGIN IMMEDIATE 串行化读改写，时间使用墙上时钟）
+
+自动校准：Brave 响应带 X-RateLimit-Limit / Remaining / Reset（及
+X-RateLimit-Policy）头，RateLimiter.update() 据此设置速率与突发上限，
+令牌数不超过服务端报告的剩余次数，窗口耗尽时暂停到重置时间。
+未配置速率（rate=None）的桶在校准前不限速。
+
+桶按 (引擎, API Key 摘要, 存储文件) 在进程内共享，数据库中只保存 Key 的摘要。
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from retry_policy import parse_rate_limit
+
+
+# 令牌不足时默认最长等待（秒），超过则抛出 RateLimitExceeded
+DEFAULT_MAX_WAIT = 30.0
+
+# 缺少 X-RateLimit-Policy 时，各限流窗口的长度（秒）；Brave 依次为每秒、每月
+DEFAULT_WINDOWS = (1, 30 * 24 * 3600)
+
+
+class RateLimitExceeded(requests.RequestException):
+    """令牌需要等待的时间超过允许的最长等待"""
+
+    def __init__(self, wait: float, max_wait: float):
+        self.wait = wait
+        self.max_wait = max_wait
+        super().__init__(f"客户端限流：需等待 {wait:.2f}s，超过上限 {max_wait:.2f}s")
+
+
+class BucketState:
+    """令牌桶状态与取令牌 / 校准规则（TokenBucket 与 SQLiteTokenBucket 共用）"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "blocked_until")
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[float],
+        tokens: Optional[float] = None,
+        updated: float = 0.0,
+        blocked_until: float = 0.0
+    ):
+        self.rate = rate  # 每秒令牌数，None 表示不限速
+        self.burst = burst if burst is not None else (max(1.0, rate) if rate else None)
+        self.tokens = tokens if tokens is not None else (self.burst or 0.0)
+        self.updated = updated
+        self.blocked_until = blocked_until  # 服务端窗口耗尽时，暂停到此时间
+
+    def refill(self, now: float) -> None:
+        if self.rate and now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = max(self.updated, now)
+
+    def take(self, now: float, max_wait: Optional[float]) -> Tuple[float, bool]:
+        """
+        取一个令牌
+
+        Returns:
+            (需要等待的秒数, 是否已取走)；等待超过 max_wait 时不取走
+        """
+        self.refill(now)
+        blocked = max(0.0, self.blocked_until - now)
+        if not self.rate:
+            wait = blocked
+        else:
+            # 令牌可以透支：排在前面的调用方先取，后来者等待更久
+            wait = max(blocked, (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0)
+        if max_wait is not None and wait > max_wait:
+            return wait, False
+        if self.rate:
+            self.tokens -= 1
+        return wait, True
+
+    def calibrate(self, now: float, windows: List[Tuple[Optional[int], int, float, float]]) -> None:
+        """
+        按服务端限流头校准
+
+        Args:
+            windows: 每个限流窗口 (上限, 剩余次数, 距重置秒数, 窗口长度秒)
+        """
+        self.refill(now)
+        limited = [window for window in windows if window[0]]
+        if limited:
+            limit, remaining, _, seconds = min(limited, key=lambda window: window[3])
+            if not self.rate:
+                # 此前不限速，桶从满开始
+                self.tokens = float(limit)
+            self.rate = limit / seconds
+            self.burst = float(limit)
+            # 其他进程 / 主机也在消耗同一配额，以服务端报告的剩余次数为准
+            self.tokens = min(self.tokens, self.burst, float(remaining))
+        for _, remaining, reset, _ in windows:
+            if remaining <= 0:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        self.refill(now)
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 3) if self.rate else None,
+            "blocked_for": round(max(0.0, self.blocked_until - now), 3)
+        }
+
+
+class TokenBucket:
+    """进程内令牌桶"""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None, clock=time.monotonic):
+        """
+        Args:
+            rate: 每秒令牌数，None 表示校准前不限速
+            burst: 桶容量（允许的突发请求数），默认 max(1, rate)
+            clock: 时钟
+        """
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = BucketState(rate, burst, updated=clock())
+
+    def take(self, max_wait: Optional[float] = None) -> Tuple[float, bool]:
+        with self._lock:
+            return self._state.take(self.clock(), max_wait)
+
+    def calibrate(self, windows) -> None:
+        with self._lock:
+            self._state.calibrate(self.clock(), windows)
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._state.as_dict(self.clock())
+
+
+class SQLiteTokenBucket:
+    """存放在 SQLite 文件中的令牌桶，同一主机上的进程共享"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS token_buckets (
+            key TEXT PRIMARY KEY,
+            rate REAL,
+            burst REAL,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL,
+            blocked_until REAL NOT NULL DEFAULT 0
+        );
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        key: str,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        clock=time.time
+    ):
+        """
+        Args:
+            path: SQLite 文件路径（各进程使用同一路径）
+            key: 桶的键（如 brave:<Key 摘要>）
+            rate / burst: 桶不存在时的初始配置，之后以文件中的状态为准
+            clock: 墙上时钟（各进程一致）
+        """
+        self.path = Path(path)
+        self.key = key
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 读改写由 BEGIN IMMEDIATE 包住，使用自动提交模式手动管理事务
+        self._conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+        initial = BucketState(rate, burst, updated=self.clock())
+        self._conn.execute(
+            "INSERT OR IGNORE INTO token_buckets (key, rate, burst, tokens, updated, blocked_until) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, initial.rate, initial.burst, initial.tokens, initial.updated, initial.blocked_until)
+        )
+
+    def _update(self, fn):
+        """在写事务中读出状态、调用 fn(state, now)、写回，返回 fn 的返回值"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT rate, burst, tokens, updated, blocked_until FROM token_buckets WHERE key = ?",
+                    (self.key,)
+                ).fetchone()
+                state = BucketState(*row)
+                result = fn(state, self.clock())
+                self._conn.execute(
+                    "UPDATE token_buckets SET rate = ?, burst = ?, tokens = ?, updated = ?, blocked_until = ? "
+                    "WHERE key = ?",
+                    (state.rate, state.burst, state.tokens, state.updated, state.blocked_until, self.key)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def take(self, max_wait: Optional[float] = None) -> Tuple[float, bool]:
+        return self._update(lambda state, now: state.take(now, max_wait))
+
+    def calibrate(self, windows) -> None:
+        self._update(lambda state, now: state.calibrate(now, windows))
+
+    def state(self) -> Dict[str, Any]:
+        return self._update(lambda state, now: state.as_dict(now))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimiter:
+    """一个 API Key 的客户端限流器"""
+
+    def __init__(self, bucket: Union[TokenBucket, SQLiteTokenBucket], max_wait: float = DEFAULT_MAX_WAIT):
+        """
+        Args:
+            bucket: 令牌桶
+            max_wait: 未设截止时间时允许的最长等待（秒）
+        """
+        self.bucket = bucket
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "rejected": 0, "calibrations": 0}
+
+    def reserve(self, deadline=None, stage: str = "ratelimit") -> float:
+        """
+        取一个令牌，返回需要等待的秒数（调用方负责等待）
+
+        Raises:
+            DeadlineExceeded: 等待会超过截止时间
+            RateLimitExceeded: 未设截止时间且等待超过 max_wait
+        """
+        if deadline is not None and deadline.expires_at is not None:
+            max_wait = min(self.max_wait, deadline.remaining())
+        else:
+            max_wait = self.max_wait
+
+        wait, taken = self.bucket.take(max_wait)
+        with self._lock:
+            if not taken:
+                self._stats["rejected"] += 1
+            else:
+                self._stats["acquired"] += 1
+                if wait > 0:
+                    self._stats["waited"] += 1
+                    self._stats["wait_seconds"] += wait
+
+        if not taken:
+            if deadline is not None and deadline.expires_at is not None and wait > deadline.remaining():
+                raise deadline.exceeded("ratelimit")
+            raise RateLimitExceeded(wait, max_wait)
+        if wait > 0 and deadline is not None:
+            deadline.record(stage, wait)
+        return wait
+
+    def acquire(self, deadline=None, stage: str = "ratelimit") -> None:
+        """取一个令牌，不足时阻塞等待"""
+        wait = self.reserve(deadline, stage)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, deadline=None, stage: str = "ratelimit") -> None:
+        """acquire 的协程版本"""
+        wait = self.reserve(deadline, stage)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update(self, headers) -> bool:
+        """按响应的 X-RateLimit-* 头校准；没有限流头时返回 False"""
+        windows = rate_limit_windows(headers)
+        if not windows:
+            return False
+        self.bucket.calibrate(windows)
+        with self._lock:
+            self._stats["calibrations"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """令牌桶当前状态与取令牌 / 等待 / 拒绝 / 校准次数"""
+        with self._lock:
+            stats = dict(self._stats, wait_seconds=round(self._stats["wait_seconds"], 3))
+        stats["bucket"] = self.bucket.state()
+        return stats
+
+
+def rate_limit_windows(headers) -> List[Tuple[Optional[int], int, float, float]]:
+    """
+    X-RateLimit-* 头 → [(上限, 剩余次数, 距重置秒数, 窗口长度秒)]
+
+    窗口长度取自 X-RateLimit-Policy（如 "1;w=1, 15000;w=2592000"），
+    缺少时按 DEFAULT_WINDOWS 的顺序假定。
+    """
+    if not headers:
+        return []
+    windows = parse_rate_limit(headers)
+    if not windows:
+        return []
+
+    seconds = list(DEFAULT_WINDOWS)
+    policy = headers.get("X-RateLimit-Policy")
+    if policy:
+        parsed = []
+        for item in policy.split(","):
+            window = [part.split("=", 1)[1] for part in item.split(";") if part.strip().startswith("w=")]
+            try:
+                parsed.append(float(window[0]) if window else None)
+            except ValueError:
+                parsed.append(None)
+        if len(parsed) == len(windows) and None not in parsed:
+            seconds = parsed
+
+    return [
+        (limit, remaining, float(reset), seconds[i] if i < len(seconds) else seconds[-1])
+        for i, (limit, remaining, reset) in enumerate(windows)
+    ]
+
+
+_limiters: Dict[Tuple[str, str, Optional[str]], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    engine: str,
+    api_key: str,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None,
+    path: Union[None, str, Path] = None,
+    max_wait: float = DEFAULT_MAX_WAIT
+) -> RateLimiter:
+    """
+    获取某个引擎 / API Key 的限流器（进程内共享，首次创建时的配置生效）
+
+    Args:
+        engine: 引擎名（anspire / brave）
+        api_key: API Key（只使用其摘要）
+        rate: 每秒请求数，None 表示按响应头校准前不限速
+        burst: 允许的突发请求数，默认 max(1, rate)
+        path: SQLite 文件路径，设置后同一主机上的进程共享预算
+        max_wait: 未设截止时间时允许的最长等待（秒）
+    """
+    key = f"{engine}:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}"
+    registry_key = (engine, key, str(path) if path is not None else None)
+    with _limiters_lock:
+        limiter = _limiters.get(registry_key)
+        if limiter is None:
+            if path is not None:
+                bucket = SQLiteTokenBucket(path, key, rate, burst)
+            else:
+                bucket = TokenBucket(rate, burst)
+            limiter = _limiters[registry_key] = RateLimiter(bucket, max_wait)
+        return limiter
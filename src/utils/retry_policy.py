@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+HTTP 请求重试策略
+
+Anspire / Brave 偶发的 429、5xx 与连接错误通常重试一次就能成功。
+RetryPolicy 对可重试的错误按“封顶指数退避 + 全抖动”等待后重试：
+第 n 次重试前等待 uniform(0, min(max_delay, base_delay * 2^n)) 秒，
+多个客户端同时失败时不会在同一时刻一起重试。
+
+服务端给出等待时间时以其为下限：
+- Retry-After（秒数或 HTTP 日期）
+- Brave 的 X-RateLimit-Remaining / X-RateLimit-Reset（逗号分隔，每个
+  限流窗口一项，如 "0, 14000" / "1, 1419704"）：取已耗尽窗口的重置时间
+
+不会重试的情况：要求的等待超过 max_retry_after（例如月度配额耗尽）、
+等待后已没有剩余截止时间、DeadlineExceeded 与读取超时（上游慢，重试
+只会占满预算）、其他 4xx。放弃时抛出最后一次的异常，异常的 retries
+属性为已重试次数。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+
+# 默认重试的 HTTP 状态码
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """封顶指数退避 + 全抖动的重试策略（线程安全，可在客户端间共享）"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        max_retry_after: float = 30.0,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+        rng: Optional[random.Random] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        初始化策略
+
+        Args:
+            max_attempts: 最多尝试次数（含第一次），1 表示不重试
+            base_delay: 第一次重试的退避上限（秒），之后每次翻倍
+            max_delay: 退避上限的封顶值（秒）
+            max_retry_after: 服务端要求的等待超过此值（秒）时不再重试
+            retry_statuses: 重试的 HTTP 状态码
+            rng: 抖动使用的随机数生成器
+            sleep: 同步重试的等待函数
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts 必须大于等于 1")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = tuple(retry_statuses)
+        self.rng = rng or random.Random()
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "retries": 0,
+            "recovered": 0,  # 重试后成功的调用数
+            "exhausted": 0,  # 重试后仍失败的调用数
+            "server_delays": 0,  # 按服务端要求的时间等待的次数
+            "reasons": {}  # 重试原因（状态码 / connection）→ 次数
+        }
+
+    @classmethod
+    def disabled(cls) -> "RetryPolicy":
+        """不重试的策略"""
+        return cls(max_attempts=1)
+
+    def call(self, fn: Callable[[], Any], deadline=None, stage: str = "retry") -> Any:
+        """
+        执行 fn，可重试的错误按策略等待后重试
+
+        Args:
+            fn: 发出一次请求的函数
+            deadline: 截止时间（Deadline），等待后没有剩余预算时不再重试
+            stage: 每次等待记入 deadline.stages 的阶段名
+
+        Raises:
+            最后一次的异常（retries 属性为已重试次数）
+        """
+        retries = 0
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._next_delay(e, retries, deadline)
+                if delay is None:
+                    self._finish(retries, e)
+                    raise
+                self._wait(delay, retries, deadline, stage, e)
+                self.sleep(delay)
+                retries += 1
+                continue
+            self._finish(retries)
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], deadline=None, stage: str = "retry") -> Any:
+        """call 的协程版本（fn 返回协程，等待使用 asyncio.sleep）"""
+        retries = 0
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._next_delay(e, retries, deadline)
+                if delay is None:
+                    self._finish(retries, e)
+                    raise
+                self._wait(delay, retries, deadline, stage, e)
+                await asyncio.sleep(delay)
+                retries += 1
+                continue
+            self._finish(retries)
+            return result
+
+    def backoff(self, retries: int) -> float:
+        """第 retries + 1 次重试的全抖动退避时间"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** retries))
+        return self.rng.uniform(0, ceiling)
+
+    def retry_reason(self, error: BaseException) -> Optional[str]:
+        """可重试时返回原因（状态码或 connection），否则返回 None"""
+        if isinstance(error, requests.HTTPError):
+            status = error.response.status_code if error.response is not None else None
+            return str(status) if status in self.retry_statuses else None
+        # ConnectTimeout 同时是 ConnectionError：请求尚未发出，可以重试；
+        # ReadTimeout 与 DeadlineExceeded 是 Timeout 而不是 ConnectionError
+        if isinstance(error, requests.ConnectionError):
+            return "connection"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """调用数、重试数、重试后成功 / 失败数、按原因的重试次数"""
+        with self._lock:
+            return dict(self._stats, reasons=dict(self._stats["reasons"]))
+
+    def _next_delay(self, error: BaseException, retries: int, deadline) -> Optional[float]:
+        """下一次重试前的等待时间；不再重试时返回 None"""
+        if retries + 1 >= self.max_attempts or self.retry_reason(error) is None:
+            return None
+
+        delay = self.backoff(retries)
+        response = getattr(error, "response", None)
+        server_delay = server_wait(response.headers) if response is not None else None
+        if server_delay is not None:
+            if server_delay > self.max_retry_after:
+                return None
+            delay = max(delay, server_delay)
+
+        # 等待后至少要留下与等待时间相当的预算给请求本身
+        if deadline is not None and deadline.remaining() <= delay * 2:
+            return None
+        return delay
+
+    def _wait(self, delay: float, retries: int, deadline, stage: str, error: BaseException) -> None:
+        reason = self.retry_reason(error)
+        response = getattr(error, "response", None)
+        with self._lock:
+            self._stats["retries"] += 1
+            self._stats["reasons"][reason] = self._stats["reasons"].get(reason, 0) + 1
+            if response is not None and server_wait(response.headers) is not None:
+                self._stats["server_delays"] += 1
+        if deadline is not None:
+            deadline.record(stage, delay)
+
+    def _finish(self, retries: int, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._stats["calls"] += 1
+            if retries and error is None:
+                self._stats["recovered"] += 1
+            elif retries:
+                self._stats["exhausted"] += 1
+        if error is not None:
+            error.retries = retries
+
+
+def server_wait(headers) -> Optional[float]:
+    """
+    服务端要求的等待时间（秒）
+
+    优先 Retry-After；否则取 Brave 限流头中已耗尽窗口的最长重置时间。
+    没有相关响应头时返回 None。
+    """
+    if not headers:
+        return None
+
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        retry_after = retry_after.strip()
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    exhausted = [reset for _, remaining, reset in parse_rate_limit(headers) if remaining == 0]
+    return float(max(exhausted)) if exhausted else None
+
+
+def parse_rate_limit(headers) -> List[Tuple[Optional[int], int, int]]:
+    """
+    解析 X-RateLimit-Limit / Remaining / Reset
+
+    Returns:
+        每个限流窗口一项 (上限, 剩余次数, 距重置秒数)；缺少或无法解析时为空列表
+    """
+    def values(name: str) -> List[int]:
+        raw = headers.get(name)
+        if not raw:
+            return []
+        try:
+            return [int(float(part)) for part in raw.split(",")]
+        except ValueError:
+            return []
+
+    remaining = values("X-RateLimit-Remaining")
+    reset = values("X-RateLimit-Reset")
+    if not remaining or len(remaining) != len(reset):
+        return []
+    limit = values("X-RateLimit-Limit")
+    if len(limit) != len(remaining):
+        limit = [None] * len(remaining)
+    return list(zip(limit, remaining, reset))
@@ -7,11 +7,187 @@
 
 import os
 import json
+import random
 import hashlib
+import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable
+
+from admission import ADMISSION_POLICIES, TinyLFU
+from bloom_filter import CountingBloomFilter
+from cache_backends import CacheEntry, ENTRY_KINDS, create_backend
+from cache_codecs import DEFAULT_CODEC, RawResult, available_codecs
+from query_canonical import canonicalize
+from ttl_policy import TTLPolicy
+
+
+@dataclass
+class CacheLookup:
+    """缓存查询结果"""
+    result: Dict[str, Any]
+    stale: bool  # 是否已过期（处于 stale-while-revalidate 宽限期内）
+    expires_at: float  # 过期时间（epoch 秒）
+    top_k: int = 0  # 条目实际保存的 top_k（可能大于请求值）
+    kind: str = "ok"  # 条目类型：ok 或负缓存类型 empty / error / http_error
+    refresh_due: bool = False  # 热门条目临近过期，应提前后台刷新（refresh-ahead）
+
+    @property
+    def negative(self) -> bool:
+        return self.kind != "ok"
+
+
+# 负缓存默认有效期（秒）：远短于正常结果，只用于挡住短时间内的重复失败请求
+NEGATIVE_TTL_SECONDS = {
+    "empty": 600,  # 结果为空
+    "error": 120,  # 接口返回错误信息（如 detail 字段）
+    "http_error": 60,  # HTTP 4xx/5xx
+}
+
+# 失败类负缓存：与正常结果（ok / empty）分开存放，不会覆盖仍可返回的
+# 陈旧条目或更大 top_k 的条目，只在正常结果不可用时参与查询
+FAILURE_KINDS = ("error", "http_error")
+
+
+class BackgroundRefresher:
+    """
+    后台刷新调度器
+
+    同一缓存键同时最多只有一个刷新任务，在守护线程中执行。
+    """
+
+    def __init__(self):
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self.scheduled = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    def schedule(self, key: str, refresh: Callable[[], Any]) -> bool:
+        """
+        调度一次刷新
+
+        Args:
+            key: 缓存键
+            refresh: 刷新函数（负责请求上游并写回缓存）
+
+        Returns:
+            是否新调度了任务（已有同键任务在执行时返回 False）
+        """
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+            self.scheduled += 1
+
+        thread = threading.Thread(target=self._run, args=(key, refresh), daemon=True)
+        thread.start()
+        return True
+
+    def _run(self, key: str, refresh: Callable[[], Any]) -> None:
+        try:
+            refresh()
+            succeeded = True
+        except Exception:
+            # 刷新失败时保留旧条目，下次读取再重试
+            succeeded = False
+
+        with self._lock:
+            self._inflight.discard(key)
+            if succeeded:
+                self.refreshed += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "scheduled": self.scheduled,
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "inflight": len(self._inflight)
+            }
+
+
+class MemoryLRU:
+    """
+    进程内 LRU 内存层
+
+    按条目数和字节数双重限制，超出时淘汰最久未使用的条目。
+    缓存结果以只读对象共享，命中时返回顶层浅拷贝。
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        """
+        初始化内存层
+
+        Args:
+            max_entries: 最大条目数（0 表示禁用）
+            max_bytes: 最大占用字节数（按 JSON 编码长度估算）
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, stale_seconds: float = 0) -> Optional[CacheEntry]:
+        """读取条目，超出陈旧宽限期的条目顺带移除"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at + stale_seconds <= time.time():
+                del self._entries[key]
+                self.size_bytes -= entry.size
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """写入条目并按 LRU 淘汰"""
+        if not self.enabled or entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= old.size
+
+            self._entries[key] = entry
+            self.size_bytes += entry.size
+
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= evicted.size
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size_bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def clear_expired(self) -> None:
+        now = time.time()
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry.expires_at <= now]:
+                self.size_bytes -= self._entries.pop(key).size
 
 
 class SearchCache:
@@ -20,7 +196,27 @@ class SearchCache:
     def __init__(
         self,
         cache_dir: str = "/workspace/.workspace/cache/search",
-        ttl_hours: int = 24
+        ttl_hours: int = 24,
+        backend: Optional[str] = None,
+        memory_max_entries: int = 256,
+        memory_max_bytes: int = 16 * 1024 * 1024,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        eviction_policy: str = "lru",
+        stale_seconds: float = 0,
+        canonicalize_queries: bool = True,
+        negative_ttl_seconds: Optional[Dict[str, float]] = None,
+        codec: Optional[str] = None,
+        bloom_filter: bool = False,
+        bloom_capacity: int = 100_000,
+        bloom_error_rate: float = 0.01,
+        admission_policy: str = "always",
+        admission_sample_size: int = 10_000,
+        ttl_jitter: float = 0.1,
+        refresh_ahead: float = 0,
+        refresh_ahead_min_frequency: int = 3,
+        intent_ttl: bool = False,
+        ttl_policy: Optional[Dict[str, float]] = None
     ):
         """
         初始化缓存
@@ -28,28 +224,128 @@ class SearchCache:
         Args:
             cache_dir: 缓存目录
             ttl_hours: 缓存有效期（小时）
+            backend: 存储后端（file / sqlite），不传则读取环境变量
+                     SEARCH_CACHE_BACKEND，默认 file
+            memory_max_entries: 内存层最大条目数（0 表示禁用内存层）
+            memory_max_bytes: 内存层最大字节数
+            max_bytes: 持久层最大字节数（None 表示不限制）
+            max_entries: 持久层最大条目数（None 表示不限制）
+            eviction_policy: 持久层超限时的淘汰策略（lru / lfu）
+            stale_seconds: 默认的 stale-while-revalidate 宽限期（秒），
+                           过期后在此时间内仍可由 lookup() 返回陈旧结果
+            canonicalize_queries: 生成缓存键前是否规范化查询与站点
+                                  （大小写、空白、全角半角、site: 语法）
+            negative_ttl_seconds: 各类负缓存的有效期（秒），覆盖
+                                  NEGATIVE_TTL_SECONDS 中的默认值，设为 0 表示不缓存该类
+            codec: 持久层条目编码（json / zlib / lzma / orjson），不传则读取
+                   环境变量 SEARCH_CACHE_CODEC，默认 json；已有条目按各自记录的编码读取
+            bloom_filter: 是否用布隆过滤器记录持久层中的键，一定不存在的键
+                          不访问持久层；构建时遍历持久层的全部键，且其他进程写入的
+                          条目在重建前不可见，只适合单进程独占的大缓存，默认关闭
+            bloom_capacity: 过滤器初始容量（键数），超出后加倍重建
+            bloom_error_rate: 容量内的目标假阳性率
+            admission_policy: 持久层准入策略（always / tinylfu），仅在设置了容量上限时
+                              生效；set() 可按调用（引擎）覆盖
+            admission_sample_size: TinyLFU 的老化周期（访问次数），每记录这么多次访问频率减半
+            ttl_jitter: 有效期随机缩短的最大比例，打散同一批写入条目的过期时间
+                        （0.1 表示实际有效期在 TTL 的 90%~100% 之间）
+            refresh_ahead: 提前刷新窗口，占 TTL 的比例；剩余有效期不足该比例的
+                           热门条目命中时标记 refresh_due，0 表示关闭
+            refresh_ahead_min_frequency: 视为热门的最低近期访问频率（TinyLFU 估计值）
+            intent_ttl: 是否按查询意图计算正常结果的有效期（见 ttl_policy.TTLPolicy），
+                        启用后 stats() 给出各意图的命中率
+            ttl_policy: 覆盖 INTENT_TTL_HOURS 的有效期表（小时），如
+                        {"news": 0.5, "technical": 72}；传入即启用 intent_ttl
         """
         self.cache_dir = Path(cache_dir)
         self.ttl_hours = ttl_hours
+        self.stale_seconds = stale_seconds
+        self.canonicalize_queries = canonicalize_queries
+        self.negative_ttl_seconds = dict(NEGATIVE_TTL_SECONDS, **(negative_ttl_seconds or {}))
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+        if not 0 <= ttl_jitter < 1:
+            raise ValueError(f"ttl_jitter 必须在 [0, 1) 之间: {ttl_jitter}")
+        self.ttl_jitter = ttl_jitter
+        self.refresh_ahead = refresh_ahead
+        self.refresh_ahead_min_frequency = refresh_ahead_min_frequency
+
+        self.ttl_policy: Optional[TTLPolicy] = None
+        if intent_ttl or ttl_policy is not None:
+            self.ttl_policy = TTLPolicy(ttl_hours, ttl_policy)
+
+        if admission_policy not in ADMISSION_POLICIES:
+            raise ValueError(f"不支持的准入策略: {admission_policy}（可选: {', '.join(ADMISSION_POLICIES)}）")
+        self.admission_policy = admission_policy
+        self.admission = TinyLFU(admission_sample_size)
+
+        backend = backend or os.environ.get("SEARCH_CACHE_BACKEND", "file")
+        self.backend = create_backend(
+            backend,
+            self.cache_dir,
+            ttl_hours,
+            max_bytes=max_bytes,
+            max_entries=max_entries,
+            eviction_policy=eviction_policy,
+            codec=codec or os.environ.get("SEARCH_CACHE_CODEC", DEFAULT_CODEC)
+        )
+        self.memory = MemoryLRU(memory_max_entries, memory_max_bytes)
+        self.refresher = BackgroundRefresher()
+
+        self.bloom: Optional[CountingBloomFilter] = None
+        self.bloom_error_rate = bloom_error_rate
+        self._bloom_lock = threading.Lock()
+        if bloom_filter:
+            self._rebuild_bloom(bloom_capacity)
+
+        # 分层命中统计
+        self._counters = {
+            "memory_hits": 0,
+            "memory_misses": 0,
+            "disk_hits": 0,
+            "disk_misses": 0,
+            "evictions": 0,
+            "served_stale": 0,
+            "subsumed_hits": 0,
+            "canonicalized": 0,
+            "canonical_hits": 0,
+            "refresh_ahead": 0,
+            "bloom_skipped": 0,
+            "bloom_false_positives": 0,
+        }
+        for kind in ENTRY_KINDS[1:]:
+            self._counters[f"negative_hits_{kind}"] = 0
+        self._intent_counters: Dict[str, Dict[str, int]] = {}
+        self._engine_counters: Dict[str, Dict[str, int]] = {}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self._counters[name] += 1
+
     def _get_cache_key(
         self,
         query: str,
-        top_k: int,
         insite: Optional[str] = None,
         from_time: Optional[str] = None,
-        to_time: Optional[str] = None
+        to_time: Optional[str] = None,
+        namespace: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         生成缓存键
 
+        top_k 不参与哈希：同一查询只保留一个条目，条目内记录实际保存的
+        top_k，较小的 top_k 请求通过截取较大条目的结果命中。
+        旧版的键（含 top_k、不含命名空间）写入的条目与之不兼容，升级后失效，
+        由文件后端在启动时删除（见 FileCacheBackend）。
+
         Args:
             query: 搜索查询
-            top_k: 返回数量
             insite: 站内搜索
             from_time: 起始时间
             to_time: 结束时间
+            namespace: 键命名空间（引擎名及影响结果的引擎参数），
+                       不同引擎的相同查询互不命中
 
         Returns:
             缓存键（MD5 哈希）
@@ -57,23 +353,236 @@ class SearchCache:
         # 构建唯一标识
         params = {
             "query": query,
-            "top_k": top_k,
             "insite": insite,
             "from_time": from_time,
             "to_time": to_time
         }
+        if namespace:
+            params["namespace"] = namespace
 
         # JSON 序列化后哈希
         param_str = json.dumps(params, sort_keys=True)
         return hashlib.md5(param_str.encode()).hexdigest()
 
+    def _rebuild_bloom(self, capacity: int) -> None:
+        """由持久层的键重建布隆过滤器"""
+        keys = list(self.backend.keys())
+        while len(keys) > capacity:
+            capacity *= 2
+        bloom = CountingBloomFilter(capacity, self.bloom_error_rate)
+        bloom.update(keys)
+        self.bloom = bloom
+
+    def _bloom_add(self, key: str) -> None:
+        with self._bloom_lock:
+            self.bloom.add(key)
+            if len(self.bloom) > self.bloom.capacity:
+                # 超出容量后假阳性率快速上升，加倍重建
+                self._rebuild_bloom(self.bloom.capacity * 2)
+
+    def _canonical(self, query: str, insite: Optional[str]):
+        """规范化查询与站点，返回 (query, insite, 是否发生变化)"""
+        if not self.canonicalize_queries:
+            return query, insite, False
+        canonical = canonicalize(query, insite)
+        return canonical.query, canonical.insite, canonical.changed
+
+    def lookup(
+        self,
+        query: str,
+        top_k: int = 10,
+        insite: Optional[str] = None,
+        from_time: Optional[str] = None,
+        to_time: Optional[str] = None,
+        stale_seconds: Optional[float] = None,
+        allow_negative: bool = True,
+        namespace: Optional[Dict[str, Any]] = None
+    ) -> Optional[CacheLookup]:
+        """
+        查询缓存（支持 stale-while-revalidate 与负缓存）
+
+        Args:
+            query: 搜索查询
+            top_k: 返回数量
+            insite: 站内搜索
+            from_time: 起始时间
+            to_time: 结束时间
+            stale_seconds: 陈旧宽限期（秒），不传则使用实例默认值
+            allow_negative: 是否接受负缓存条目（空结果 / 错误），False 时视为未命中
+            namespace: 键命名空间，其中的 engine 用于分引擎统计
+
+        Returns:
+            CacheLookup，不存在、超出宽限期或条目 top_k 不足时返回 None
+        """
+        if stale_seconds is None:
+            stale_seconds = self.stale_seconds
+
+        query, insite, changed = self._canonical(query, insite)
+        if changed:
+            self._count("canonicalized")
+        cache_key = self._get_cache_key(query, insite, from_time, to_time, namespace)
+        self.admission.record(cache_key)
+
+        intent = self.ttl_policy.intent(query) if self.ttl_policy else None
+        ttl_seconds = self._ttl_seconds(intent, from_time)
+        cached = self._find(cache_key, top_k, stale_seconds, allow_negative, changed, ttl_seconds)
+        if intent is not None:
+            self._count_intent(intent, hit=cached is not None)
+        self._count_engine((namespace or {}).get("engine", "default"), hit=cached is not None)
+        return cached
+
+    def _find(
+        self,
+        cache_key: str,
+        top_k: int,
+        stale_seconds: float,
+        allow_negative: bool,
+        canonicalized: bool,
+        ttl_seconds: float
+    ) -> Optional[CacheLookup]:
+        """依次查询内存层与持久层；正常结果不可用时再查失败条目"""
+        cached = self._find_result(cache_key, top_k, stale_seconds, allow_negative, canonicalized, ttl_seconds)
+        if cached is None and allow_negative:
+            cached = self._find_failure(cache_key, top_k, canonicalized, ttl_seconds)
+        return cached
+
+    def _find_result(
+        self,
+        cache_key: str,
+        top_k: int,
+        stale_seconds: float,
+        allow_negative: bool,
+        canonicalized: bool,
+        ttl_seconds: float
+    ) -> Optional[CacheLookup]:
+        """查询正常结果（含空结果）"""
+        if self.memory.enabled:
+            entry = self.memory.get(cache_key, stale_seconds)
+            if self._usable(entry, top_k, allow_negative):
+                self._count("memory_hits")
+                return self._hit(cache_key, entry, top_k, canonicalized, ttl_seconds)
+            self._count("memory_misses")
+
+        if self.bloom is not None and cache_key not in self.bloom:
+            # 一定不存在，跳过持久层
+            self._count("bloom_skipped")
+            self._count("disk_misses")
+            return None
+
+        entry = self.backend.get(cache_key, stale_seconds)
+        if entry is None and self.bloom is not None:
+            self._count("bloom_false_positives")
+        if not self._usable(entry, top_k, allow_negative):
+            self._count("disk_misses")
+            return None
+
+        self._count("disk_hits")
+        self.memory.put(cache_key, entry)
+        return self._hit(cache_key, entry, top_k, canonicalized, ttl_seconds)
+
+    def _find_failure(
+        self,
+        cache_key: str,
+        top_k: int,
+        canonicalized: bool,
+        ttl_seconds: float
+    ) -> Optional[CacheLookup]:
+        """查询失败条目（不计入分层命中统计）"""
+        failure_key = _failure_key(cache_key)
+        entry = self.memory.get(failure_key) if self.memory.enabled else None
+        if entry is None and (self.bloom is None or failure_key in self.bloom):
+            entry = self.backend.get(failure_key)
+            if entry is not None:
+                self.memory.put(failure_key, entry)
+        if not self._usable(entry, top_k, allow_negative=True):
+            return None
+        return self._hit(failure_key, entry, top_k, canonicalized, ttl_seconds)
+
+    def _ttl_seconds(self, intent: Optional[str], from_time: Optional[str]) -> float:
+        """正常结果的有效期：未启用意图策略时为 ttl_hours"""
+        if intent is None:
+            return self.ttl_hours * 3600
+        return self.ttl_policy.ttl_hours(intent, from_time) * 3600
+
+    def _count_intent(self, intent: str, hit: bool) -> None:
+        with self._counters_lock:
+            counts = self._intent_counters.setdefault(intent, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def _count_engine(self, engine: str, hit: bool) -> None:
+        with self._counters_lock:
+            counts = self._engine_counters.setdefault(engine, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def engine_stats(self) -> Dict[str, Dict[str, Any]]:
+        """分引擎的查询命中统计（按 namespace 中的 engine，未指定的记为 default）"""
+        with self._counters_lock:
+            engine_counters = {engine: dict(counts) for engine, counts in self._engine_counters.items()}
+
+        for counts in engine_counters.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return engine_counters
+
+    @staticmethod
+    def _usable(entry: Optional[CacheEntry], top_k: int, allow_negative: bool) -> bool:
+        if entry is None or entry.top_k < top_k:
+            return False
+        if entry.kind != "ok":
+            # 负缓存不参与 stale-while-revalidate，过期即失效
+            return allow_negative and entry.expires_at > time.time()
+        return True
+
+    def _hit(
+        self,
+        cache_key: str,
+        entry: CacheEntry,
+        top_k: int,
+        canonicalized: bool,
+        ttl_seconds: float
+    ) -> CacheLookup:
+        if canonicalized:
+            self._count("canonical_hits")
+        if entry.kind != "ok":
+            self._count(f"negative_hits_{entry.kind}")
+
+        stale = entry.expires_at <= time.time()
+        if stale:
+            self._count("served_stale")
+
+        # 原始响应只读，直接返回，调用方访问时才解析
+        result = entry.result if isinstance(entry.result, RawResult) else dict(entry.result)
+        if entry.top_k > top_k:
+            # 由更大的 top_k 条目截取；原始响应返回截取视图，同样不在此解析
+            self._count("subsumed_hits")
+            if isinstance(result, RawResult):
+                result = result.limited(top_k)
+            elif isinstance(result.get("results"), list):
+                result["results"] = result["results"][:top_k]
+
+        refresh_due = not stale and self._refresh_due(cache_key, entry, ttl_seconds)
+        if refresh_due:
+            self._count("refresh_ahead")
+
+        return CacheLookup(result, stale, entry.expires_at, entry.top_k, entry.kind, refresh_due)
+
+    def _refresh_due(self, cache_key: str, entry: CacheEntry, ttl_seconds: float) -> bool:
+        """热门的正常条目进入 TTL 末尾的 refresh_ahead 窗口时需要提前刷新"""
+        if not self.refresh_ahead or entry.kind != "ok":
+            return False
+        remaining = entry.expires_at - time.time()
+        if remaining > self.refresh_ahead * ttl_seconds:
+            return False
+        return self.admission.frequency(cache_key) >= self.refresh_ahead_min_frequency
+
     def get(
         self,
         query: str,
         top_k: int = 10,
         insite: Optional[str] = None,
         from_time: Optional[str] = None,
-        to_time: Optional[str] = None
+        to_time: Optional[str] = None,
+        namespace: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         获取缓存结果
@@ -84,31 +593,45 @@ class SearchCache:
             insite: 站内搜索
             from_time: 起始时间
             to_time: 结束时间
+            namespace: 键命名空间
 
         Returns:
-            缓存结果，如果不存在或已过期则返回 None
+            缓存结果，如果不存在、已过期或为负缓存则返回 None
         """
-        cache_key = self._get_cache_key(query, top_k, insite, from_time, to_time)
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        cached = self.lookup(
+            query, top_k, insite, from_time, to_time,
+            stale_seconds=0, allow_negative=False, namespace=namespace
+        )
+        return cached.result if cached else None
 
-        if not cache_file.exists():
-            return None
-
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
+    def refresh_in_background(
+        self,
+        refresh: Callable[[], Any],
+        query: str,
+        top_k: int = 10,
+        insite: Optional[str] = None,
+        from_time: Optional[str] = None,
+        to_time: Optional[str] = None,
+        namespace: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        为陈旧或临近过期的条目调度一次后台刷新（同一键同时只有一个刷新任务）
 
-            # 检查是否过期
-            cached_at = datetime.fromisoformat(cache_data["cached_at"])
-            if datetime.now() - cached_at > timedelta(hours=self.ttl_hours):
-                cache_file.unlink()  # 删除过期缓存
-                return None
+        Args:
+            refresh: 刷新函数，负责请求上游并调用 set() 写回
+            query: 搜索查询
+            top_k: 返回数量
+            insite: 站内搜索
+            from_time: 起始时间
+            to_time: 结束时间
+            namespace: 键命名空间
 
-            return cache_data["result"]
-        except Exception:
-            # 缓存文件损坏，删除
-            cache_file.unlink(missing_ok=True)
-            return None
+        Returns:
+            是否新调度了刷新任务
+        """
+        query, insite, _ = self._canonical(query, insite)
+        cache_key = self._get_cache_key(query, insite, from_time, to_time, namespace)
+        return self.refresher.schedule(cache_key, refresh)
 
     def set(
         self,
@@ -117,7 +640,10 @@ class SearchCache:
         top_k: int = 10,
         insite: Optional[str] = None,
         from_time: Optional[str] = None,
-        to_time: Optional[str] = None
+        to_time: Optional[str] = None,
+        kind: str = "ok",
+        admission: Optional[str] = None,
+        namespace: Optional[Dict[str, Any]] = None
     ) -> None:
         """
         保存缓存结果
@@ -125,35 +651,88 @@ class SearchCache:
         Args:
             query: 搜索查询
             result: 搜索结果
-            top_k: 返回数量
+            top_k: 结果对应的请求数量（记录在条目中，用于服务更小的 top_k）
             insite: 站内搜索
             from_time: 起始时间
             to_time: 结束时间
+            kind: 条目类型，ok 为正常结果；empty / error / http_error 为负缓存，
+                  使用 negative_ttl_seconds 中对应的短有效期；error / http_error
+                  与正常结果分开存放，不覆盖已有的正常结果
+            admission: 本次写入的准入策略，不传则使用 admission_policy；
+                       未被准入的结果只进入内存层
+            namespace: 键命名空间
         """
-        cache_key = self._get_cache_key(query, top_k, insite, from_time, to_time)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-
-        cache_data = {
-            "query": query,
-            "cached_at": datetime.now().isoformat(),
-            "ttl_hours": self.ttl_hours,
-            "result": result
-        }
-
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        if kind not in ENTRY_KINDS:
+            raise ValueError(f"不支持的缓存条目类型: {kind}（可选: {', '.join(ENTRY_KINDS)}）")
+        admission = admission or self.admission_policy
+        if admission not in ADMISSION_POLICIES:
+            raise ValueError(f"不支持的准入策略: {admission}（可选: {', '.join(ADMISSION_POLICIES)}）")
+
+        query, insite, _ = self._canonical(query, insite)
+        if kind == "ok":
+            intent = self.ttl_policy.intent(query) if self.ttl_policy else None
+            ttl_seconds = self._ttl_seconds(intent, from_time)
+        else:
+            ttl_seconds = self.negative_ttl_seconds.get(kind, 0)
+            if ttl_seconds <= 0:
+                return
+        if self.ttl_jitter:
+            ttl_seconds *= 1 - random.uniform(0, self.ttl_jitter)
+
+        cache_key = self._get_cache_key(query, insite, from_time, to_time, namespace)
+        if kind in FAILURE_KINDS:
+            cache_key = _failure_key(cache_key)
+        if admission == "always" or self._admit(cache_key):
+            self._store(cache_key, query, result, top_k, ttl_seconds, kind)
+
+        if self.memory.enabled:
+            if isinstance(result, RawResult):
+                size = len(result.raw)
+            else:
+                size = len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+            self.memory.put(cache_key, CacheEntry(result, time.time() + ttl_seconds, size, top_k, kind))
+
+    def _admit(self, cache_key: str) -> bool:
+        """TinyLFU 准入：持久层已满且新键不比将被淘汰的键更热时拒绝"""
+        victim = self.backend.next_victim()
+        if victim is None or victim == cache_key or self.backend.contains(cache_key):
+            return True
+        return self.admission.admit(cache_key, victim)
+
+    def _store(
+        self,
+        cache_key: str,
+        query: str,
+        result: Dict[str, Any],
+        top_k: int,
+        ttl_seconds: float,
+        kind: str
+    ) -> None:
+        """写入持久层，同步布隆过滤器与内存层的淘汰"""
+        evicted = self.backend.set(cache_key, query, result, top_k, ttl_seconds, kind)
+        if self.bloom is not None:
+            self._bloom_add(cache_key)
+        for key in evicted:
+            self.memory.discard(key)
+            if self.bloom is not None:
+                with self._bloom_lock:
+                    self.bloom.discard(key)
+        if evicted:
+            with self._counters_lock:
+                self._counters["evictions"] += len(evicted)
 
     def clear(self) -> int:
         """
         清空所有缓存
 
         Returns:
-            删除的缓存文件数量
+            删除的缓存条目数量
         """
-        count = 0
-        for file in self.cache_dir.glob("*.json"):
-            file.unlink()
-            count += 1
+        self.memory.clear()
+        count = self.backend.clear()
+        if self.bloom is not None:
+            with self._bloom_lock:
+                self.bloom.clear()
         return count
 
     def clear_expired(self) -> int:
@@ -161,24 +740,14 @@ class SearchCache:
         清空过期缓存
 
         Returns:
-            删除的缓存文件数量
+            删除的缓存条目数量
         """
-        count = 0
-        now = datetime.now()
-
-        for file in self.cache_dir.glob("*.json"):
-            try:
-                with open(file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
-
-                cached_at = datetime.fromisoformat(cache_data["cached_at"])
-                if now - cached_at > timedelta(hours=self.ttl_hours):
-                    file.unlink()
-                    count += 1
-            except Exception:
-                file.unlink(missing_ok=True)
-                count += 1
-
+        self.memory.clear_expired()
+        count = self.backend.clear_expired()
+        if self.bloom is not None:
+            # 读取时删除的过期条目不会从过滤器移除，借清理时机重建
+            with self._bloom_lock:
+                self._rebuild_bloom(self.bloom.capacity)
         return count
 
     def stats(self) -> Dict[str, Any]:
@@ -188,24 +757,14 @@ class SearchCache:
         Returns:
             统计信息字典
         """
-        total = 0
-        expired = 0
-        size_bytes = 0
-
-        now = datetime.now()
+        backend_stats = self.backend.stats()
+        total = backend_stats["total"]
+        expired = backend_stats["expired"]
+        size_bytes = backend_stats["size_bytes"]
 
-        for file in self.cache_dir.glob("*.json"):
-            total += 1
-            size_bytes += file.stat().st_size
-
-            try:
-                with open(file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
-                cached_at = datetime.fromisoformat(cache_data["cached_at"])
-                if now - cached_at > timedelta(hours=self.ttl_hours):
-                    expired += 1
-            except Exception:
-                pass
+        with self._counters_lock:
+            counters = dict(self._counters)
+            intent_counters = {intent: dict(counts) for intent, counts in self._intent_counters.items()}
 
         return {
             "total": total,
@@ -213,10 +772,87 @@ class SearchCache:
             "valid": total - expired,
             "size_bytes": size_bytes,
             "size_mb": round(size_bytes / 1024 / 1024, 2),
-            "cache_dir": str(self.cache_dir)
+            "cache_dir": str(self.cache_dir),
+            "backend": self.backend.name,
+            "codec": self.backend.codec.name,
+            "max_bytes": self.backend.max_bytes,
+            "max_entries": self.backend.max_entries,
+            "eviction_policy": self.backend.eviction_policy,
+            "evictions": counters["evictions"],
+            "served_stale": counters["served_stale"],
+            "refresh_ahead": counters["refresh_ahead"],
+            "subsumed_hits": counters["subsumed_hits"],
+            "negative_hits": {kind: counters[f"negative_hits_{kind}"] for kind in ENTRY_KINDS[1:]},
+            "canonicalization": {
+                # 规范化后形式发生变化的查询数，及其中命中缓存的次数
+                # （后者是规范化带来的命中增量上限）
+                "canonicalized": counters["canonicalized"],
+                "hits": counters["canonical_hits"]
+            },
+            "refresh": self.refresher.stats(),
+            "bloom": self._bloom_stats(counters),
+            "intents": self._intent_stats(intent_counters),
+            "engines": self.engine_stats(),
+            "admission": dict(self.admission.stats(), policy=self.admission_policy),
+            "tiers": {
+                "memory": {
+                    "hits": counters["memory_hits"],
+                    "misses": counters["memory_misses"],
+                    "entries": len(self.memory),
+                    "size_bytes": self.memory.size_bytes
+                },
+                "disk": {
+                    "hits": counters["disk_hits"],
+                    "misses": counters["disk_misses"]
+                }
+            }
+        }
+
+    def _intent_stats(self, intent_counters: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+        """各意图的有效期与命中率（未启用意图策略时为空）"""
+        if self.ttl_policy is None:
+            return {}
+
+        stats = {}
+        for intent, ttl_hours in self.ttl_policy.describe().items():
+            if intent == "from_time":
+                continue
+            counts = intent_counters.get(intent, {"hits": 0, "misses": 0})
+            lookups = counts["hits"] + counts["misses"]
+            stats[intent] = {
+                "ttl_hours": ttl_hours,
+                "hits": counts["hits"],
+                "misses": counts["misses"],
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0
+            }
+        return stats
+
+    def _bloom_stats(self, counters: Dict[str, int]) -> Dict[str, Any]:
+        if self.bloom is None:
+            return {"enabled": False}
+
+        skipped = counters["bloom_skipped"]
+        false_positives = counters["bloom_false_positives"]
+        passed_absent = skipped + false_positives
+        return {
+            "enabled": True,
+            "entries": len(self.bloom),
+            "capacity": self.bloom.capacity,
+            "size_bytes": self.bloom.size_bytes,
+            # 直接判定未命中、省去持久层访问的次数
+            "skipped": skipped,
+            # 过滤器判定存在但持久层未找到（含读取时才发现过期删除的条目）
+            "false_positives": false_positives,
+            "false_positive_rate": round(false_positives / passed_absent, 4) if passed_absent else 0.0,
+            "estimated_false_positive_rate": round(self.bloom.estimated_false_positive_rate(), 6)
         }
 
 
+def _failure_key(cache_key: str) -> str:
+    """失败条目的缓存键"""
+    return hashlib.md5(f"{cache_key}:failure".encode()).hexdigest()
+
+
 # 默认缓存实例
 _default_cache: Optional[SearchCache] = None
 
@@ -236,10 +872,14 @@ def main():
     parser = argparse.ArgumentParser(description="搜索结果缓存管理")
     parser.add_argument("action", choices=["stats", "clear", "clear-expired"],
                         help="操作：stats(统计), clear(清空), clear-expired(清空过期)")
+    parser.add_argument("--backend", choices=["file", "sqlite"],
+                        help="存储后端（默认读取 SEARCH_CACHE_BACKEND，否则 file）")
+    parser.add_argument("--codec", choices=available_codecs(),
+                        help="条目编码（默认读取 SEARCH_CACHE_CODEC，否则 json）")
 
     args = parser.parse_args()
 
-    cache = SearchCache()
+    cache = SearchCache(backend=args.backend, codec=args.codec)
 
     if args.action == "stats":
         stats = cache.stats()
@@ -249,14 +889,22 @@ def main():
         print(f"  过期: {stats['expired']}")
         print(f"  大小: {stats['size_mb']} MB")
         print(f"  目录: {stats['cache_dir']}")
+        print(f"  后端: {stats['backend']}")
+        print(f"  编码: {stats['codec']}")
+        bloom = stats["bloom"]
+        if bloom["enabled"]:
+            print(f"  布隆过滤器: {bloom['entries']} 个键, 跳过 {bloom['skipped']} 次, "
+                  f"假阳性率 {bloom['false_positive_rate']}")
+        for tier, tier_stats in stats["tiers"].items():
+            print(f"  {tier} 层: 命中 {tier_stats['hits']} / 未命中 {tier_stats['misses']}")
 
     elif args.action == "clear":
         count = cache.clear()
-        print(f"已清空 {count} 个缓存文件")
+        print(f"已清空 {count} 个缓存条目")
 
     elif args.action == "clear-expired":
         count = cache.clear_expired()
-        print(f"已清空 {count} 个过期缓存文件")
+        print(f"已清空 {count} 个过期缓存条目")
 
 
 if __name__ == "__main__":
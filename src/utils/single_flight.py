@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+请求合并（single-flight）
+
+同一时刻对同一个键的并发调用只执行一次，其余调用方等待并共享
+这次调用的结果或异常，避免缓存未命中时重复请求上游。
+
+SingleFlight 适用于线程与通过 asyncio.to_thread / run_in_executor 调用
+同步客户端的 asyncio 任务；AsyncSingleFlight 合并同一事件循环内的协程。
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """按键合并并发调用"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0  # 实际执行次数
+        self.shared = 0  # 等待并复用他人结果的次数
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        执行 fn，若同键调用已在进行中则等待其结果
+
+        Args:
+            key: 合并键（相同键的并发调用共享一次执行）
+            fn: 实际执行的函数
+            timeout: 等待他人进行中调用的最长时间（秒），None 表示不限；
+                     自己执行 fn 时不受此限制
+
+        Returns:
+            fn 的返回值（等待方拿到的是同一个对象）
+
+        Raises:
+            fn 抛出的异常会原样抛给所有等待方
+            TimeoutError: 等待超时（进行中的调用不受影响）
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise TimeoutError(f"等待进行中的调用超过 {timeout:.2f}s")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """执行 / 复用计数"""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "shared": self.shared,
+                "inflight": len(self._calls)
+            }
+
+
+class _AsyncCall:
+    """一次进行中的协程调用"""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """按键合并同一事件循环内的并发协程调用"""
+
+    def __init__(self):
+        # 键带上事件循环：任务只能在创建它的事件循环内等待
+        self._calls: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], _AsyncCall] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行 fn()，若同键调用已在进行中则等待其结果
+
+        调用在独立任务中执行：单个调用方被取消不影响其他等待方，
+        全部等待方都取消时才取消这次调用。
+
+        Args:
+            key: 合并键
+            fn: 返回协程的函数
+
+        Returns:
+            fn() 的结果（等待方拿到的是同一个对象）
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (loop, key)
+        call = self._calls.get(call_key)
+        if call is None or call.task.done():
+            call = _AsyncCall(loop.create_task(fn()))
+            self._calls[call_key] = call
+            call.task.add_done_callback(lambda _: self._forget(call_key, call))
+            self.executed += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, call_key: Tuple[asyncio.AbstractEventLoop, Hashable], call: _AsyncCall) -> None:
+        if self._calls.get(call_key) is call:
+            del self._calls[call_key]
+
+    def stats(self) -> Dict[str, int]:
+        """执行 / 复用计数"""
+        return {
+            "executed": self.executed,
+            "shared": self.shared,
+            "inflight": len(self._calls)
+        }
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+按意图计算缓存有效期
+
+不同意图的结果过时速度差别很大：新闻类查询一小时内就可能过时，
+技术文档、参考资料类查询可以缓存一周。TTLPolicy 用
+SearchIntentClassifier 对查询分类，再按表查出该条目的有效期；
+带 from_time 的查询同样与时间相关，有效期不超过表中 from_time 一项。
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+from search_intent import SearchIntent, SearchIntentClassifier
+
+
+# 默认有效期（小时）；表中没有的意图使用 SearchCache 的 ttl_hours
+INTENT_TTL_HOURS = {
+    SearchIntent.NEWS.value: 1,
+    SearchIntent.TIME_RANGE.value: 6,
+    SearchIntent.TECHNICAL.value: 168,
+    SearchIntent.REFERENCE.value: 168,
+    "from_time": 6,  # 带 from_time 的查询的上限
+}
+
+POLICY_KEYS = tuple(intent.value for intent in SearchIntent) + ("from_time",)
+
+
+class TTLPolicy:
+    """意图 → 有效期"""
+
+    def __init__(
+        self,
+        default_hours: float,
+        table: Optional[Dict[str, float]] = None,
+        classifier: Optional[SearchIntentClassifier] = None
+    ):
+        """
+        初始化策略
+
+        Args:
+            default_hours: 表中未列出的意图使用的有效期（小时）
+            table: 覆盖 INTENT_TTL_HOURS 的条目，键为意图值（news / technical /
+                   reference / time_range / general ...）或 from_time，值为小时
+            classifier: 意图分类器
+        """
+        unknown = set(table or {}) - set(POLICY_KEYS)
+        if unknown:
+            raise ValueError(f"未知的 TTL 策略项: {', '.join(sorted(unknown))}（可选: {', '.join(POLICY_KEYS)}）")
+
+        self.default_hours = default_hours
+        self.table = dict(INTENT_TTL_HOURS, **(table or {}))
+        self.classifier = classifier or SearchIntentClassifier()
+
+        # 同一查询的 lookup 与 set 会各分类一次，缓存分类结果
+        self.intent = lru_cache(maxsize=4096)(self._classify)
+
+    def _classify(self, query: str) -> str:
+        return self.classifier.classify(query).intent.value
+
+    def ttl_hours(self, intent: str, from_time: Optional[str] = None) -> float:
+        """条目有效期（小时）"""
+        hours = self.table.get(intent, self.default_hours)
+        if from_time:
+            hours = min(hours, self.table["from_time"])
+        return hours
+
+    def describe(self) -> Dict[str, float]:
+        """各意图的有效期（小时），用于统计输出"""
+        return {key: self.table.get(key, self.default_hours) for key in POLICY_KEYS}